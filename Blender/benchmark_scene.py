@@ -0,0 +1,109 @@
+#!/usr/bin/python3
+# Importing python3 from local, just use "python3 <binary>" if is not the same location
+
+# /
+# ** Luis ROSARIO, 2023
+# ** benchmark_scene.py
+# ** File description:
+# ** Speed of the batch location samplers of soccer_scene.py against the previous ones (one draw per player and per
+# ** axis, gaussian_rdm drawing again out of range values), the distributions are tested in test_soccer_scene.py
+# ** https://github.com/Luisrosario2604
+# */
+
+# Imports
+import argparse
+import random
+import time
+import numpy as np
+
+import soccer_scene
+
+# Global
+# (name, method, params) : params as in soccer_scene.sample_position_methods, the gauss cases include the extreme
+# parameters of get_gaussians (means close to the border, large sigmas)
+cases = [
+    ("random", "random", [0, 0, 0, 0]),
+    ("gauss middle", "gauss", [34.8, 15, 54.59, 15]),
+    ("gauss border", "gauss", [14, 40, 110, 60]),
+    ("gauss corner", "gauss", [55, 15, 12, 15]),
+    ("squares small", "squares", [1414, 5414, 4409, 6409]),
+    ("squares full", "squares", [28, 6828, 59, 10759])
+]
+
+
+# Previous samplers (soccer_addon.py before the scene sampler), kept as references
+def gaussian_rdm(mean, strd_deviation, min, max, rng=random):
+    nb = rng.gauss(mean, strd_deviation)
+    if nb > max:
+        return gaussian_rdm(mean, strd_deviation, min, max, rng)
+    if nb < min:
+        return gaussian_rdm(mean, strd_deviation, min, max, rng)
+    return nb
+
+
+def get_location(option, rng=random):
+    if option[0] == "random":
+        return [
+            rng.randint(105, 6856) / 100,
+            rng.randint(100, 10818) / 100 * -1
+        ]
+    elif option[0] == "gauss":
+        return [
+            gaussian_rdm(option[1], option[2], 1.05, 68.5, rng),
+            gaussian_rdm(option[3], option[4], 1, 108.18, rng) * -1
+        ]
+    else:
+        return [
+            rng.randint(option[1], option[2]) / 100,
+            rng.randint(option[3], option[4]) / 100 * -1
+        ]
+
+
+# Function declarations
+def get_arguments():
+    ap = argparse.ArgumentParser()
+
+    ap.add_argument("-n", "--samples", required=False, type=int, default=100000, help="locations per case")
+    ap.add_argument("-s", "--seed", required=False, type=int, default=0, help="seed of both samplers")
+    args = vars(ap.parse_args())
+
+    if args["samples"] < 100:
+        print("samples must be at least 100")
+        exit(84)
+
+    return args["samples"], args["seed"]
+
+
+def run_previous(method, params, samples, seed):
+    rng = random.Random(seed)
+    option = [method] + [int(p) if method == "squares" else p for p in params]
+    start = time.perf_counter()
+    locations = np.array([get_location(option, rng) for _ in range(samples)])
+    return locations, time.perf_counter() - start
+
+
+# One frame of samples players, the frame size does not change the distribution
+def run_batch(method, params, samples, seed):
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    locations = soccer_scene.sample_locations(rng, np.array([soccer_scene.position_methods.index(method)]),
+                                              np.array([params], dtype=np.float64), samples)[0]
+    return locations, time.perf_counter() - start
+
+
+def main():
+    samples, seed = get_arguments()
+
+    print("Locations per case : " + str(samples))
+    for name, method, params in cases:
+        _, previous_time = run_previous(method, params, samples, seed)
+        _, batch_time = run_batch(method, params, samples, seed)
+
+        print(name.ljust(16) + "Previous : " + str(round(previous_time * 1000, 1)) + " ms - Batch : " +
+              str(round(batch_time * 1000, 1)) + " ms - Speedup : x" +
+              str(round(previous_time / max(batch_time, 1e-9), 1)))
+
+
+# Main body
+if __name__ == '__main__':
+    main()
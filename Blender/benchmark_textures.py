@@ -0,0 +1,119 @@
+#!/usr/bin/python3
+# Importing python3 from local, just use "python3 <binary>" if is not the same location
+
+# /
+# ** Luis ROSARIO, 2023
+# ** benchmark_textures.py
+# ** File description:
+# ** Compare the speed and the results of the texture recolor functions (outside Blender)
+# ** https://github.com/Luisrosario2604
+# */
+
+# Imports
+import argparse
+import os
+import random
+import tempfile
+import time
+import numpy as np
+from PIL import Image
+
+import soccer_textures
+
+
+# Function declarations
+def get_arguments():
+    ap = argparse.ArgumentParser()
+
+    ap.add_argument("-t", "--textures", required=False, default="Soccer_saves/Textures", help="path of the textures directory")
+    ap.add_argument("-n", "--repeat", required=False, type=int, default=3, help="number of textures per function")
+    args = vars(ap.parse_args())
+
+    texture_dir = args["textures"]
+    repeat = args["repeat"]
+
+    if not os.path.isdir(texture_dir):
+        print("Folder not existing")
+        exit(84)
+
+    return texture_dir, repeat
+
+
+def random_color():
+    return [random.randint(0, 255), random.randint(0, 255), random.randint(0, 255)]
+
+
+# Same regions as choose_model_wear_texture (team) and create_player_texure (player)
+def random_changes():
+    team = [random_color() + [r] for r in [4, 5, 6, 7, 3, 10, 11, 12]]
+    player = [random_color() + [r] for r in [8, 9, 1, 2]]
+    return team, player
+
+
+def time_function(function, im_to_copy, tmp_dir, changes_list, name):
+    paths = []
+    start = time.perf_counter()
+    for n, (team, player) in enumerate(changes_list):
+        team_path = os.path.join(tmp_dir, name + "-team-" + str(n) + ".png")
+        player_path = os.path.join(tmp_dir, name + "-player-" + str(n) + ".png")
+        if function == soccer_textures.create_texture:
+            function(im_to_copy, team_path, team, keep=True)
+        else:
+            function(im_to_copy, team_path, team)
+        function(team_path, player_path, player)
+        paths += [team_path, player_path]
+    return (time.perf_counter() - start) / (len(changes_list) * 2), paths
+
+
+# Recolor only (no PNG decode / encode)
+def time_recolor(im_to_copy, changes_list):
+    data = np.array(Image.open(im_to_copy))
+    template = soccer_textures.get_template(im_to_copy)
+
+    start = time.perf_counter()
+    for team, _ in changes_list:
+        masks_data = data.copy()
+        for colors in team:
+            mask = (masks_data[:, :, 0] == 0) & (masks_data[:, :, 1] == 0) & (masks_data[:, :, 2] == colors[3])
+            masks_data[:, :, :3][mask] = [colors[0], colors[1], colors[2]]
+    masks_time = (time.perf_counter() - start) / len(changes_list)
+
+    start = time.perf_counter()
+    for team, _ in changes_list:
+        soccer_textures.recolor(template, team)
+    lut_time = (time.perf_counter() - start) / len(changes_list)
+    return masks_time, lut_time
+
+
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def main():
+    texture_dir, repeat = get_arguments()
+    changes_list = [random_changes() for _ in range(repeat)]
+
+    for template in ["TextureHorizontalNb.png", "TextureVerticalNb.png"]:
+        im_to_copy = os.path.join(texture_dir, template)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            masks_time, masks_paths = time_function(soccer_textures.create_texture_masks, im_to_copy, tmp_dir,
+                                                    changes_list, "masks")
+            soccer_textures.get_template(im_to_copy)
+            lut_time, lut_paths = time_function(soccer_textures.create_texture, im_to_copy, tmp_dir,
+                                                changes_list, "lut")
+            different = sum(read_bytes(a) != read_bytes(b) for a, b in zip(masks_paths, lut_paths))
+        masks_recolor, lut_recolor = time_recolor(im_to_copy, changes_list)
+
+        print(template + " - textures : " + str(len(masks_paths)))
+        print("    Masks (create_texture)   : " + str(round(masks_time * 1000, 1)) + " ms/texture")
+        print("    Palette lookup           : " + str(round(lut_time * 1000, 1)) + " ms/texture")
+        print("    Speedup                  : x" + str(round(masks_time / lut_time, 2)))
+        print("    Recolor only (masks)     : " + str(round(masks_recolor * 1000, 1)) + " ms/texture")
+        print("    Recolor only (palette)   : " + str(round(lut_recolor * 1000, 1)) + " ms/texture")
+        print("    Different PNG files      : " + str(different))
+
+
+# Main body
+if __name__ == '__main__':
+    main()
@@ -24,6 +24,7 @@ from bpy.props import (StringProperty,
                        EnumProperty,
                        PointerProperty,
                        )
+from mathutils import Vector
 from bpy.types import (Panel,
                        Menu,
                        Operator,
@@ -31,12 +32,10 @@ from bpy.types import (Panel,
                        )
 
 import time
-import random
 from datetime import datetime
 
 import math
 import numpy as np
-from PIL import Image
 
 import sys
 import os
@@ -44,6 +43,17 @@ from os import listdir
 from os.path import isfile, join
 import subprocess
 
+# Pure python modules next to the .blend file
+blender_dir = bpy.path.abspath("//")
+if blender_dir not in sys.path:
+    sys.path.append(blender_dir)
+
+import soccer_projection
+import soccer_textures
+import soccer_pose
+import soccer_scene
+import soccer_timing
+
 
 # ------------------------------------------------------------------------
 #
@@ -114,18 +124,6 @@ outliner_structure = {
     "PlayerToCopy_goaling_5": "ManToCopy_goaling_5",
 }
 
-colors_list = ["white",
-                   "black",
-                   "grey",
-                   "blue",
-                   "red",
-                   "green",
-                   "yellow",
-                   "orange",
-                   "purple",
-                   "pink",
-                   "brown"]
-
 default_pos_ball = [34.8021, -54.591]
 default_pos_goal1 = [34.8021, -1]
 default_pos_goal2 = [34.8021, -108, 182]
@@ -168,168 +166,11 @@ def get_separator():
     return separators[platform]
 
 
-def bool_from_float_percent(percent):
-    r = random.randint(0, 10000) / 100
-    if r <= percent:
-        return True
-    return False
-
-
-def bool_from_percent(percent):
-    r = random.randint(0, 100)
-    if r <= percent:
-        return True
-    return False
-
-
 def get_body_name(obj):
     body_name = obj.name.split(".")
     return body_name[0] + "Body." + body_name[1]
 
 
-def gaussian_rdm(mean, strd_deviation, min, max):
-    nb = np.random.normal(mean, strd_deviation, 1)
-    if nb > max:
-        return gaussian_rdm(mean, strd_deviation, min, max)
-    if nb < min:
-        return gaussian_rdm(mean, strd_deviation, min, max)
-    return nb
-
-
-def get_sun_color():
-    return random.choice([(1, 0.952714, 0.894104),
-                          (0.967048, 0.879469, 1),
-                          (0.779252, 0.813145, 1),
-                          (0.882918, 1, 0.825325)])
-
-
-def sun_rdm_param():
-    sun = bpy_o["Lamp"]
-    sun_shadow = bpy_o["Lamp_shadow"]
-    
-    strength = 4.800
-    
-    if bool_from_percent(50):
-        strength = random.randint(4000, 6800) / 1000
-    sun_shadow.data.energy = strength
-    
-    #if bool_from_percent(80):
-    #    sun_shadow.data.color = (1, 1, 1)
-    #else:
-    #    sun_shadow.data.color = get_sun_color()
-    
-
-
-# ------------------------------------------------------------------------
-#
-#    Locations
-#
-# ------------------------------------------------------------------------
-
-
-def get_squares():
-    lenght_x = random.randint(4000, 6800)
-    lenght_y = random.randint(2000, 10700)
-    
-    middle_x_lenght = int(lenght_x / 2)
-    middle_y_lenght = int(lenght_y / 2)
-    
-    middle_x = random.randint(middle_x_lenght, 6856 - middle_x_lenght)
-    middle_y = random.randint(middle_y_lenght, 10818 - middle_y_lenght)
-    
-    x_min = middle_x - middle_x_lenght
-    x_max = middle_x + middle_x_lenght
-    y_min = middle_y - middle_y_lenght
-    y_max = middle_y + middle_y_lenght
-    
-    return x_min, x_max, y_min, y_max
-
-
-def get_gaussians():
-    mean_x = random.randint(1400, 5500) / 100
-    mean_y = random.randint(1200, 11000) / 100
-    
-    sigma_x = random.randint(15, 40)
-    sigma_y = random.randint(15, 60)
-     
-    print("MeanX : " + str(mean_x) + " - SigmaX : " + str(sigma_x) + "\n MeanY : " + str(mean_y) + " - SigmaY : " + str(sigma_y))
-    return mean_x, sigma_x, mean_y, sigma_y
-
-
-def choose_position_method(soctool):
-    choice_random = soctool.my_lm_random # 5
-    choice_gauss = soctool.my_lm_squares # 30
-    
-    if bool_from_percent(choice_random):
-        print("METHOD : Random")
-        return ["random"]
-    if bool_from_percent(choice_gauss):
-        mean_x, sigma_x, mean_y, sigma_y = get_gaussians()
-        print("METHOD : Guassians")
-        return ["gauss", mean_x, sigma_x, mean_y, sigma_y]
-    
-    x_min, x_max, y_min, y_max = get_squares()
-    print("METHOD : Squares")
-    return ["squares", x_min, x_max, y_min, y_max]
-
-
-def get_location(option):
-    if option[0] == "random":
-        return [
-            random.randint(105, 6856) / 100,
-            random.randint(100, 10818) / 100 * -1
-        ]
-    elif option[0] == "gauss":
-        return [
-            gaussian_rdm(option[1], option[2], 1.05, 68.5),
-            gaussian_rdm(option[3], option[4], 1, 108.18) * -1
-        ]
-    else:
-        return [
-            random.randint(option[1], option[2]) / 100,
-            random.randint(option[3], option[4]) / 100 * -1
-        ]
-        
-
-
-def get_location_referee(ball_y):
-    mean_y = (-ball_y + 54.59) / 2
-    return [
-            gaussian_rdm(34.8, 10, 1.05, 68.56),
-            gaussian_rdm(mean_y, 12, 1, 108.18) * -1
-        ]
-        
-def get_location_goal(option):
-    if option == "goal1":
-        return [
-            random.randint(320, 378) / 10,
-            random.randint(00, 26) / 10 * -1
-        ]
-    elif option == "goal2":
-        return [
-            random.randint(320, 378) / 10,
-            random.randint(106582, 109182) / 1000 * -1
-        ]
-        
-
-def get_location_sun():
-    sun_r = [random.randint(0, 84),
-             random.randint(0, 78),
-             random.randint(0, 360),
-             random.randint(275, 600) / 100]
-    if bool_from_percent(50):
-        sun_r[0] *= -1
-    if bool_from_percent(50):
-        sun_r[1] *= -1
-    return sun_r
-
-
-def set_random_position_camera(camera):
-    camera.location.x = (random.randint(2500, 3280) / 100) * -1
-    camera.location.y = (random.randint(3959, 6959) / 100) * -1
-    camera.location.z = random.randint(1600, 2480) / 100
-
-
 # ------------------------------------------------------------------------
 #
 #    Move
@@ -342,10 +183,10 @@ def move_ball(location=default_pos_ball):
     ball.location.x = location[0]
     ball.location.y = location[1]
 
-    if location == default_pos_ball:
+    if len(location) > 2:
+        ball.location.z = location[2]
+    else:
         ball.location.z = 0.165
-    elif bool_from_percent(10):
-        ball.location.z += random.randint(0000, 5000) / 1000
 
 
 def move_sun(rotation=default_pos_sun):
@@ -358,11 +199,10 @@ def move_sun(rotation=default_pos_sun):
 
 
 def move_goals(goal1=bpy_o["GoalMan1"], goal2=bpy_o["GoalMan2"], goal_pos_1=default_pos_goal1,
-               goal_pos_2=default_pos_goal2):
+               goal_pos_2=default_pos_goal2, rotations=None):
     goal1.location.x = goal_pos_1[0]
     goal1.location.y = goal_pos_1[1]
     goal1.location.z = -0.011951
-    rotate_player(goal1, 20)
 
     goal1.scale.x = 1.3
     goal1.scale.y = 1.3
@@ -371,12 +211,16 @@ def move_goals(goal1=bpy_o["GoalMan1"], goal2=bpy_o["GoalMan2"], goal_pos_1=defa
     goal2.location.x = goal_pos_2[0]
     goal2.location.y = goal_pos_2[1]
     goal2.location.z = -0.011951
-    rotate_player(goal2, 20)
 
     goal2.scale.x = 1.3
     goal2.scale.y = 1.3
     goal2.scale.z = 1.3
 
+    if rotations is None:
+        rotations = get_facing_rotations([goal1, goal2])
+    goal1.rotation_euler[2] = rotations[0]
+    goal2.rotation_euler[2] = rotations[1]
+
 
 # ------------------------------------------------------------------------
 #
@@ -385,9 +229,12 @@ def move_goals(goal1=bpy_o["GoalMan1"], goal2=bpy_o["GoalMan2"], goal_pos_1=defa
 # ------------------------------------------------------------------------
 
 
-def clear_teams_col():
+def clear_teams_col(keep_pool=False):
     for collection in bpy_c:
         if collection.name.split("_")[0] in ["Player1", "Player2", "Player5"]:
+            if keep_pool and is_pool_collection(collection):
+                hide_pool_collection(collection)
+                continue
             for obj in collection.objects:
                 bpy_o.remove(obj, do_unlink=True)
             bpy_c.remove(collection)
@@ -410,6 +257,7 @@ def create_tmp_dir(dir_path, del_files=False):
     if not os.path.isdir(texture_path + get_separator()):
         os.mkdir(texture_path)
     if del_files:
+        soccer_textures.forget_templates(texture_path)
         onlyfiles = [f for f in listdir(texture_path) if isfile(join(texture_path, f))]
         for file in onlyfiles:
             if file.endswith("-texture.png"):
@@ -419,11 +267,16 @@ def create_tmp_dir(dir_path, del_files=False):
 def clear_text_goals(goal1=bpy_o["GoalBody1"], goal2=bpy_o["GoalBody2"]):
     goal1.data.materials.clear()
     goal2.data.materials.clear()
+    # Shown again after a culled generation
+    for obj in [bpy_o["GoalMan1"], bpy_o["GoalMan2"], goal1, goal2]:
+        obj.hide_viewport = False
+        obj.hide_render = False
 
 
-def clear_scene(texture_path):
+@soccer_timing.timed("clear_scene")
+def clear_scene(texture_path, keep_pool=False):
     clear_text_goals()
-    clear_teams_col()
+    clear_teams_col(keep_pool)
     move_sun()
     move_ball()
     move_goals()
@@ -437,8 +290,7 @@ def clear_scene(texture_path):
 # ------------------------------------------------------------------------
 
 
-def random_scale(player):
-    scale = gaussian_rdm(1.3, 0.033, 1.2, 1.4)
+def set_scale(player, scale):
     player.scale.x = scale
     player.scale.y = scale
     player.scale.z = scale
@@ -451,478 +303,203 @@ def random_scale(player):
 # ------------------------------------------------------------------------
 
 
-def angle_of_vectors(vector, vector_dflt, jitter_angle):
-    a = vector[0]
-    b = vector[1]
-    c = vector_dflt[0]
-    d = vector_dflt[1]
-
-    dotProduct = a * c + b * d
-    modOfVector1 = math.sqrt(a * a + b * b) * math.sqrt(c * c + d * d)
-    angle = dotProduct / modOfVector1
-    angleInDegree = math.degrees(math.acos(angle))
-
-    jitter = random.randint(0, jitter_angle);
-    if random.randint(0, 1) == 1:
-        jitter *= -1
-
-    return angleInDegree + jitter
-
-
-def rotate_player(player, jitter_angle):
+# Players facing the ball (without jitter)
+def get_facing_rotations(players):
     ball = bpy_o["Ball"]
-    vector = [ball.location.x - player.location.x, ball.location.y - player.location.y]
-    vector_dflt = [0, -1]
+    locations = np.array([[p.location.x, p.location.y] for p in players])
+    return [float(r) for r in soccer_scene.get_facing_rotations(np.array([ball.location.x, ball.location.y]),
+                                                                 locations)]
 
-    if bool_from_percent(5):
-        angle = random.randint(00000, 36000) / 100
-    elif bool_from_percent(50):
-        angle = angle_of_vectors(vector, vector_dflt, jitter_angle)
-    else:
-        angle = angle_of_vectors(vector, vector_dflt, jitter_angle / 2)
-    
-    if ball.location.x > player.location.x:
-        player.rotation_euler[2] = math.radians(angle)
-    else:
-        player.rotation_euler[2] = math.radians(-angle)
-    
 
-# Calculate the vector pointing from the camera to the ball
-# Set the camera's rotation to point along this vector
-def center_camera():
+# Camera looking at the focus point of the scene (the ball moved to the middle of the field, with a jitter)
+@soccer_timing.timed("move_camera")
+def move_camera(location, focus, angle):
     camera = bpy_o["Camera"]
-    ball = bpy_o["Ball"]
-    
-    set_random_position_camera(camera)
-    focus_location = ball.location.copy()
+    camera.location = [float(v) for v in location]
 
-    jitter_x = gaussian_rdm(0, 2, 0, 5)
-    jitter_y = gaussian_rdm(0, 8, 0, 20)
-    
-    if bool_from_percent(50):
-        jitter_x *= -1 
-    if bool_from_percent(50):
-        jitter_y *= -1
-
-    focus_location.x = 34.8 - ((34.8 - focus_location.x) / 2.41)
-    focus_location.x += jitter_x
-    focus_location.y += jitter_y
-    
-    if focus_location.x > 68.5:
-        focus_location.x = 68.5
-    if focus_location.x < 1.05:
-        focus_location.x = 1.05
-    if focus_location.y > -1:
-        focus_location.y = -1
-    if focus_location.y < -108.2:
-        focus_location.y = -108.2
-
-    ball_to_camera = camera.location - focus_location
+    ball_to_camera = camera.location - Vector([float(v) for v in focus])
     camera.rotation_euler = ball_to_camera.to_track_quat("Z","Y").to_euler()
     camera.rotation_euler.y = 0
-    
-    fov = gaussian_rdm(35, 6, 25, 45)
-    camera.data.angle = fov*(math.pi/180.0)
+
+    camera.data.angle = float(angle)
 
 
 # ------------------------------------------------------------------------
 #
-#    Colors
+#    Textures
 #
 # ------------------------------------------------------------------------
 
 
-def get_black():
-    return random.choice([[1, 1, 1],
-                          [17, 17, 17],
-                          [30, 30, 30],
-                          [60, 60, 60],
-                          [77, 77, 77]])
-                          
-def get_white():
-    return random.choice([[255, 255, 255],
-                          [255, 250, 250],
-                          [255, 245, 238],
-                          [245, 245, 220],
-                          [245, 245, 245],
-                          [255, 255, 240]])
-                          
-                          
-def get_grey():
-    return random.choice([[105, 105, 105],
-                          [128, 128, 128],
-                          [169, 169, 169],
-                          [192, 192, 192],
-                          [211, 211, 211],
-                          [220, 220, 220]])
-                          
-                          
-def get_blue():
-    return random.choice([[0, 79, 255],
-                          [0, 102, 255],
-                          [0, 158, 255],
-                          [0, 180, 255],
-                          [67, 196, 239]])
-                          
-                          
-def get_red():
-    return random.choice([[133, 50, 41],
-                          [161, 50, 39],
-                          [223, 45, 28],
-                          [244, 37, 37],
-                          [233, 0, 0],
-                          [255, 58, 58],
-                          [255, 75, 75]])
-                          
-                        
-def get_green():
-    return random.choice([[173, 255, 0],
-                          [11 / 6, 214, 0],
-                          [2, 137, 0],
-                          [0, 210, 127],
-                          [0, 255, 131],
-                          [15, 161, 7],
-                          [89, 166, 26]])
-                          
-                          
-def get_yellow():
-    return random.choice([[249, 233, 9],
-                          [253, 242, 93],
-                          [252, 255, 131],
-                          [251, 253, 158],
-                          [218, 182, 0]])
-                          
-                    
-def get_orange():
-    return random.choice([[249, 156, 0],
-                          [255, 167, 20],
-                          [255, 202, 22],
-                          [255, 178, 27],
-                          [249, 115, 0]])
-                          
-                          
-def get_purple():
-    return random.choice([[240, 0, 255],
-                          [221, 0, 200],
-                          [193, 0, 185],
-                          [178, 0, 152],
-                          [135, 5, 123]])
-                          
-                          
-def get_pink():
-    return random.choice([[255, 119, 170],
-                          [255, 153, 204],
-                          [255, 187, 238],
-                          [255, 85, 136],
-                          [255, 51, 119]])
-                          
-                          
-def get_brown():
-    return random.choice([[124, 44, 21],
-                          [128, 25, 21],
-                          [141, 36, 13],
-                          [163, 67, 24],
-                          [199, 119, 29]])
-    
+# Templates are decoded once and cached (see soccer_textures.py), keep=True for the team textures
+def create_texture(im_to_copy, im_to_paste, color_changes, keep=False, save=True):
+    return soccer_textures.create_texture(im_to_copy, im_to_paste, color_changes, keep, save)
 
-def choose_sport_wear_random_color(nb_sorts, model_type="player"):
-    if model_type == "player":
-        color_choices = np.random.choice(colors_list, size=nb_sorts, replace=False, p=(
-            23 / 100,  # White
-            15 / 100,  # Black
-            7 / 100,  # Grey
-            12 / 100,  # Blue
-            14 / 100,  # Red
-            9 / 100,  # Green
-            6 / 100,  # Yellow
-            4 / 100,  # Orange
-            7 / 100,  # Purple
-            2 / 100,  # Pink
-            1 / 100))  # brown
-    elif model_type == "referee":
-        color_choices = np.random.choice(colors_list, size=nb_sorts, replace=False, p=(
-            0 / 100,  # White
-            5 / 100,  # Black
-            10 / 100,  # Grey
-            10 / 100,  # Blue
-            5 / 100,  # Red
-            10 / 100,  # Green
-            35 / 100,  # Yellow
-            5 / 100,  # Orange
-            5 / 100,  # Purple
-            15 / 100,  # Pink
-            0 / 100))  # brown
-    else:
-        color_choices = np.random.choice(colors_list, size=nb_sorts, replace=False, p=(
-            0 / 100,  # White
-            3 / 100,  # Black
-            2 / 100,  # Grey
-            20 / 100,  # Blue
-            15 / 100,  # Red
-            22 / 100,  # Green
-            17 / 100,  # Yellow
-            10 / 100,  # Orange
-            5 / 100,  # Purple
-            6 / 100,  # Pink
-            0 / 100))  # brown
-
-    color_choices = color_choices.tolist()
-    random.shuffle(color_choices)
-
-    colors_final = []
-
-    for c in color_choices:
-        if c == "white":
-            colors_final.append(get_white())
-        if c == "black":
-            colors_final.append(get_black())
-        if c == "grey":
-            colors_final.append(get_grey())
-        if c == "blue":
-            colors_final.append(get_blue())
-        if c == "red":
-            colors_final.append(get_red())
-        if c == "green":
-            colors_final.append(get_green())
-        if c == "yellow":
-            colors_final.append(get_yellow())
-        if c == "orange":
-            colors_final.append(get_orange())
-        if c == "purple":
-            colors_final.append(get_purple())
-        if c == "pink":
-            colors_final.append(get_pink())
-        if c == "brown":
-            colors_final.append(get_brown())
-
-    return colors_final
 
+def create_team_texture(texture_path, team_name, is_vertical, color_in_order, save=True):
+    im_to_paste = texture_path + "Textures_tmp" + get_separator() + team_name + "-texture.png"
 
-# ------------------------------------------------------------------------
-#
-#    Textures
-#
-# ------------------------------------------------------------------------
+    im_to_copy = texture_path + "TextureHorizontalNb.png"
+    if is_vertical:
+        im_to_copy = texture_path + "TextureVerticalNb.png"
 
+    create_texture(im_to_copy, im_to_paste, color_in_order, keep=True, save=save)
 
-def is_color_close_white(color):
-    r, g, b = color[0], color[1], color[2]
-    y = 0.2126 * r + 0.7152 * g + 0.0722 * b
-    if y > 128:
-        return False
-    return True
-
-
-def create_texture(im_to_copy, im_to_paste, color_changes):
-    im = Image.open(im_to_copy)
-    data = np.array(im)
-
-    for colors in color_changes:
-        r1, g1, b1 = 0, 0, colors[3]  # Original value
-        r2, g2, b2 = colors[0], colors[1], colors[2]  # Value that we want to replace it with
-
-        red, green, blue = data[:, :, 0], data[:, :, 1], data[:, :, 2]
-        mask = (red == r1) & (green == g1) & (blue == b1)
-        data[:, :, :3][mask] = [r2, g2, b2]
-
-    im_to_copy = Image.fromarray(data)
-    im_to_copy.save(im_to_paste)
-
-
-def append_item_to_cpy_list(list, item):
-    tmp = list.copy()
-    tmp.append(item)
-    return tmp
-
-
-# colors[0] = Color shirt 1
-# colors[1] = Color shirt 2
-# colors[2] = Color pants
-# colors[3] = Color socks
-def choose_model_wear_texture(soctool, colors, model_type="player"):
-    white_c = [255, 255, 255]
-    black_c = [0, 0, 0]
-
-    is_striped = False
-    is_vertical = False
-    is_pants_same_color = False
-    is_pants_color_one = True
-    if bool_from_percent(soctool.my_sw_striped):
-        is_striped = True
-        if bool_from_percent(soctool.my_sw_vertical):
-            is_vertical = True
-        if bool_from_percent(soctool.my_sw_pants_same_color_stiped):
-            is_pants_same_color = True
-            if bool_from_percent(50):
-                is_pants_color_one = False
-    elif bool_from_percent(soctool.my_sw_pants_same_color_full):
-        is_pants_same_color = True
-
-    if model_type != "player":
-        is_striped = False
-        is_pants_same_color = bool_from_percent(90)
-    if not is_striped:
-        colors[1] = colors[0]
-    if is_pants_same_color:
-        if is_pants_color_one:
-            colors[2] = colors[1]
-        colors[2] = colors[0]
-
-    if not bool_from_percent(25):
-        i = random.choice([0, 1, 2])
-        colors[3] = colors[i]
-
-    color_in_order = [append_item_to_cpy_list(colors[0], 4),
-                      append_item_to_cpy_list(colors[0], 5),
-                      append_item_to_cpy_list(colors[1], 6),
-                      append_item_to_cpy_list(colors[2], 7),
-                      append_item_to_cpy_list(colors[3], 3)]
-
-    if is_color_close_white(colors[0]):
-        color_in_order.append(append_item_to_cpy_list(white_c, 10))
-    else:
-        color_in_order.append(append_item_to_cpy_list(black_c, 10))
 
-    if is_color_close_white(colors[1]):
-        color_in_order.append(append_item_to_cpy_list(white_c, 11))
-    else:
-        color_in_order.append(append_item_to_cpy_list(black_c, 11))
+def create_player_texure(path_team_texture, path_player_texture, color_in_order, save=True):
+    return create_texture(path_team_texture, path_player_texture, color_in_order, save=save)
 
-    if is_color_close_white(colors[2]):
-        color_in_order.append(append_item_to_cpy_list(white_c, 12))
-    else:
-        color_in_order.append(append_item_to_cpy_list(black_c, 12))
 
-    return color_in_order, is_striped, is_vertical
+def get_texture_image_name(path_texture):
+    return os.path.basename(path_texture)[:-len(".png")]
 
 
-def choose_sport_wear_referee():
-    black = get_black()
-    referee_color = choose_sport_wear_random_color(1, model_type="referee")
-    
-    color_in_order = [append_item_to_cpy_list(black, 8), # Short, shoes in black
-                      append_item_to_cpy_list(black, 7),
-                      append_item_to_cpy_list(black, 9),
-                      append_item_to_cpy_list(black, 12)]
-                      
-    color_in_order.append(append_item_to_cpy_list(referee_color[0], 3)) # Shirt, soccs in same color
-    color_in_order.append(append_item_to_cpy_list(referee_color[0], 4))
-    color_in_order.append(append_item_to_cpy_list(referee_color[0], 5))
-    color_in_order.append(append_item_to_cpy_list(referee_color[0], 6))
-    color_in_order.append(append_item_to_cpy_list(referee_color[0], 10))
-    color_in_order.append(append_item_to_cpy_list(referee_color[0], 11))
-    
-    return color_in_order
+# The pixels are written in an image datablock kept between generations (fake user), no PNG round-trip
+def push_texture_to_blender(path_texture, data):
+    height, width = data.shape[0], data.shape[1]
+    name = get_texture_image_name(path_texture)
+    image = bpy.data.images.get(name)
 
+    if image is None or tuple(image.size) != (width, height):
+        if image is not None:
+            bpy.data.images.remove(image)
+        image = bpy.data.images.new(name, width, height, alpha=True)
+        image.use_fake_user = True
 
-def create_team_texture(soctool, texture_path, team_name, model_type):
-    if team_name == "Team5":
-        is_striped = False
-        is_vertical = False
-        color_in_order = choose_sport_wear_referee()
-    else:
-        colors = choose_sport_wear_random_color(4, model_type)
-        color_in_order, is_striped, is_vertical = choose_model_wear_texture(soctool, colors, model_type)
-    im_to_paste = texture_path + "Textures_tmp" + get_separator() + team_name + "-texture.png"
+    if data.shape[2] == 3:
+        data = np.concatenate([data, np.full((height, width, 1), 255, dtype=np.uint8)], axis=2)
+    pixels = np.multiply(data[::-1], 1 / 255, dtype=np.float32)
+    image.pixels.foreach_set(pixels.ravel())
+    image.update()
+    return image
 
-    im_to_copy = texture_path + "TextureHorizontalNb.png"
-    if is_vertical:
-        im_to_copy = texture_path + "TextureVerticalNb.png"
 
-    create_texture(im_to_copy, im_to_paste, color_in_order)
+def get_material_slot_name(team_name, i):
+    if team_name == "Team1":
+        return "Player1_" + str(i)
+    elif team_name == "Team2":
+        return "Player2_" + str(i)
+    elif team_name == "Team3":
+        return "Goal1"
+    elif team_name == "Team4":
+        return "Goal2"
+    return "Referee"
 
 
-def create_player_texure(path_team_texture, path_player_texture, team_name, soctool):
-    colors = choose_sport_wear_random_color(2)
-    if team_name == "Team5":
-        percent_to_be_black = soctool.my_skin_referee
-    else:
-        percent_to_be_black = soctool.my_skin_player
-        
-    if bool_from_percent(percent_to_be_black):
-        hair_color = random.choice([[35, 18, 11],
-                                    [61, 35, 20],
-                                    [90, 56, 37],
-                                    [35, 18, 11],
-                                    [61, 35, 20],
-                                    [90, 56, 37]])
-
-        skin_color = random.choice([[161, 102, 94],
-                                    [80, 51, 53],
-                                    [99, 82, 61]])
-    else:
-        hair_color = random.choice([[35, 18, 11],
-                                    [61, 35, 20],
-                                    [90, 56, 37],
-                                    [251, 231, 161],
-                                    [241, 204, 143],
-                                    [35, 18, 11],
-                                    [61, 35, 20],
-                                    [90, 56, 37],
-                                    [251, 231, 161],
-                                    [241, 204, 143],
-                                    [255, 147, 33]])
-
-        skin_color = random.choice([[197, 140, 133],
-                                    [236, 188, 180],
-                                    [209, 163, 164]])
-    if team_name != "Team5":
-        color_in_order = [append_item_to_cpy_list(colors[0], 8),
-                          append_item_to_cpy_list(colors[1], 9),
-                          append_item_to_cpy_list(hair_color, 1),
-                          append_item_to_cpy_list(skin_color, 2)]
-    else:
-        color_in_order = [append_item_to_cpy_list(hair_color, 1),
-                          append_item_to_cpy_list(skin_color, 2)]
+# One material per player slot, kept between generations (fake user) : only the image and the
+# groundtruth color change
+def get_pooled_material(slot_name):
+    material_obj = bpy.data.materials.get(slot_name + "-PoolMaterial")
+
+    if material_obj is None:
+        material_obj = bpy.data.materials.new(slot_name + "-PoolMaterial")
+        material_obj.use_nodes = True
+        material_obj.use_fake_user = True
 
-    create_texture(path_team_texture, path_player_texture, color_in_order)
+        bsdf = material_obj.node_tree.nodes["Principled BSDF"]
+        texImage = material_obj.node_tree.nodes.new("ShaderNodeTexImage")
+        texImage.name = "PoolTexture"
+        material_obj.node_tree.links.new(bsdf.inputs["Base Color"], texImage.outputs["Color"])
+    return material_obj
 
 
-def apply_texture_to_player(player_name, path_player_texture):
+def apply_pooled_material(player_name, slot_name, image):
+    material_obj = get_pooled_material(slot_name)
+    texImage = material_obj.node_tree.nodes["PoolTexture"]
+    if texImage.image != image:
+        texImage.image = image
+
+    materials = bpy_o[player_name].data.materials
+    if len(materials) == 0:
+        materials.append(material_obj)
+    elif materials[0] != material_obj:
+        materials[0] = material_obj
+
+
+def apply_texture_to_player(player_name, path_player_texture, image=None):
     material_obj = bpy.data.materials.new(player_name + '-Material')
     material_obj.use_nodes = True
 
     bsdf = material_obj.node_tree.nodes["Principled BSDF"]
     texImage = material_obj.node_tree.nodes.new("ShaderNodeTexImage")
-    texImage.image = bpy.data.images.load(path_player_texture)
+    if image is None:
+        image = bpy.data.images.load(path_player_texture)
+    texImage.image = image
     material_obj.node_tree.links.new(bsdf.inputs["Base Color"], texImage.outputs["Color"])
     bpy_o[player_name].data.materials.append(material_obj)
 
 
+# Groundtruth class of the goalkeepers (color decoded by Other_Scripts/annotation.py), also used by the projected labels
+goal_classes = {"Team3": "Goal2", "Team4": "Goal1"}
+goal_teams = {"GoalBody1": "Team3", "GoalBody2": "Team4"}
+groundtruth_colors = {"Goal1": (8, 14, 204), "Goal2": (204, 70, 0), "Referee": (119, 86, 92)}
+
+
 def change_groundtruth_color(player_name, team_name, i):
     if team_name == "Team1":
         gt_color = (i/255, 130/255, 0, 1)
     elif team_name == "Team2":
         gt_color = (190 / 255, i/255, 0, 1)
-    elif team_name == "Team3":
-        gt_color = (204/255, 70/255, 0, 1)
-    elif team_name == "Team4":
-        gt_color = (8/255, 14/255, 204/255, 1)
     else:
-        gt_color = (119/255, 86/255, 92/255, 1)
+        color = groundtruth_colors[goal_classes.get(team_name, "Referee")]
+        gt_color = (color[0]/255, color[1]/255, color[2]/255, 1)
 
     bpy_o[player_name].active_material.diffuse_color = gt_color
     bpy_o[player_name].active_material.roughness = 1
 
 
-def change_player_texture(soctool, player_name, team_name, i, gen_nb, model_type):
+# Player textures made since the last team textures (a culled player gets his when he is seen)
+player_textures = set()
+
+
+@soccer_timing.timed("create_team_textures")
+def create_team_textures(soctool, scene):
+    texture_path = soctool.my_path_dir + "Textures" + get_separator()
+    save = not soctool.my_texture_in_memory or soctool.my_texture_save_png
+
+    create_tmp_dir(soctool.my_path_dir, True)
+    player_textures.clear()
+    for t, team_name in enumerate(soccer_scene.team_names):
+        create_team_texture(texture_path, team_name, scene["team_vertical"][t],
+                            soccer_scene.get_team_color_changes(scene, t), save)
+
+
+# The colors come from the scene (slot = index in soccer_scene.slot_names)
+@soccer_timing.timed("change_player_texture")
+def change_player_texture(soctool, player_name, team_name, i, gen_nb, scene, slot):
     my_new_texture_ = soctool.my_new_texture
     texture_path = soctool.my_path_dir + "Textures" + get_separator()
     path_team_texture = texture_path + "Textures_tmp" + get_separator() + team_name + "-texture.png"
     path_player_texture = texture_path + "Textures_tmp" + get_separator() + team_name + "-" + player_name + "-texture.png"
 
-    if gen_nb % soctool.my_change_texture_time == 0 and my_new_texture_:
-        if i == 1:
-            if team_name == "Team1":
-                create_tmp_dir(soctool.my_path_dir, True)
-            create_team_texture(soctool, texture_path, team_name, model_type)
-        create_player_texure(path_team_texture, path_player_texture, team_name, soctool)
-        
-        
-    if not os.path.isfile(path_player_texture):
-        create_player_texure(path_team_texture, path_player_texture, team_name, soctool)
-
-    apply_texture_to_player(player_name, path_player_texture)
+    player_colors = soccer_scene.get_player_color_changes(scene, slot)
+    in_memory = soctool.my_texture_in_memory
+    save = not in_memory or soctool.my_texture_save_png
+    data = None
+
+    if my_new_texture_ and path_player_texture not in player_textures:
+        data = create_player_texure(path_team_texture, path_player_texture, player_colors, save)
+        player_textures.add(path_player_texture)
+
+    image = None
+    if in_memory:
+        image = bpy.data.images.get(get_texture_image_name(path_player_texture))
+        if data is None and image is None:
+            data = create_player_texure(path_team_texture, path_player_texture, player_colors, save)
+        if data is not None:
+            image = push_texture_to_blender(path_player_texture, data)
+    else:
+        if not os.path.isfile(path_player_texture):
+            data = create_player_texure(path_team_texture, path_player_texture, player_colors)
+        if soctool.my_material_pool:
+            image = bpy.data.images.load(path_player_texture, check_existing=True)
+            if data is not None:
+                image.reload()
+
+    if soctool.my_material_pool:
+        apply_pooled_material(player_name, get_material_slot_name(team_name, i), image)
+    else:
+        apply_texture_to_player(player_name, path_player_texture, image)
     change_groundtruth_color(player_name, team_name, i)
 
 
@@ -941,8 +518,59 @@ def select_player_armature(obj):
     return obj
 
 
-def random_flip_armature(obj_to_flip):
-    if bool_from_percent(50):
+# Poses of the PlayerToCopy_* armatures and their flipped version, read once (name -> (pose, flipped))
+pose_cache = {}
+# Armature name -> name of the armature its current pose was copied from
+pose_sources = {}
+
+
+def read_pose(obj):
+    bones = obj.pose.bones
+    fields = {}
+    for field, size in soccer_pose.pose_fields.items():
+        values = np.empty(len(bones) * size, dtype=np.float32)
+        bones.foreach_get(field, values)
+        fields[field] = values
+    return soccer_pose.make_pose([b.name for b in bones], [b.rotation_mode for b in bones], **fields)
+
+
+# Bone values written directly, no mode switch nor selection (works with blender --background)
+def write_pose(obj, pose):
+    bones = obj.pose.bones
+    names = [b.name for b in bones]
+    if pose["names"] != names:
+        pose = soccer_pose.match_pose(pose, names, read_pose(obj))
+
+    for bone, rotation_mode in zip(bones, pose["rotation_mode"]):
+        if bone.rotation_mode != rotation_mode:
+            bone.rotation_mode = rotation_mode
+    for field in soccer_pose.pose_fields:
+        bones.foreach_set(field, pose[field].ravel())
+    obj.update_tag()
+
+
+def get_cached_pose(obj):
+    if obj.name not in pose_cache:
+        pose = read_pose(obj)
+        pose_cache[obj.name] = (pose, soccer_pose.mirror_pose(pose))
+    return pose_cache[obj.name]
+
+
+# The flipped pose of the copied armature is cached, the current pose is mirrored otherwise
+def flip_pose(obj_to_flip):
+    source = pose_sources.pop(obj_to_flip.name, None)
+    if source is not None:
+        write_pose(obj_to_flip, get_cached_pose(bpy_o[source])[1])
+    else:
+        write_pose(obj_to_flip, soccer_pose.mirror_pose(read_pose(obj_to_flip)))
+
+
+@soccer_timing.timed("flip_armature")
+def flip_armature(obj_to_flip, flip, pose_data=False):
+    if flip:
+        if pose_data:
+            flip_pose(obj_to_flip)
+            return
         #print("FLIP ->" + str(obj_to_flip.name))
         select_player_armature(obj_to_flip)
         bpy.ops.object.mode_set(mode="POSE")
@@ -954,7 +582,13 @@ def random_flip_armature(obj_to_flip):
         #print("NO FLIP ->" + str(obj_to_flip.name))
 
 
-def copy_paste_armature(obj_to_copy, obj_to_paste):
+@soccer_timing.timed("copy_paste_armature")
+def copy_paste_armature(obj_to_copy, obj_to_paste, pose_data=False):
+    if pose_data:
+        write_pose(obj_to_paste, get_cached_pose(obj_to_copy)[0])
+        pose_sources[obj_to_paste.name] = obj_to_copy.name
+        return
+
     obj = select_player_armature(obj_to_copy)
     bpy.ops.object.mode_set(mode="POSE")
     bpy.ops.pose.select_all(action='SELECT')
@@ -968,32 +602,8 @@ def copy_paste_armature(obj_to_copy, obj_to_paste):
     bpy.ops.object.mode_set(mode="OBJECT")
 
 
-def get_armature_model_goal(soctool):
-    if bool_from_float_percent(soctool.my_ar_other): #5
-        return "PlayerToCopy_other_" + str(random.randint(1, 2))
-
-    if bool_from_percent(soctool.my_ar_running): #5
-        return "PlayerToCopy_running_" + str(random.randint(1, 8))
-
-    if bool_from_percent(soctool.my_ar_moving): #20
-        return "PlayerToCopy_moving_" + str(random.randint(1, 8))
-
-    if bool_from_percent(soctool.my_ar_walking): # 20
-        return "PlayerToCopy_walking_" + str(random.randint(1, 10))
-    return "PlayerToCopy_goaling_" + str(random.randint(1, 5))
-
-
-def get_armature_model_player(running_prob, soctool, referee=False):
-    if bool_from_float_percent(soctool.my_ar_p_other) and not referee:
-        return "PlayerToCopy_other_" + str(random.randint(1, 1))
-
-    if bool_from_percent(running_prob) and soctool.my_ar_p_running:
-        return  "PlayerToCopy_running_" + str(random.randint(1, 8))
-
-    if bool_from_percent(soctool.my_ar_p_moving):
-        return "PlayerToCopy_moving_" + str(random.randint(1, 8))
-    
-    return "PlayerToCopy_walking_" + str(random.randint(1, 10))
+def get_pose_model(scene, slot):
+    return soccer_scene.pose_models[scene["slot_pose"][slot]]
 
 
 # ------------------------------------------------------------------------
@@ -1003,36 +613,41 @@ def get_armature_model_player(running_prob, soctool, referee=False):
 # ------------------------------------------------------------------------
 
 
-def generation_goal(soctool, gen_nb):
+def generation_goal(soctool, gen_nb, scene):
     goal1 = bpy_o["GoalMan1"]
     goal2 = bpy_o["GoalMan2"]
-    goal_pos_1 = get_location_goal("goal1")
-    goal_pos_2 = get_location_goal("goal2")
-
-    move_goals(goal1, goal2, goal_pos_1, goal_pos_2)
-
-    change_player_texture(soctool, "GoalBody1", "Team3", 1, gen_nb, "goal")
-    change_player_texture(soctool, "GoalBody2", "Team4", 1, gen_nb, "goal")
-
-    copy1 = bpy_o[outliner_structure[get_armature_model_goal(soctool)]]
-    copy_paste_armature(copy1, goal1)
-    goal1.location.z = copy1.location.z
-    goal1.rotation_euler.x = copy1.rotation_euler.x
-    random_flip_armature(goal1)
-    random_scale(goal1)
-
-    copy2 = bpy_o[outliner_structure[get_armature_model_goal(soctool)]]
-    copy_paste_armature(copy2, goal2)
-    goal2.location.z = copy2.location.z
-    goal2.rotation_euler.x = copy2.rotation_euler.x
-    random_flip_armature(goal2)
-    random_scale(goal2)
-    
+    slot1, slot2 = soccer_scene.goal_slots
+
+    move_goals(goal1, goal2, scene["slot_location"][slot1], scene["slot_location"][slot2],
+               [scene["slot_rotation"][slot1], scene["slot_rotation"][slot2]])
+
+    setup_goal(soctool, gen_nb, scene, goal1, "GoalBody1", "Team3", slot1)
+    setup_goal(soctool, gen_nb, scene, goal2, "GoalBody2", "Team4", slot2)
+
+
+# A culled goalkeeper is only hidden (no texture, no pose)
+def setup_goal(soctool, gen_nb, scene, goal, body_name, team_name, slot):
+    culled = is_culled(soctool, scene, slot)
+    for obj in [goal, bpy_o[body_name]]:
+        obj.hide_viewport = culled
+        obj.hide_render = culled
+    if culled:
+        return
+
+    change_player_texture(soctool, body_name, team_name, 1, gen_nb, scene, slot)
+
+    copy = bpy_o[outliner_structure[get_pose_model(scene, slot)]]
+    copy_paste_armature(copy, goal, soctool.my_pose_data)
+    goal.location.z = copy.location.z
+    goal.rotation_euler.x = copy.rotation_euler.x
+    flip_armature(goal, scene["slot_flip"][slot], soctool.my_pose_data)
+    set_scale(goal, scene["slot_scale"][slot])
+
+
     
-def generation_referee(soctool, gen_nb, ball_y):
-    player_type_tmp = get_armature_model_player(30, soctool, True)
-    location = get_location_referee(ball_y)
-    create_new_player_col(soctool, "Player5_1", 1, gen_nb, "Team5", player_type_tmp, location)
+def generation_referee(soctool, gen_nb, scene):
+    if not is_culled(soctool, scene, soccer_scene.referee_slot):
+        create_new_player_col(soctool, "Player5_1", 1, gen_nb, "Team5", scene, soccer_scene.referee_slot)
 
 
 # ------------------------------------------------------------------------
@@ -1042,6 +657,7 @@ def generation_referee(soctool, gen_nb, ball_y):
 # ------------------------------------------------------------------------
 
 
+@soccer_timing.timed("duplicate_player")
 def duplicate_player(new_col, team_name, collection_to_copy):
     global outliner_structure
 
@@ -1064,67 +680,156 @@ def duplicate_player(new_col, team_name, collection_to_copy):
     return dupli_obj
 
 
-def create_new_player_col(soctool, col_name, i, gen_nb, team_name, collection_to_copy, location=[34.8, -54.591]):
-    jitter_angle = soctool.my_rotation_jitter
-    dir_path = soctool.my_path_dir
+# ------------------------------------------------------------------------
+#
+#    Players pool
+#
+# ------------------------------------------------------------------------
+
+
+def is_pool_collection(collection):
+    return any(obj.name == collection.name + "-Rig" for obj in collection.objects)
+
+
+# Unused slots stay hidden, clear_teams_col hides every slot before a new generation
+def hide_pool_collection(collection, hide=True):
+    for obj in collection.objects:
+        obj.hide_viewport = hide
+        obj.hide_render = hide
+        if hide and obj.type == "MESH":
+            obj.data.materials.clear()
+
+
+# One rig per slot (Player1_1..Player2_10, Player5_1), duplicated once from PlayerToCopy
+@soccer_timing.timed("get_pooled_rig")
+def get_pooled_rig(col_name, team_name):
+    collection = bpy_c.get(col_name)
+    if collection is not None and is_pool_collection(collection):
+        hide_pool_collection(collection, False)
+        return bpy_o[col_name + "-Rig"]
+
+    if collection is not None:
+        for obj in collection.objects:
+            bpy_o.remove(obj, do_unlink=True)
+        bpy_c.remove(collection)
+    collection = bpy_c.new(name=col_name)
+    bpy_c[team_name].children.link(collection)
+
+    rig = duplicate_player(collection, team_name, "PlayerToCopy")
+    body = [obj for obj in collection.objects if obj != rig][0]
+    rig.name = col_name + "-Rig"
+    body.name = col_name + "-RigBody"
+    return rig
+
+
+def setup_pooled_player(soctool, col_name, i, gen_nb, team_name, scene, slot):
+    rig = get_pooled_rig(col_name, team_name)
+
+    copy = bpy_o[outliner_structure[get_pose_model(scene, slot)]]
+    copy_paste_armature(copy, rig, soctool.my_pose_data)
+    rig.location.x = scene["slot_location"][slot][0]
+    rig.location.y = scene["slot_location"][slot][1]
+    rig.location.z = copy.location.z
+    rig.rotation_euler.x = copy.rotation_euler.x
+    rig.rotation_euler.y = copy.rotation_euler.y
+    rig.rotation_euler[2] = scene["slot_rotation"][slot]
+
+    change_player_texture(soctool, col_name + "-RigBody", team_name, i, gen_nb, scene, slot)
+
+    flip_armature(rig, scene["slot_flip"][slot], soctool.my_pose_data)
+    set_scale(rig, scene["slot_scale"][slot])
+
+
+def create_new_player_col(soctool, col_name, i, gen_nb, team_name, scene, slot):
+    if soctool.my_rig_pool:
+        setup_pooled_player(soctool, col_name, i, gen_nb, team_name, scene, slot)
+        return
+
+    collection_to_copy = get_pose_model(scene, slot)
     new_col = bpy_c.new(name=col_name)
 
     bpy_c[team_name].children.link(new_col)
 
     new_player = duplicate_player(new_col, team_name, collection_to_copy)
+    pose_sources[new_player.name] = outliner_structure[collection_to_copy]
 
-    new_player.location.x = location[0]
-    new_player.location.y = location[1]
+    new_player.location.x = scene["slot_location"][slot][0]
+    new_player.location.y = scene["slot_location"][slot][1]
+    new_player.rotation_euler[2] = scene["slot_rotation"][slot]
 
-    rotate_player(new_player, jitter_angle)
-    change_player_texture(soctool, get_body_name(new_player), team_name, i, gen_nb, "player")
+    change_player_texture(soctool, get_body_name(new_player), team_name, i, gen_nb, scene, slot)
 
-    random_flip_armature(new_player)
-    random_scale(new_player)
-    
-    
-def move_sun_ball(soctool, positions_choice_method):
-    ball_location = get_location(positions_choice_method)
-    sun_rotation = get_location_sun()
+    flip_armature(new_player, scene["slot_flip"][slot], soctool.my_pose_data)
+    set_scale(new_player, scene["slot_scale"][slot])
 
-    if bool_from_percent(soctool.my_sun_chance):
-        move_sun(sun_rotation)
-    else:
-        move_sun()
 
-    move_ball(ball_location)
-    return ball_location[1]
+# ------------------------------------------------------------------------
+#
+#    Scenes
+#
+# ------------------------------------------------------------------------
+
 
+# Last scene applied (the Render button uses its camera)
+current_scene = {}
 
-def new_generation(soctool, gen_nb, one_gen=True):
-    positions_choice_method = choose_position_method(soctool)
-    ball_y = move_sun_ball(soctool, positions_choice_method)
-    sun_rdm_param()
-    running_prob = random.randint(10, 90)
 
-    #if one_gen:
-    nb_players_1 = soctool.my_nb_player_team1 + 1
-    nb_players_2 = soctool.my_nb_player_team2 + 1
-    #else:
-    #    nb_players_1 = int(gaussian_rdm(8, 3, 0, 10.99)) + 1
-    #    nb_players_2 = int(gaussian_rdm(8, 3, 0, 10.99)) + 1
-
-    for i in range(1, nb_players_1):
-        player_type_tmp = get_armature_model_player(running_prob, soctool)
-        #player_type_tmp = "PlayerToCopy_running_1"
-        location = get_location(positions_choice_method)
-        create_new_player_col(soctool, "Player1_" + str(i), i, gen_nb, "Team1", player_type_tmp, location)
-        #print("Player1_" + str(i) + " = " + str(player_type_tmp))
-
-    for i in range(1, nb_players_2):
-        player_type_tmp = get_armature_model_player(running_prob, soctool)
-        #player_type_tmp = "PlayerToCopy_running_1"
-        location = get_location(positions_choice_method)
-        create_new_player_col(soctool, "Player2_" + str(i), i, gen_nb, "Team2", player_type_tmp, location)
-        #print("Player2_" + str(i) + " = " + str(player_type_tmp))
-        
-    generation_goal(soctool, gen_nb)
-    generation_referee(soctool, gen_nb, ball_y)  
+# Scene of the sample gen_nb + my_first_name_generation : from the scenes file, or sampled (soccer_scene.py,
+# the same sample always gets the same scene when my_seed >= 0)
+def get_generation_scene(soctool, gen_nb):
+    frame = gen_nb + soctool.my_first_name_generation
+    if soctool.my_scene_file != "":
+        return soccer_scene.get_file_scene(bpy.path.abspath(soctool.my_scene_file), frame)
+    return soccer_scene.get_scene(soctool, soctool.my_seed, frame)
+
+
+# New textures for the first sample of a run and for the first sample of every texture period
+def is_texture_generation(scene, gen_nb):
+    return gen_nb == 0 or scene["texture_frame"] == scene["frame"]
+
+
+# Slots out of the view of the camera (with a margin, soccer_frustum.cull_margin) are not set up
+def is_culled(soctool, scene, slot):
+    return soctool.my_cull and not scene["slot_near_view"][slot]
+
+
+def count_culled(soctool, scene):
+    if not soctool.my_cull:
+        return 0
+    return int(np.sum(scene["slot_active"] & ~scene["slot_near_view"]))
+
+
+# ------------------------------------------------------------------------
+#
+#    Generation
+#
+# ------------------------------------------------------------------------
+
+
+# Only pushes the scene in Blender, every random choice is already in it
+def apply_scene(soctool, gen_nb, scene):
+    move_sun([float(v) for v in scene["sun"]] + [float(scene["sun_strength"])])
+    move_ball([float(v) for v in scene["ball"]])
+
+    if is_texture_generation(scene, gen_nb) and soctool.my_new_texture:
+        create_team_textures(soctool, scene)
+
+    for slot in range(20):
+        if scene["slot_active"][slot] and not is_culled(soctool, scene, slot):
+            create_new_player_col(soctool, soccer_scene.slot_names[slot], slot % 10 + 1, gen_nb,
+                                  soccer_scene.slot_teams[slot], scene, slot)
+
+    generation_goal(soctool, gen_nb, scene)
+    generation_referee(soctool, gen_nb, scene)
+    current_scene["scene"] = scene
+
+
+@soccer_timing.timed("new_generation")
+def new_generation(soctool, gen_nb, scene=None):
+    if scene is None:
+        scene = get_generation_scene(soctool, gen_nb)
+    apply_scene(soctool, gen_nb, scene)
+    return scene
 
 
 # ------------------------------------------------------------------------
@@ -1177,6 +882,7 @@ def create_final_directories(path_dir):
 #    bpy.context.space_data.show_object_viewport_light = bool
 
 
+@soccer_timing.timed("render_in_render_mode")
 def render_in_render_mode(path_render, i):
     bpy.context.scene.render.engine = 'BLENDER_EEVEE'
     bpy.context.scene.display_settings.display_device = 'sRGB'
@@ -1186,6 +892,7 @@ def render_in_render_mode(path_render, i):
     bpy.ops.render.render(animation=False, write_still=True)
 
 
+@soccer_timing.timed("render_in_solid_mode")
 def render_in_solid_mode(path_groundtruth, i):
     bpy.context.scene.render.engine = 'BLENDER_WORKBENCH'
     bpy.context.scene.display_settings.display_device = 'None'
@@ -1201,22 +908,133 @@ def render_in_solid_mode(path_groundtruth, i):
     bpy.context.scene.world.color = (0.050876, 0.050876, 0.050876)
     
 
-def render_and_save(soctool, i, path_render="", path_groundtruth=""):
-    center_camera()
+# ------------------------------------------------------------------------
+#
+#    Projected labels
+#
+# ------------------------------------------------------------------------
+
+
+def get_label_objects():
+    objects = [("Ball", bpy_o["Ball"])] + [(goal_classes[team], bpy_o[body]) for body, team in goal_teams.items()]
+
+    for collection in bpy_c:
+        col_type = collection.name.split("_")[0]
+        if col_type not in ["Player1", "Player2", "Player5"]:
+            continue
+        name = "Referee" if col_type == "Player5" else collection.name
+        for obj in collection.objects:
+            if obj.type == "MESH":
+                objects.append((name, obj))
+    return objects
+
+
+# Vertices after the armature deformation, in world space
+def get_world_vertices(obj, depsgraph):
+    meshes = [obj] if obj.type == "MESH" else [c for c in obj.children_recursive if c.type == "MESH"]
+    vertices = [np.zeros((0, 3))]
+
+    for mesh_obj in meshes:
+        obj_eval = mesh_obj.evaluated_get(depsgraph)
+        mesh = obj_eval.to_mesh()
+        co = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", co)
+        obj_eval.to_mesh_clear()
+
+        matrix = np.array(obj_eval.matrix_world)
+        vertices.append(co.reshape(-1, 3) @ matrix[:3, :3].T + matrix[:3, 3])
+    return np.concatenate(vertices)
+
+
+@soccer_timing.timed("write_projected_labels")
+def write_projected_labels(path_labels, i, label_profile="24_classes"):
+    scene = bpy.context.scene
+    camera = bpy_o["Camera"]
+    bpy.context.view_layer.update()
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+
+    res_x = int(scene.render.resolution_x * scene.render.resolution_percentage / 100)
+    res_y = int(scene.render.resolution_y * scene.render.resolution_percentage / 100)
+    world_to_camera = np.array(camera.matrix_world.inverted())
+
+    detections = []
+    for name, obj in get_label_objects():
+        if obj.hide_render:
+            continue
+        pixels = soccer_projection.project_points(get_world_vertices(obj, depsgraph), world_to_camera,
+                                                  camera.data.angle, res_x, res_y, camera.data.sensor_fit,
+                                                  camera.data.shift_x, camera.data.shift_y, camera.data.clip_start)
+        box = soccer_projection.get_box(pixels, res_x, res_y)
+        if box is not None:
+            detections.append([name, box])
+
+    text = soccer_projection.format_labels(detections, res_x, res_y, soccer_projection.class_profiles[label_profile])
+    soccer_projection.write_labels(path_labels + get_separator() + str(i) + ".txt", text)
+
+
+def get_labels_directory(path_groundtruth):
+    path_labels = os.path.dirname(path_groundtruth) + get_separator() + "labels"
+    if not os.path.exists(path_labels):
+        os.mkdir(path_labels)
+    return path_labels
+
+
+# The renders go to the save directory when no output directory is given
+def get_output_dir(soctool):
+    if soctool.my_output_dir != "":
+        return soctool.my_output_dir
+    return soctool.my_path_dir
+
+
+def render_and_save(soctool, i, path_render="", path_groundtruth="", scene=None):
+    if scene is None:
+        scene = current_scene.get("scene") or get_generation_scene(soctool, i - 1)
+    move_camera(scene["camera_location"], scene["camera_focus"], scene["camera_angle"])
     
     if i == 1:
         if soctool.my_new_texture:
-            path_render, path_groundtruth = create_final_directories(soctool.my_path_dir)
+            path_render, path_groundtruth = create_final_directories(get_output_dir(soctool))
         else:
-            path_render, path_groundtruth = create_directories(soctool.my_path_dir)
+            path_render, path_groundtruth = create_directories(get_output_dir(soctool))
     
     i_added = i + soctool.my_first_name_generation - 1
     render_in_render_mode(path_render, i_added)
-    render_in_solid_mode(path_groundtruth, i_added)
+    if soctool.my_projected_labels:
+        write_projected_labels(get_labels_directory(path_groundtruth), i_added, soctool.my_label_profile)
+    else:
+        render_in_solid_mode(path_groundtruth, i_added)
     
     return path_render, path_groundtruth
 
 
+def get_trace_path(soctool):
+    if not soctool.my_trace:
+        return None
+    return get_output_dir(soctool) + "trace.jsonl"
+
+
+# Same loop for the "Many times" button and the headless generation (soccer_cli.py)
+# Returns one record per generation : frame, culled slots and time of every span (soccer_timing.py)
+def generate_and_render_many(soctool):
+    path_render = None
+    path_groundtruth = None
+    frames = []
+    soccer_timing.start_run(get_trace_path(soctool))
+
+    for i in range(soctool.my_generations):
+        clear_scene(soctool.my_path_dir, soctool.my_rig_pool)
+        scene = new_generation(soctool, i)
+        with soccer_timing.span("render_and_save"):
+            path_render, path_groundtruth = render_and_save(soctool, i + 1, path_render, path_groundtruth, scene)
+        frames.append(soccer_timing.end_frame(i + soctool.my_first_name_generation,
+                                              culled=count_culled(soctool, scene)))
+        print("Generation " + str(i + 1) + "/" + str(soctool.my_generations) + " done")
+
+    soccer_timing.end_run()
+    soccer_timing.print_summary()
+    return frames
+
+
 # ------------------------------------------------------------------------
 #
 #    Scene Properties
@@ -1264,6 +1082,32 @@ class MyProperties(PropertyGroup):
         min=0,
         max=180
     )
+    my_min_distance: IntProperty(
+        name="Min distance (cm) :",
+        description="Minimum distance between players, goalkeepers and referee (0 : no minimum)",
+        default=0,
+        min=0,
+        max=1000
+    )
+    my_in_view: IntProperty(
+        name="Players in view (%) :",
+        description="Chances of a player to be placed in the view of the camera (100 : every player)",
+        default=0,
+        min=0,
+        max=100
+    )
+
+    my_cull: BoolProperty(
+        name="Skip players out of view",
+        description="Players, goalkeepers and referee out of the camera view are not created (no texture, no pose)",
+        default=False
+    )
+
+    my_trace: BoolProperty(
+        name="Timing trace",
+        description="Writes the time of every stage of every generation in trace.jsonl (output directory)",
+        default=False
+    )
 
     my_path_dir: StringProperty(
         name="Save directory",
@@ -1403,6 +1247,62 @@ class MyProperties(PropertyGroup):
         description="Disable or not running armature for players",
         default=True
     )
+    my_texture_in_memory: BoolProperty(
+        name="Textures in memory",
+        description="Give the generated textures to Blender directly instead of saving and loading PNG files",
+        default=False
+    )
+    my_texture_save_png: BoolProperty(
+        name="Save textures PNG",
+        description="Also save the in memory textures in Textures_tmp (debug)",
+        default=False
+    )
+    my_material_pool: BoolProperty(
+        name="Reuse materials",
+        description="Keep one material per player slot between generations instead of creating new ones",
+        default=False
+    )
+    my_rig_pool: BoolProperty(
+        name="Reuse players",
+        description="Keep one player per slot between generations (moved, posed and hidden) instead of duplicating new ones",
+        default=False
+    )
+    my_pose_data: BoolProperty(
+        name="Copy poses as data",
+        description="Copy and flip the poses by writing the bones values instead of using the pose clipboard",
+        default=False
+    )
+    my_projected_labels: BoolProperty(
+        name="Labels from geometry",
+        description="Write the YOLO labels from the projected meshes instead of rendering the groundtruth",
+        default=False
+    )
+    my_label_profile: EnumProperty(
+        name="Label classes",
+        description="Class ids of the labels from geometry (same profiles as annotation.py)",
+        items=[(p, p, "") for p in soccer_projection.class_profiles],
+        default="24_classes"
+    )
+    my_seed: IntProperty(
+        name="Seed :",
+        description="Seed of the generation, a sample only depends on the seed and its number (-1 : not reproducible)",
+        default=-1,
+        min=-1
+    )
+    my_scene_file: StringProperty(
+        name="Scenes file",
+        description="Scenes sampled by soccer_scene.py (empty : sampled during the generation)",
+        default="",
+        maxlen=1024,
+        subtype="FILE_PATH"
+    )
+    my_output_dir: StringProperty(
+        name="Output directory",
+        description="Directory of the renders (empty : save directory)",
+        default="",
+        maxlen=1024,
+        subtype="DIR_PATH"
+    )
 
 
 # ------------------------------------------------------------------------
@@ -1451,11 +1351,11 @@ class SP_OT_Generate(Operator):
         soctool = scene.soccer_tool
 
         now = time.time()
-        clear_scene(soctool.my_path_dir)
+        clear_scene(soctool.my_path_dir, soctool.my_rig_pool)
         print("Clear in : ", time.time() - now, "s")
 
         now = time.time()
-        new_generation(soctool, 0, True)
+        new_generation(soctool, 0)
         print("Generation in : ", time.time() - now, "s")
 
         return {"FINISHED"}
@@ -1485,9 +1385,9 @@ class SP_OT_Generate_And_Render(Operator):
         scene = context.scene
         soctool = scene.soccer_tool
 
-        clear_scene(soctool.my_path_dir)
-        new_generation(soctool, 0, True)
-        render_and_save(soctool, 1)
+        clear_scene(soctool.my_path_dir, soctool.my_rig_pool)
+        scene = new_generation(soctool, 0)
+        render_and_save(soctool, 1, scene=scene)
         return {"FINISHED"}
 
 
@@ -1501,19 +1401,7 @@ class SP_OT_Generate_And_Render_Many(Operator):
         scene = context.scene
         soctool = scene.soccer_tool
 
-        path_render = None
-        path_groundtruth = None
-
-        for i in range(soctool.my_generations):
-            now = time.time()
-            
-            clear_scene(soctool.my_path_dir)
-            print("Clear in : ", time.time() - now, "s")
-            new_generation(soctool, i, False)
-            print("Generation at : ", time.time() - now, "s")
-            path_render, path_groundtruth = render_and_save(soctool, i + 1, path_render, path_groundtruth)
-            print("Render at : ", time.time() - now, "s")
-            
+        generate_and_render_many(soctool)
         return {"FINISHED"}
 
 
@@ -1545,16 +1433,30 @@ class OBJECT_PT_SoccerPanel(Panel):
         box = layout.box()
         box.operator("sp.clean_scene")
         box.prop(soctool, "my_path_dir")
+        box.prop(soctool, "my_output_dir")
         box.operator("sp.open_images_dir")
         box.prop(soctool, "my_first_name_generation")
+        box.prop(soctool, "my_seed")
+        box.prop(soctool, "my_scene_file")
+        box.prop(soctool, "my_projected_labels")
+        box.prop(soctool, "my_label_profile")
+        box.prop(soctool, "my_trace")
 
         layout.label(text="Parameters")
         box = layout.box()
         box.prop(soctool, "my_sun_chance")
         box.prop(soctool, "my_rotation_jitter")
+        box.prop(soctool, "my_min_distance")
+        box.prop(soctool, "my_in_view")
+        box.prop(soctool, "my_cull")
         box.prop(soctool, "my_nb_player_team1")
         box.prop(soctool, "my_nb_player_team2")
         box.prop(soctool, "my_change_texture_time")
+        box.prop(soctool, "my_texture_in_memory")
+        box.prop(soctool, "my_texture_save_png")
+        box.prop(soctool, "my_material_pool")
+        box.prop(soctool, "my_rig_pool")
+        box.prop(soctool, "my_pose_data")
 
         layout.label(text="Sport wear parameters")
         box = layout.box()
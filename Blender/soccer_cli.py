@@ -0,0 +1,75 @@
+# /
+# ** Luis ROSARIO, 2023
+# ** soccer_cli.py
+# ** File description:
+# ** Headless generation (same pipeline as the "Many times" button, without the UI)
+# ** blender -b "[Soccer Arena] Win & Linux.blend" --python soccer_cli.py -- --config cfg.yaml --count N --start K --out DIR
+# ** https://github.com/Luisrosario2604
+# */
+
+
+# ------------------------------------------------------------------------
+#
+#    Imports
+#
+# ------------------------------------------------------------------------
+
+
+import os
+import sys
+import time
+import traceback
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import soccer_config
+
+
+# ------------------------------------------------------------------------
+#
+#    Summary
+#
+# ------------------------------------------------------------------------
+
+
+# The time of every stage is printed by generate_and_render_many (soccer_timing.py)
+def print_run(frames, total_time):
+    print("Generations : " + str(len(frames)) + " in " + str(round(total_time, 2)) + " s")
+    if len(frames) == 0:
+        return
+    print("Culled slots : " + str(round(sum(f["culled"] for f in frames) / len(frames), 2)) + " per generation (mean)")
+
+
+# ------------------------------------------------------------------------
+#
+#    Main
+#
+# ------------------------------------------------------------------------
+
+
+def main():
+    args = soccer_config.parse_cli_arguments(soccer_config.get_script_argv(sys.argv))
+
+    try:
+        settings = soccer_config.validate_config(soccer_config.load_config(args.config), args)
+    except (OSError, ValueError) as e:
+        print("Invalid config " + args.config + " :\n" + str(e))
+        return 84
+
+    # Imported after the config check : the add-on needs the scene of the .blend file
+    import soccer_addon
+
+    soctool = soccer_config.make_settings(settings)
+    now = time.time()
+    try:
+        frames = soccer_addon.generate_and_render_many(soctool)
+    except Exception:
+        traceback.print_exc()
+        return 84
+
+    print_run(frames, time.time() - now)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+# /
+# ** Luis ROSARIO, 2023
+# ** soccer_config.py
+# ** File description:
+# ** Configuration of the headless generation (same settings as the soccer panel)
+# ** No bpy here : the config can be loaded and checked outside Blender
+# ** https://github.com/Luisrosario2604
+# */
+
+
+# ------------------------------------------------------------------------
+#
+#    Imports
+#
+# ------------------------------------------------------------------------
+
+
+import argparse
+import json
+import os
+from types import SimpleNamespace
+
+import soccer_projection
+
+
+# ------------------------------------------------------------------------
+#
+#    Global
+#
+# ------------------------------------------------------------------------
+
+
+# Config key -> (type, default, min, max), the settings object gets the "my_" prefix (MyProperties names)
+# Same defaults and ranges as the panel, except the number and first name of the samples (no slider here)
+# and pose_data (on here, off in the panel)
+config_fields = {
+    "generations": (int, 2, 1, 100000000),
+    "sun_chance": (int, 30, 0, 100),
+    "nb_player_team1": (int, 10, 1, 10),
+    "nb_player_team2": (int, 10, 1, 10),
+    "rotation_jitter": (int, 80, 0, 180),
+    "min_distance": (int, 0, 0, 1000),
+    "in_view": (int, 0, 0, 100),
+    "cull": (bool, False, None, None),
+    "trace": (bool, False, None, None),
+    "path_dir": (str, None, None, None),
+    "output_dir": (str, "", None, None),
+    "scene_file": (str, "", None, None),
+    "sw_striped": (int, 40, 0, 100),
+    "sw_vertical": (int, 67, 0, 100),
+    "sw_pants_same_color_full": (int, 25, 0, 100),
+    "sw_pants_same_color_stiped": (int, 90, 0, 100),
+    "change_texture_time": (int, 10, 1, 100),
+    "new_texture": (bool, True, None, None),
+    "real_gen": (bool, False, None, None),
+    "first_name_generation": (int, 1, 1, 1000000000),
+    "seed": (int, -1, -1, 2147483647),
+    "lm_random": (int, 5, 0, 100),
+    "lm_squares": (int, 30, 0, 100),
+    "skin_referee": (int, 5, 0, 100),
+    "skin_player": (int, 50, 0, 100),
+    "ar_other": (int, 5, 0, 100),
+    "ar_running": (int, 5, 0, 100),
+    "ar_moving": (int, 20, 0, 100),
+    "ar_walking": (int, 20, 0, 100),
+    "ar_p_other": (float, 0.17, 0.0, 100.0),
+    "ar_p_moving": (int, 15, 0, 100),
+    "ar_p_running": (bool, True, None, None),
+    "texture_in_memory": (bool, False, None, None),
+    "texture_save_png": (bool, False, None, None),
+    "material_pool": (bool, False, None, None),
+    "rig_pool": (bool, False, None, None),
+    "pose_data": (bool, True, None, None),
+    "projected_labels": (bool, False, None, None),
+    "label_profile": (str, "24_classes", None, None)
+}
+
+
+# ------------------------------------------------------------------------
+#
+#    Arguments
+#
+# ------------------------------------------------------------------------
+
+
+# Blender gives the script arguments after "--"
+def get_script_argv(argv):
+    if "--" in argv:
+        return argv[argv.index("--") + 1:]
+    return []
+
+
+def parse_cli_arguments(argv):
+    ap = argparse.ArgumentParser(prog="blender -b scene.blend --python soccer_cli.py --")
+
+    ap.add_argument("-c", "--config", required=True, help="config file (.yaml or .json)")
+    ap.add_argument("-n", "--count", required=False, type=int, default=None, help="number of samples (config generations)")
+    ap.add_argument("-s", "--start", required=False, type=int, default=None, help="number of the first sample")
+    ap.add_argument("-o", "--out", required=False, default=None, help="output directory (config output_dir)")
+    ap.add_argument("--seed", required=False, type=int, default=None, help="seed of the generation (config seed)")
+    return ap.parse_args(argv)
+
+
+# ------------------------------------------------------------------------
+#
+#    Config
+#
+# ------------------------------------------------------------------------
+
+
+def load_config(path):
+    with open(path, 'r') as f:
+        if path.endswith(".json"):
+            return json.load(f)
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("PyYAML is needed to read " + str(path) + " (or use a .json config)")
+        return yaml.safe_load(f) or {}
+
+
+def add_separator(dir_path):
+    if dir_path != "" and not dir_path.endswith("/") and not dir_path.endswith("\\"):
+        dir_path += os.sep
+    return dir_path
+
+
+# Command line values replace the config ones, every error is reported at once
+def validate_config(config, args=None):
+    if not isinstance(config, dict):
+        raise ValueError("The config must be a mapping of settings")
+    config = dict(config)
+
+    if args is not None:
+        if args.count is not None:
+            config["generations"] = args.count
+        if args.start is not None:
+            config["first_name_generation"] = args.start
+        if args.out is not None:
+            config["output_dir"] = args.out
+        if args.seed is not None:
+            config["seed"] = args.seed
+
+    errors = ["Unknown setting : " + str(key) for key in config if key not in config_fields]
+    settings = {}
+
+    for key, (value_type, default, min_value, max_value) in config_fields.items():
+        value = config.get(key, default)
+        if value is None:
+            errors.append("Missing setting : " + key)
+            continue
+        if value_type is float and isinstance(value, int) and not isinstance(value, bool):
+            value = float(value)
+        if not isinstance(value, value_type) or (value_type is int and isinstance(value, bool)):
+            errors.append(key + " must be a " + value_type.__name__)
+            continue
+        if min_value is not None and not min_value <= value <= max_value:
+            errors.append(key + " must be between " + str(min_value) + " and " + str(max_value))
+            continue
+        settings[key] = value
+
+    if "path_dir" in settings:
+        settings["path_dir"] = add_separator(settings["path_dir"])
+        if not os.path.isdir(settings["path_dir"] + "Textures"):
+            errors.append("path_dir must be the Soccer_saves directory (Textures not found)")
+    if "output_dir" in settings:
+        settings["output_dir"] = add_separator(settings["output_dir"])
+        if settings["output_dir"] != "" and not os.path.isdir(settings["output_dir"]):
+            errors.append("output_dir not existing")
+    if settings.get("scene_file", "") != "" and not os.path.isfile(settings["scene_file"]):
+        errors.append("scene_file not existing")
+    if "label_profile" in settings and settings["label_profile"] not in soccer_projection.class_profiles:
+        errors.append("label_profile must be one of " + ", ".join(soccer_projection.class_profiles))
+
+    if len(errors) > 0:
+        raise ValueError("\n".join(errors))
+    return settings
+
+
+# Object with the same attributes as the soccer panel properties (scene.soccer_tool)
+def make_settings(settings):
+    return SimpleNamespace(**{"my_" + key: value for key, value in settings.items()})
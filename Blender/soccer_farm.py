@@ -0,0 +1,243 @@
+#!/usr/bin/python3
+# Importing python3 from local, just use "python3 <binary>" if is not the same location
+
+# /
+# ** Luis ROSARIO, 2023
+# ** soccer_farm.py
+# ** File description:
+# ** Split a generation in shards rendered by N headless Blender workers (soccer_cli.py), then merge them
+# ** https://github.com/Luisrosario2604
+# */
+
+# Imports
+import argparse
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import time
+from tqdm import tqdm
+
+import soccer_config
+
+# Global
+# Split in arguments before the values are put in : paths with spaces or backslashes stay one argument
+default_worker_command = "{blender} -b {blend} --python {cli} -- --config {config} --count {count} --start {start} " \
+                         "--out {out} --seed {seed}"
+
+output_dirs = ["render", "groundtruth", "labels"]
+
+
+# Function declarations
+def get_arguments():
+    ap = argparse.ArgumentParser()
+
+    ap.add_argument("-c", "--config", required=True, help="config file of the workers (.yaml or .json)")
+    ap.add_argument("-n", "--count", required=True, type=int, help="number of samples")
+    ap.add_argument("-s", "--start", required=False, type=int, default=1, help="number of the first sample")
+    ap.add_argument("-o", "--out", required=True, help="output directory (final_render/ is created inside)")
+    ap.add_argument("-w", "--workers", required=False, type=int, default=os.cpu_count(), help="number of workers")
+    ap.add_argument("--seed", required=False, type=int, default=None, help="base seed of the generation (config seed)")
+    ap.add_argument("--blend", required=False, default="[Soccer Arena] Win & Linux.blend", help="path of the .blend file")
+    ap.add_argument("--blender", required=False, default="blender", help="path of the Blender executable")
+    ap.add_argument("--worker-command", required=False, default=default_worker_command,
+                    help="worker command ({blender} {blend} {cli} {config} {count} {start} {out} {seed})")
+    ap.add_argument("--retries", required=False, type=int, default=3, help="restarts of a crashed worker")
+    ap.add_argument("--poll", required=False, type=float, default=2, help="seconds between two progress checks")
+    args = vars(ap.parse_args())
+
+    if args["count"] < 1 or args["start"] < 1 or args["workers"] < 1:
+        print("count, start and workers must be positive")
+        exit(84)
+    if not os.path.isfile(args["config"]):
+        print("Config not existing")
+        exit(84)
+    if not os.path.isdir(args["out"]):
+        print("Folder not existing")
+        exit(84)
+
+    args["out"] = soccer_config.add_separator(args["out"])
+    return args
+
+
+# The workers use the final_render/ layout, the config is checked once here instead of in every worker
+def check_config(config_path):
+    try:
+        settings = soccer_config.validate_config(soccer_config.load_config(config_path))
+    except (OSError, ValueError) as e:
+        print("Invalid config " + config_path + " :\n" + str(e))
+        exit(84)
+    if not settings["new_texture"]:
+        print("Invalid config " + config_path + " :\nnew_texture must be true (final_render/ layout)")
+        exit(84)
+    return settings
+
+
+# Contiguous ranges [start, start + count[ : the same arguments always give the same shards
+def get_shards(count, start, workers):
+    workers = min(workers, count)
+    size, rest = divmod(count, workers)
+    shards = []
+    for n in range(workers):
+        shard_count = size + (1 if n < rest else 0)
+        shards.append({"id": n, "start": start, "count": shard_count, "retries": 0, "process": None})
+        start += shard_count
+    return shards
+
+
+def get_shard_dir(out, shard):
+    return out + "shards" + os.sep + "shard_" + str(shard["id"]) + os.sep
+
+
+def get_stems(dir_path):
+    if not os.path.isdir(dir_path):
+        return set()
+    return {os.path.splitext(f)[0] for f in os.listdir(dir_path)}
+
+
+# A sample is done when its render and its groundtruth (or labels) are written, the groundtruth is written last
+def get_done_frames(shard_dir):
+    final_dir = shard_dir + "final_render" + os.sep
+    renders = get_stems(final_dir + "render")
+    groundtruths = get_stems(final_dir + "groundtruth") | get_stems(final_dir + "labels")
+    return {int(s) for s in renders & groundtruths if s.isdigit()}
+
+
+# Samples of a previous run can already be merged in final_render/
+def get_shard_done_frames(args, shard):
+    return get_done_frames(get_shard_dir(args["out"], shard)) | get_done_frames(args["out"])
+
+
+# First sample of the shard not done yet (the worker restarts from there), None when the shard is finished
+def get_next_frame(shard, done):
+    for frame in range(shard["start"], shard["start"] + shard["count"]):
+        if frame not in done:
+            return frame
+    return None
+
+
+# Quotes around a whole argument are kept by shlex on Windows (posix=False keeps the backslashes of the paths)
+def get_worker_argv(worker_command, values):
+    argv = []
+    for token in shlex.split(worker_command, posix=(os.name != "nt")):
+        if len(token) >= 2 and token[0] == token[-1] and token[0] in "\"'":
+            token = token[1:-1]
+        argv.append(token.format(**values))
+    return argv
+
+
+def start_worker(args, shard, frame):
+    shard_dir = get_shard_dir(args["out"], shard)
+    os.makedirs(shard_dir, exist_ok=True)
+
+    argv = get_worker_argv(args["worker_command"], {
+        "blender": args["blender"],
+        "blend": args["blend"],
+        "cli": os.path.join(os.path.dirname(os.path.abspath(__file__)), "soccer_cli.py"),
+        "config": args["config"],
+        "count": shard["start"] + shard["count"] - frame,
+        "start": frame,
+        "out": os.path.normpath(shard_dir),
+        "seed": args["seed"]
+    })
+    with open(shard_dir + "worker.log", 'a') as log:
+        log.write("$ " + subprocess.list2cmdline(argv) + "\n")
+        log.flush()
+        shard["process"] = subprocess.Popen(argv, stdout=log, stderr=subprocess.STDOUT)
+
+
+def count_done(args, shards):
+    total = 0
+    for shard in shards:
+        done = get_shard_done_frames(args, shard)
+        total += len([f for f in done if shard["start"] <= f < shard["start"] + shard["count"]])
+    return total
+
+
+# Returns the shards that could not be finished
+def run_shards(args, shards):
+    failed = []
+    running = []
+    for shard in shards:
+        frame = get_next_frame(shard, get_shard_done_frames(args, shard))
+        if frame is not None:
+            start_worker(args, shard, frame)
+            running.append(shard)
+
+    progress = tqdm(total=args["count"], initial=count_done(args, shards))
+    while len(running) > 0:
+        time.sleep(args["poll"])
+
+        for shard in list(running):
+            if shard["process"].poll() is None:
+                continue
+            frame = get_next_frame(shard, get_shard_done_frames(args, shard))
+            if frame is None:
+                running.remove(shard)
+            elif shard["retries"] < args["retries"]:
+                shard["retries"] += 1
+                tqdm.write("Shard " + str(shard["id"]) + " stopped (code " + str(shard["process"].returncode) +
+                           "), restart from " + str(frame))
+                start_worker(args, shard, frame)
+            else:
+                tqdm.write("Shard " + str(shard["id"]) + " failed at " + str(frame) + " (see " +
+                           get_shard_dir(args["out"], shard) + "worker.log)")
+                running.remove(shard)
+                failed.append(shard)
+
+        progress.update(count_done(args, shards) - progress.n)
+    progress.close()
+    return failed
+
+
+# Timing traces of the workers (config trace: true) appended in [out]/trace.jsonl
+def merge_trace(args, shard_dir):
+    if not os.path.isfile(shard_dir + "trace.jsonl"):
+        return
+    with open(shard_dir + "trace.jsonl", 'r') as shard_trace, open(args["out"] + "trace.jsonl", 'a') as trace:
+        shutil.copyfileobj(shard_trace, trace)
+
+
+# Sample names are already unique (start indices), so the files are only moved
+def merge_shards(args, shards):
+    for shard in shards:
+        shard_dir = get_shard_dir(args["out"], shard)
+        for name in output_dirs:
+            shard_output = shard_dir + "final_render" + os.sep + name
+            if not os.path.isdir(shard_output):
+                continue
+            final_output = args["out"] + "final_render" + os.sep + name
+            os.makedirs(final_output, exist_ok=True)
+            for f in os.listdir(shard_output):
+                os.replace(os.path.join(shard_output, f), os.path.join(final_output, f))
+        merge_trace(args, shard_dir)
+        shutil.rmtree(shard_dir)
+
+    if os.path.isdir(args["out"] + "shards") and len(os.listdir(args["out"] + "shards")) == 0:
+        os.rmdir(args["out"] + "shards")
+
+
+def main():
+    args = get_arguments()
+    settings = check_config(args["config"])
+    if args["seed"] is None:
+        args["seed"] = settings["seed"]
+
+    now = time.time()
+    shards = get_shards(args["count"], args["start"], args["workers"])
+    print("Shards : " + ", ".join("[" + str(s["start"]) + ", " + str(s["start"] + s["count"] - 1) + "]"
+                                  for s in shards))
+
+    failed = run_shards(args, shards)
+    merge_shards(args, [s for s in shards if s not in failed])
+    print("Generated in : " + str(round(time.time() - now, 2)) + " s")
+
+    if len(failed) > 0:
+        print(str(len(failed)) + " shard(s) not finished, run the same command again to continue them")
+        sys.exit(84)
+
+
+# Main body
+if __name__ == '__main__':
+    main()
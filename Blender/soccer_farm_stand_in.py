@@ -0,0 +1,57 @@
+#!/usr/bin/python3
+# Importing python3 from local, just use "python3 <binary>" if is not the same location
+
+# /
+# ** Luis ROSARIO, 2023
+# ** soccer_farm_stand_in.py
+# ** File description:
+# ** Stand-in worker for soccer_farm.py (writes empty samples like soccer_cli.py, can crash on purpose)
+# ** python soccer_farm.py ... --worker-command "python soccer_farm_stand_in.py --crash 0.1 -- --config {config} --count {count} --start {start} --out {out} --seed {seed}"
+# ** https://github.com/Luisrosario2604
+# */
+
+# Imports
+import argparse
+import os
+import random
+import sys
+import time
+
+import soccer_config
+
+
+# Function declarations
+def get_arguments():
+    ap = argparse.ArgumentParser()
+
+    ap.add_argument("--crash", required=False, type=float, default=0, help="chance of crashing before each sample")
+    ap.add_argument("--delay", required=False, type=float, default=0.05, help="seconds per sample")
+    args = vars(ap.parse_args(sys.argv[1:sys.argv.index("--")] if "--" in sys.argv else sys.argv[1:]))
+    return args, soccer_config.parse_cli_arguments(soccer_config.get_script_argv(sys.argv))
+
+
+def write_sample(dir_path, i):
+    os.makedirs(dir_path, exist_ok=True)
+    with open(os.path.join(dir_path, str(i) + ".png"), 'wb') as f:
+        f.write(b"")
+
+
+def main():
+    args, cli_args = get_arguments()
+    count = cli_args.count if cli_args.count is not None else 1
+    start = cli_args.start if cli_args.start is not None else 1
+    out = soccer_config.add_separator(cli_args.out if cli_args.out is not None else "") + "final_render"
+
+    for i in range(start, start + count):
+        if random.random() < args["crash"]:
+            print("Crash before " + str(i))
+            sys.exit(1)
+        time.sleep(args["delay"])
+        write_sample(os.path.join(out, "render"), i)
+        write_sample(os.path.join(out, "groundtruth"), i)
+        print("Sample " + str(i) + " (seed " + str(cli_args.seed) + ")")
+
+
+# Main body
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+# /
+# ** Luis ROSARIO, 2023
+# ** soccer_frustum.py
+# ** File description:
+# ** Camera frustum of the scenes (soccer_scene.py) : visible ground region, visible players, draws inside the view
+# ** No bpy here : every function works on a block of frames (numpy arrays, first axis = frame)
+# ** https://github.com/Luisrosario2604
+# */
+
+
+# ------------------------------------------------------------------------
+#
+#    Imports
+#
+# ------------------------------------------------------------------------
+
+
+import numpy as np
+
+
+# ------------------------------------------------------------------------
+#
+#    Global
+#
+# ------------------------------------------------------------------------
+
+
+# Render size of the .blend file (sensor_fit AUTO : the camera angle is the horizontal one)
+render_size = (1920, 1080)
+
+# A player is visible when his feet or his head are in the image
+player_height = 1.8
+
+# Ground rays above the horizon are stopped at this distance (m)
+far_distance = 200
+
+# Field (m) : x_min, x_max, y_min, y_max, same limits as the random location method
+field = (1.05, 68.56, -108.18, -1)
+
+view_tries = 20
+
+# Culling margin (part of the image size added on every side) : players just out of the image keep their shadows
+cull_margin = 0.1
+
+
+# ------------------------------------------------------------------------
+#
+#    Camera
+#
+# ------------------------------------------------------------------------
+
+
+# World rotation of the cameras of move_camera (soccer_addon.py) : -Z looking at the focus, Y up
+# (to_track_quat("Z", "Y"), the X axis stays horizontal so the euler y set to 0 changes nothing)
+def get_camera_rotations(location, focus):
+    z_axis = location - focus
+    z_axis = z_axis / np.linalg.norm(z_axis, axis=-1, keepdims=True)
+    up = np.broadcast_to([0.0, 0.0, 1.0], z_axis.shape)
+    y_axis = up - np.sum(up * z_axis, axis=-1, keepdims=True) * z_axis
+    y_axis = y_axis / np.linalg.norm(y_axis, axis=-1, keepdims=True)
+    x_axis = np.cross(y_axis, z_axis)
+    return np.stack([x_axis, y_axis, z_axis], axis=-1)
+
+
+def get_focal(angle, res=render_size):
+    return max(res) / 2 / np.tan(np.asarray(angle) / 2)
+
+
+# points (frames, k, 3) -> camera space (frames, k, 3)
+def to_camera_space(points, location, rotation):
+    return np.einsum("nji,nkj->nki", rotation, points - location[:, None])
+
+
+# Pixels (origin top left) and the points in front of the camera, like soccer_projection.project_points
+def project_points(points, location, rotation, angle, res=render_size):
+    cam = to_camera_space(points, location, rotation)
+    depth = -cam[..., 2]
+    in_front = depth > 0.1
+    depth = np.where(in_front, depth, 1)
+
+    focal = get_focal(angle, res)[:, None]
+    pixels = np.stack([res[0] / 2 + focal * cam[..., 0] / depth, res[1] / 2 - focal * cam[..., 1] / depth], axis=-1)
+    return pixels, in_front
+
+
+# margin : part of the image size added on every side
+def is_in_image(points, location, rotation, angle, res=render_size, margin=0):
+    pixels, in_front = project_points(points, location, rotation, angle, res)
+    margin_x = res[0] * margin
+    margin_y = res[1] * margin
+    return in_front & (pixels[..., 0] >= -margin_x) & (pixels[..., 0] < res[0] + margin_x) & \
+        (pixels[..., 1] >= -margin_y) & (pixels[..., 1] < res[1] + margin_y)
+
+
+# Players (frames, k, 2 ground locations) visible by the camera of their frame
+def get_visible(locations, location, rotation, angle, res=render_size, margin=0):
+    feet = np.concatenate([locations, np.zeros(locations.shape[:-1] + (1,))], axis=-1)
+    head = feet + [0, 0, player_height]
+    return is_in_image(feet, location, rotation, angle, res, margin) | \
+        is_in_image(head, location, rotation, angle, res, margin)
+
+
+# ------------------------------------------------------------------------
+#
+#    Ground
+#
+# ------------------------------------------------------------------------
+
+
+# Ground points (z = 0) seen by the corners of the image (frames, 4, 2), in order : top left, top right,
+# bottom right, bottom left
+def get_ground_corners(location, rotation, angle, res=render_size):
+    focal = get_focal(angle, res)
+    half_x = np.broadcast_to(res[0] / 2, focal.shape)
+    half_y = np.broadcast_to(res[1] / 2, focal.shape)
+    rays = np.stack([np.stack([-half_x, half_y, -focal], axis=-1), np.stack([half_x, half_y, -focal], axis=-1),
+                     np.stack([half_x, -half_y, -focal], axis=-1), np.stack([-half_x, -half_y, -focal], axis=-1)],
+                    axis=1)
+    rays = np.einsum("nij,nkj->nki", rotation, rays)
+
+    height = location[:, None, 2]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        distance = np.where(rays[..., 2] < 0, -height / rays[..., 2] * np.linalg.norm(rays[..., :2], axis=-1),
+                            np.inf)
+    distance = np.minimum(distance, far_distance)
+    directions = rays[..., :2] / np.linalg.norm(rays[..., :2], axis=-1, keepdims=True)
+    return location[:, None, :2] + directions * distance[..., None]
+
+
+# Points (frames, k, 2) inside the convex polygon of their frame (frames, corners, 2)
+def is_in_polygon(points, polygon):
+    edges = np.roll(polygon, -1, axis=1) - polygon
+    to_points = points[:, :, None] - polygon[:, None]
+    cross = edges[:, None, :, 0] * to_points[..., 1] - edges[:, None, :, 1] * to_points[..., 0]
+    return np.all(cross >= 0, axis=-1) | np.all(cross <= 0, axis=-1)
+
+
+# count uniform draws per frame in the visible ground of the field, draws in the bounding box of the region kept
+# when inside it (view_tries draws at most), the second array tells which ones were found
+def sample_in_view(rng, corners, count):
+    n = len(corners)
+    low = np.maximum(corners.min(axis=1), [field[0], field[2]])
+    high = np.minimum(corners.max(axis=1), [field[1], field[3]])
+    high = np.maximum(low, high)
+
+    locations = np.zeros((n, count, 2))
+    found = np.zeros((n, count), dtype=bool)
+    for _ in range(view_tries):
+        rows, cols = np.nonzero(~found)
+        if len(rows) == 0:
+            break
+        draws = rng.uniform(low[rows], high[rows])
+        inside = is_in_polygon(draws[:, None], corners[rows])[:, 0]
+        locations[rows[inside], cols[inside]] = draws[inside]
+        found[rows[inside], cols[inside]] = True
+    return locations, found
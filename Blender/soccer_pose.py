@@ -0,0 +1,131 @@
+# /
+# ** Luis ROSARIO, 2023
+# ** soccer_pose.py
+# ** File description:
+# ** Poses as arrays of bone transforms (copy and mirror without the pose clipboard)
+# ** No bpy here : everything works with numpy arrays
+# ** https://github.com/Luisrosario2604
+# */
+
+
+# ------------------------------------------------------------------------
+#
+#    Imports
+#
+# ------------------------------------------------------------------------
+
+
+import re
+import numpy as np
+
+
+# ------------------------------------------------------------------------
+#
+#    Global
+#
+# ------------------------------------------------------------------------
+
+
+pose_fields = {
+    "location": 3,
+    "rotation_quaternion": 4,
+    "rotation_euler": 3,
+    "rotation_axis_angle": 4,
+    "scale": 3
+}
+
+side_names = {
+    "left": "right",
+    "Left": "Right",
+    "LEFT": "RIGHT",
+    "right": "left",
+    "Right": "Left",
+    "RIGHT": "LEFT"
+}
+
+side_letters = {"L": "R", "R": "L", "l": "r", "r": "l"}
+
+
+# ------------------------------------------------------------------------
+#
+#    Names
+#
+# ------------------------------------------------------------------------
+
+
+# Same idea as Blender's flip side name : "Arm.L" <-> "Arm.R", "L_Arm" <-> "R_Arm", "LeftArm" <-> "RightArm"
+def flip_side_name(name):
+    number = ""
+    match = re.match(r"^(.*?)(\.\d+)$", name)
+    if match:
+        name, number = match.group(1), match.group(2)
+
+    if len(name) >= 2 and name[-1] in side_letters and name[-2] in "._- ":
+        return name[:-1] + side_letters[name[-1]] + number
+    if len(name) >= 2 and name[0] in side_letters and name[1] in "._- ":
+        return side_letters[name[0]] + name[1:] + number
+
+    for side, other in side_names.items():
+        if side in name:
+            return name.replace(side, other, 1) + number
+    return name + number
+
+
+def get_mirror_indices(names):
+    index = {n: i for i, n in enumerate(names)}
+    return np.array([index.get(flip_side_name(n), i) for i, n in enumerate(names)])
+
+
+# ------------------------------------------------------------------------
+#
+#    Poses
+#
+# ------------------------------------------------------------------------
+
+
+def make_pose(names, rotation_modes, **fields):
+    pose = {"names": list(names), "rotation_mode": list(rotation_modes)}
+    for field, size in pose_fields.items():
+        pose[field] = np.asarray(fields[field], dtype=np.float32).reshape(-1, size)
+    return pose
+
+
+def copy_pose(pose):
+    new_pose = {"names": list(pose["names"]), "rotation_mode": list(pose["rotation_mode"])}
+    for field in pose_fields:
+        new_pose[field] = pose[field].copy()
+    return new_pose
+
+
+# Pose pasted flipped : every bone takes the transform of its mirror bone, mirrored on the X axis
+# (location x, quaternion / euler / axis-angle y and z are negated, the scale stays the same)
+def mirror_pose(pose):
+    indices = get_mirror_indices(pose["names"])
+    mirrored = {
+        "names": list(pose["names"]),
+        "rotation_mode": [pose["rotation_mode"][i] for i in indices]
+    }
+    for field in pose_fields:
+        mirrored[field] = pose[field][indices]
+
+    mirrored["location"][:, 0] *= -1
+    mirrored["rotation_quaternion"][:, 2:] *= -1
+    mirrored["rotation_euler"][:, 1:] *= -1
+    mirrored["rotation_axis_angle"][:, 2:] *= -1
+    return mirrored
+
+
+# Pose in the bone order of names, bones missing from the pose keep their values from current
+def match_pose(pose, names, current):
+    if pose["names"] == list(names):
+        return pose
+
+    index = {n: i for i, n in enumerate(pose["names"])}
+    matched = copy_pose(current)
+    for i, n in enumerate(names):
+        if n in index:
+            j = index[n]
+            matched["rotation_mode"][i] = pose["rotation_mode"][j]
+            for field in pose_fields:
+                matched[field][i] = pose[field][j]
+    return matched
@@ -0,0 +1,203 @@
+# /
+# ** Luis ROSARIO, 2023
+# ** soccer_projection.py
+# ** File description:
+# ** Camera projection of the objects (YOLO labels without the groundtruth render)
+# ** No bpy here : everything works with numpy arrays
+# ** https://github.com/Luisrosario2604
+# */
+
+
+# ------------------------------------------------------------------------
+#
+#    Imports
+#
+# ------------------------------------------------------------------------
+
+
+import math
+import os
+import numpy as np
+
+
+# ------------------------------------------------------------------------
+#
+#    Global
+#
+# ------------------------------------------------------------------------
+
+
+# Same class ids as Other_Scripts/annotation.py (24_classes, 4_classes and val_real profiles), kept equal by
+# test_soccer_projection.py
+class_nb = {
+        "Ball": 0,
+        "Referee": 1,
+        "Goal1": 2,
+        "Goal2": 3,
+        "Player1_1": 4,
+        "Player1_2": 5,
+        "Player1_3": 6,
+        "Player1_4": 7,
+        "Player1_5": 8,
+        "Player1_6": 9,
+        "Player1_7": 10,
+        "Player1_8": 11,
+        "Player1_9": 12,
+        "Player1_10": 13,
+        "Player2_1": 14,
+        "Player2_2": 15,
+        "Player2_3": 16,
+        "Player2_4": 17,
+        "Player2_5": 18,
+        "Player2_6": 19,
+        "Player2_7": 20,
+        "Player2_8": 21,
+        "Player2_9": 22,
+        "Player2_10": 23
+    }
+
+class_nb_low = {
+        "Ball": 0,
+        "Referee": 1,
+        "Goal1": 2,
+        "Goal2": 2,
+        "Player1_1": 3,
+        "Player1_2": 3,
+        "Player1_3": 3,
+        "Player1_4": 3,
+        "Player1_5": 3,
+        "Player1_6": 3,
+        "Player1_7": 3,
+        "Player1_8": 3,
+        "Player1_9": 3,
+        "Player1_10": 3,
+        "Player2_1": 3,
+        "Player2_2": 3,
+        "Player2_3": 3,
+        "Player2_4": 3,
+        "Player2_5": 3,
+        "Player2_6": 3,
+        "Player2_7": 3,
+        "Player2_8": 3,
+        "Player2_9": 3,
+        "Player2_10": 3
+    }
+
+class_nb_val_real = {
+        "Ball": 0,
+        "Referee": 1,
+        "Goal1": 2,
+        "Goal2": 3,
+        "Player1_1": 4,
+        "Player1_2": 4,
+        "Player1_3": 4,
+        "Player1_4": 4,
+        "Player1_5": 4,
+        "Player1_6": 4,
+        "Player1_7": 4,
+        "Player1_8": 4,
+        "Player1_9": 4,
+        "Player1_10": 4,
+        "Player2_1": 5,
+        "Player2_2": 5,
+        "Player2_3": 5,
+        "Player2_4": 5,
+        "Player2_5": 5,
+        "Player2_6": 5,
+        "Player2_7": 5,
+        "Player2_8": 5,
+        "Player2_9": 5,
+        "Player2_10": 5
+    }
+
+class_profiles = {
+        "24_classes": class_nb,
+        "4_classes": class_nb_low,
+        "val_real": class_nb_val_real
+    }
+
+yolo_precision = 6
+
+
+# ------------------------------------------------------------------------
+#
+#    Projection
+#
+# ------------------------------------------------------------------------
+
+
+# Focal length in pixels, Blender uses the camera angle for the biggest side with sensor_fit AUTO
+def get_focal(angle, res_x, res_y, sensor_fit="AUTO"):
+    if sensor_fit == "VERTICAL" or (sensor_fit == "AUTO" and res_y > res_x):
+        return res_y / 2 / math.tan(angle / 2)
+    return res_x / 2 / math.tan(angle / 2)
+
+
+def to_camera_space(points, world_to_camera):
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    world_to_camera = np.asarray(world_to_camera, dtype=np.float64)
+    return points @ world_to_camera[:3, :3].T + world_to_camera[:3, 3]
+
+
+# Pixel coordinates (origin top left) of the points in front of the camera (Blender cameras look at -Z)
+def project_points(points, world_to_camera, angle, res_x, res_y, sensor_fit="AUTO", shift_x=0.0, shift_y=0.0,
+                   clip_start=0.1):
+    cam = to_camera_space(points, world_to_camera)
+    depth = -cam[:, 2]
+    in_front = depth > clip_start
+    cam = cam[in_front]
+    depth = depth[in_front]
+
+    focal = get_focal(angle, res_x, res_y, sensor_fit)
+    size = max(res_x, res_y)
+    x = res_x / 2 + shift_x * size + focal * cam[:, 0] / depth
+    y = res_y / 2 - shift_y * size - focal * cam[:, 1] / depth
+    return np.stack([x, y], axis=1)
+
+
+# Box in pixel indices like the groundtruth annotation [(x_min, y_min), (x_max, y_max)], clipped to the image
+def get_box(pixels, res_x, res_y):
+    if len(pixels) == 0:
+        return None
+
+    x_min, y_min = np.floor(pixels.min(axis=0))
+    x_max, y_max = np.floor(pixels.max(axis=0))
+    if x_max < 0 or y_max < 0 or x_min > res_x - 1 or y_min > res_y - 1:
+        return None
+
+    x_min, x_max = int(max(x_min, 0)), int(min(x_max, res_x - 1))
+    y_min, y_max = int(max(y_min, 0)), int(min(y_max, res_y - 1))
+    return [(x_min, y_min), (x_max, y_max)]
+
+
+# ------------------------------------------------------------------------
+#
+#    Labels
+#
+# ------------------------------------------------------------------------
+
+
+def coords_to_yolo(top_left, bottom_right, w, h):
+    return [
+        (top_left[0] + bottom_right[0]) / 2 / w,
+        (top_left[1] + bottom_right[1]) / 2 / h,
+        (bottom_right[0] - top_left[0]) / w,
+        (bottom_right[1] - top_left[1]) / h
+    ]
+
+
+# detections = [[name, box], ...], written in class order like annotation.py
+def format_labels(detections, w, h, class_nb=class_nb):
+    lines = []
+    for d in sorted(detections, key=lambda d: class_nb[d[0]]):
+        coords = coords_to_yolo(d[1][0], d[1][1], w, h)
+        lines.append(f"{class_nb[d[0]]} {coords[0]:.{yolo_precision}f} {coords[1]:.{yolo_precision}f} "
+                     f"{coords[2]:.{yolo_precision}f} {coords[3]:.{yolo_precision}f}\n")
+    return "".join(lines)
+
+
+def write_labels(file_path, text):
+    tmp_path = file_path + "." + str(os.getpid()) + ".tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+    os.replace(tmp_path, file_path)
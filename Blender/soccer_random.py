@@ -0,0 +1,60 @@
+# /
+# ** Luis ROSARIO, 2023
+# ** soccer_random.py
+# ** File description:
+# ** Seeded generators of the generation : sample k only depends on (seed, k)
+# ** No bpy here : numpy generators, one per block of samples (see soccer_scene.py)
+# ** https://github.com/Luisrosario2604
+# */
+
+
+# ------------------------------------------------------------------------
+#
+#    Imports
+#
+# ------------------------------------------------------------------------
+
+
+import numpy as np
+
+
+# ------------------------------------------------------------------------
+#
+#    Global
+#
+# ------------------------------------------------------------------------
+
+
+# One stream per use, the textures are kept for several samples (change_texture_time)
+streams = {
+    "scene": 0,
+    "textures": 1
+}
+
+
+# ------------------------------------------------------------------------
+#
+#    Generators
+#
+# ------------------------------------------------------------------------
+
+
+def is_seeded(seed):
+    return seed >= 0
+
+
+def get_block_rng(seed, block, stream="scene"):
+    return np.random.default_rng(np.random.SeedSequence([seed, streams[stream], int(block)]))
+
+
+# ------------------------------------------------------------------------
+#
+#    Textures
+#
+# ------------------------------------------------------------------------
+
+
+# The texture periods are counted from sample 1 (not from the first sample of the run), so a sample
+# generated alone gets the same textures
+def get_texture_frame(frame, change_texture_time):
+    return frame - (frame - 1) % change_texture_time
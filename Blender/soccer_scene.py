@@ -0,0 +1,793 @@
+#!/usr/bin/python3
+# Importing python3 from local, just use "python3 <binary>" if is not the same location
+
+# /
+# ** Luis ROSARIO, 2023
+# ** soccer_scene.py
+# ** File description:
+# ** Scene sampler : every random choice of a sample (ball, players, goals, referee, sun, camera, textures) as
+# ** columns of numpy arrays, the add-on only applies them (apply_scene in soccer_addon.py)
+# ** No bpy here : python soccer_scene.py -c soccer_config.yaml -n [Samples] -f scenes.npz
+# ** https://github.com/Luisrosario2604
+# */
+
+
+# ------------------------------------------------------------------------
+#
+#    Imports
+#
+# ------------------------------------------------------------------------
+
+
+import argparse
+import time
+import numpy as np
+
+import soccer_config
+import soccer_frustum
+import soccer_random
+
+
+# ------------------------------------------------------------------------
+#
+#    Global
+#
+# ------------------------------------------------------------------------
+
+
+# Frames are sampled by blocks (one generator per block) : sample k only depends on (seed, k)
+block_size = 4096
+
+# Slots : Player1_1..10, Player2_1..10, GoalMan1, GoalMan2, Player5_1 (referee)
+slot_names = ["Player1_" + str(i) for i in range(1, 11)] + ["Player2_" + str(i) for i in range(1, 11)] + \
+             ["GoalMan1", "GoalMan2", "Player5_1"]
+slot_teams = ["Team1"] * 10 + ["Team2"] * 10 + ["Team3", "Team4", "Team5"]
+team_names = ["Team1", "Team2", "Team3", "Team4", "Team5"]
+goal_slots = [20, 21]
+referee_slot = 22
+
+position_methods = ["random", "gauss", "squares"]
+
+pose_counts = {
+    "other": 2,
+    "running": 8,
+    "moving": 8,
+    "walking": 10,
+    "goaling": 5
+}
+pose_models = ["PlayerToCopy_" + kind + "_" + str(i) for kind, count in pose_counts.items()
+               for i in range(1, count + 1)]
+pose_offsets = {kind: pose_models.index("PlayerToCopy_" + kind + "_1") for kind in pose_counts}
+
+default_pos_sun = [24, 15.6, 194]
+
+colors_list = ["white", "black", "grey", "blue", "red", "green", "yellow", "orange", "purple", "pink", "brown"]
+
+color_shades = {
+    "white": [[255, 255, 255], [255, 250, 250], [255, 245, 238], [245, 245, 220], [245, 245, 245], [255, 255, 240]],
+    "black": [[1, 1, 1], [17, 17, 17], [30, 30, 30], [60, 60, 60], [77, 77, 77]],
+    "grey": [[105, 105, 105], [128, 128, 128], [169, 169, 169], [192, 192, 192], [211, 211, 211], [220, 220, 220]],
+    "blue": [[0, 79, 255], [0, 102, 255], [0, 158, 255], [0, 180, 255], [67, 196, 239]],
+    "red": [[133, 50, 41], [161, 50, 39], [223, 45, 28], [244, 37, 37], [233, 0, 0], [255, 58, 58], [255, 75, 75]],
+    "green": [[173, 255, 0], [1, 214, 0], [2, 137, 0], [0, 210, 127], [0, 255, 131], [15, 161, 7], [89, 166, 26]],
+    "yellow": [[249, 233, 9], [253, 242, 93], [252, 255, 131], [251, 253, 158], [218, 182, 0]],
+    "orange": [[249, 156, 0], [255, 167, 20], [255, 202, 22], [255, 178, 27], [249, 115, 0]],
+    "purple": [[240, 0, 255], [221, 0, 200], [193, 0, 185], [178, 0, 152], [135, 5, 123]],
+    "pink": [[255, 119, 170], [255, 153, 204], [255, 187, 238], [255, 85, 136], [255, 51, 119]],
+    "brown": [[124, 44, 21], [128, 25, 21], [141, 36, 13], [163, 67, 24], [199, 119, 29]]
+}
+
+# Chances (%) of every color of colors_list
+color_chances = {
+    "player": [23, 15, 7, 12, 14, 9, 6, 4, 7, 2, 1],
+    "referee": [0, 5, 10, 10, 5, 10, 35, 5, 5, 15, 0],
+    "goal": [0, 3, 2, 20, 15, 22, 17, 10, 5, 6, 0]
+}
+
+hair_dark = [[35, 18, 11], [61, 35, 20], [90, 56, 37], [35, 18, 11], [61, 35, 20], [90, 56, 37]]
+skin_dark = [[161, 102, 94], [80, 51, 53], [99, 82, 61]]
+hair_light = [[35, 18, 11], [61, 35, 20], [90, 56, 37], [251, 231, 161], [241, 204, 143], [35, 18, 11],
+              [61, 35, 20], [90, 56, 37], [251, 231, 161], [241, 204, 143], [255, 147, 33]]
+skin_light = [[197, 140, 133], [236, 188, 180], [209, 163, 164]]
+
+# Texture regions of the colors (blue value of the template, see soccer_textures.py)
+team_regions = [4, 5, 6, 7, 3, 10, 11, 12]
+referee_team_regions = [8, 7, 9, 12, 3, 4, 5, 6, 10, 11]
+player_regions = [8, 9, 1, 2]
+referee_player_regions = [1, 2]
+
+# Minimum distance placement : goalkeepers, referee, then the players, a slot too close to the placed ones is
+# drawn again (same method) at most separation_tries times, then its farthest draw is kept (area too crowded)
+placement_order = goal_slots + [referee_slot] + list(range(20))
+separation_tries = 20
+
+# Settings used by the sampler (soctool / soccer_config.make_settings attributes)
+sampler_fields = ["sun_chance", "nb_player_team1", "nb_player_team2", "rotation_jitter", "sw_striped",
+                  "sw_vertical", "sw_pants_same_color_full", "sw_pants_same_color_stiped", "change_texture_time",
+                  "lm_random", "lm_squares", "skin_referee", "skin_player", "ar_other", "ar_running", "ar_moving",
+                  "ar_walking", "ar_p_other", "ar_p_moving", "ar_p_running", "min_distance", "in_view"]
+
+# (settings, seed, block) -> scenes of the block
+scene_cache = {}
+# path -> scenes of the file
+file_cache = {}
+
+
+# ------------------------------------------------------------------------
+#
+#    Draws
+#
+# ------------------------------------------------------------------------
+
+
+# Same chances as randint(0, 100) <= percent
+def bools(rng, percent, size):
+    return rng.integers(0, 101, size) <= np.asarray(percent)
+
+
+# Same chances as randint(0, 10000) / 100 <= percent
+def float_bools(rng, percent, size):
+    return rng.integers(0, 10001, size) / 100 <= percent
+
+
+# Both ends included (like random.randint)
+def randints(rng, low, high, size):
+    return rng.integers(low, np.asarray(high) + 1, size)
+
+
+# Standard normal cdf, erf of Abramowitz & Stegun 7.1.26 (error < 1.5e-7), the lower tail without 1 - erf
+# (no cancellation far below the mean)
+def normal_cdf(x):
+    z = np.abs(x) / np.sqrt(2)
+    t = 1 / (1 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    tail = 0.5 * poly * np.exp(-z * z)
+    return np.where(x < 0, tail, 1 - tail)
+
+
+# Standard normal quantile (Acklam, relative error < 1.2e-9)
+def normal_ppf(p):
+    a = [-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02, 1.383577518672690e+02,
+         -3.066479806614716e+01, 2.506628277459239e+00]
+    b = [-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02, 6.680131188771972e+01,
+         -1.328068155288572e+01]
+    c = [-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00, -2.549732539343734e+00,
+         4.374664141464968e+00, 2.938163982698783e+00]
+    d = [7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00, 3.754408661907416e+00]
+
+    p = np.clip(p, 1e-300, 1 - 1e-16)
+    tail = np.minimum(p, 1 - p)
+    q = np.sqrt(-2 * np.log(tail))
+    tail_x = (((((c[0] * q + c[1]) * q + c[2]) * q + c[3]) * q + c[4]) * q + c[5]) / \
+             ((((d[0] * q + d[1]) * q + d[2]) * q + d[3]) * q + 1)
+    tail_x = np.where(p < 0.5, tail_x, -tail_x)
+
+    q = p - 0.5
+    r = q * q
+    central_x = (((((a[0] * r + a[1]) * r + a[2]) * r + a[3]) * r + a[4]) * r + a[5]) * q / \
+                (((((b[0] * r + b[1]) * r + b[2]) * r + b[3]) * r + b[4]) * r + 1)
+    return np.where(tail < 0.02425, tail_x, central_x)
+
+
+# Normal draws kept in [low, high] : same distribution as drawing again every value out of range, in one pass
+# (inverse cdf of a uniform draw between cdf(low) and cdf(high)), the ranges above the mean are mirrored below
+# it so the cdf stays far from 1. A range too far from the mean (cdf 0 on both sides) gives its nearest border
+def truncated_normal(rng, mean, sigma, low, high, size):
+    mean = np.broadcast_to(np.asarray(mean, dtype=np.float64), size)
+    sigma = np.broadcast_to(np.asarray(sigma, dtype=np.float64), size)
+    low_z = (low - mean) / sigma
+    high_z = (high - mean) / sigma
+    mirror = low_z > 0
+    low_z, high_z = np.where(mirror, -high_z, low_z), np.where(mirror, -low_z, high_z)
+
+    high_cdf = normal_cdf(high_z)
+    z = normal_ppf(rng.uniform(normal_cdf(low_z), high_cdf))
+    z = np.where(high_cdf > 0, z, high_z)
+    z = np.where(mirror, -z, z)
+    return np.clip(mean + sigma * z, low, high)
+
+
+def signs(rng, size):
+    return np.where(bools(rng, 50, size), -1, 1)
+
+
+def pick(rng, choices, size):
+    choices = np.asarray(choices)
+    return choices[rng.integers(0, len(choices), size)]
+
+
+# ------------------------------------------------------------------------
+#
+#    Locations
+#
+# ------------------------------------------------------------------------
+
+
+# Method and its parameters for every frame (gauss : mean_x, sigma_x, mean_y, sigma_y, squares : x_min, x_max,
+# y_min, y_max in cm)
+def sample_position_methods(settings, rng, n):
+    is_random = bools(rng, settings.my_lm_random, n)
+    is_gauss = ~is_random & bools(rng, settings.my_lm_squares, n)
+    method = np.where(is_random, 0, np.where(is_gauss, 1, 2)).astype(np.int8)
+
+    gaussians = np.stack([randints(rng, 1400, 5500, n) / 100, randints(rng, 15, 40, n),
+                          randints(rng, 1200, 11000, n) / 100, randints(rng, 15, 60, n)], axis=1)
+
+    lenght_x = randints(rng, 4000, 6800, n) // 2
+    lenght_y = randints(rng, 2000, 10700, n) // 2
+    middle_x = randints(rng, lenght_x, 6856 - lenght_x, n)
+    middle_y = randints(rng, lenght_y, 10818 - lenght_y, n)
+    squares = np.stack([middle_x - lenght_x, middle_x + lenght_x, middle_y - lenght_y, middle_y + lenght_y], axis=1)
+
+    params = np.where((method == 1)[:, None], gaussians, np.where((method == 2)[:, None], squares, 0))
+    return method, params
+
+
+# Batch samplers of the location methods : count locations (x, y in meters) for every frame of params
+def sample_random_locations(rng, params, count):
+    size = (len(params), count)
+    return np.stack([randints(rng, 105, 6856, size) / 100, randints(rng, 100, 10818, size) / -100], axis=2)
+
+
+def sample_gauss_locations(rng, params, count):
+    size = (len(params), count)
+    return np.stack([truncated_normal(rng, params[:, 0:1], params[:, 1:2], 1.05, 68.5, size),
+                     -truncated_normal(rng, params[:, 2:3], params[:, 3:4], 1, 108.18, size)], axis=2)
+
+
+def sample_squares_locations(rng, params, count):
+    size = (len(params), count)
+    params = params.astype(np.int64)
+    return np.stack([randints(rng, params[:, 0:1], params[:, 1:2], size) / 100,
+                     randints(rng, params[:, 2:3], params[:, 3:4], size) / -100], axis=2)
+
+
+# Same order as position_methods
+location_samplers = [sample_random_locations, sample_gauss_locations, sample_squares_locations]
+
+
+# Every method only draws the frames using it
+def sample_locations(rng, method, params, count):
+    locations = np.empty((len(method), count, 2))
+    for m, sampler in enumerate(location_samplers):
+        rows = method == m
+        if rows.any():
+            locations[rows] = sampler(rng, params[rows], count)
+    return locations
+
+
+def sample_goal_locations(rng, n):
+    return np.stack([np.stack([randints(rng, 320, 378, n) / 10, randints(rng, 0, 26, n) / -10], axis=1),
+                     np.stack([randints(rng, 320, 378, n) / 10, randints(rng, 106582, 109182, n) / -1000], axis=1)],
+                    axis=1)
+
+
+# Between the ball and the middle of the field (y)
+def sample_referee_locations(rng, ball):
+    n = len(ball)
+    return np.stack([truncated_normal(rng, 34.8, 10, 1.05, 68.56, n),
+                     -truncated_normal(rng, (-ball[:, 1] + 54.59) / 2, 12, 1, 108.18, n)], axis=1)
+
+
+# New location of one slot for the frames of method, params and ball (players of in_view kept in the view)
+def sample_slot_locations(rng, slot, method, params, ball, view=None, in_view=None):
+    if slot == referee_slot:
+        return sample_referee_locations(rng, ball)
+    if slot in goal_slots:
+        return sample_goal_locations(rng, len(ball))[:, goal_slots.index(slot)]
+
+    locations = sample_locations(rng, method, params, 1)
+    if in_view is not None:
+        locations = place_in_view(rng, locations, in_view[:, None], method, params, view)
+    return locations[:, 0]
+
+
+# Distance (m) between point and the nearest active location of its frame (inf without any)
+def get_nearest_distance(locations, active, point):
+    delta = locations - point[:, None]
+    squared = np.where(active, delta[..., 0] ** 2 + delta[..., 1] ** 2, np.inf)
+    return np.sqrt(np.min(squared, axis=1, initial=np.inf))
+
+
+# Keeps the active slots at least min_distance (m) apart, only the frames with a slot too close draw again.
+# 23 slots per frame : the distances to the placed slots are computed directly, vectorized over the frames
+# Returns the number of slots per frame kept closer than min_distance
+def separate_locations(rng, slot_location, slot_active, min_distance, method, params, ball, view, slot_in_view):
+    placed = []
+    crowded = np.zeros(len(slot_location), dtype=np.int8)
+
+    for slot in placement_order:
+        others = slot_location[:, placed]
+        others_active = slot_active[:, placed]
+        best_distance = get_nearest_distance(others, others_active, slot_location[:, slot])
+        rows = np.flatnonzero(slot_active[:, slot] & (best_distance < min_distance))
+
+        for _ in range(separation_tries):
+            if len(rows) == 0:
+                break
+            new = sample_slot_locations(rng, slot, method[rows], params[rows], ball[rows], slice_view(view, rows),
+                                        slot_in_view[rows, slot])
+            distance = get_nearest_distance(others[rows], others_active[rows], new)
+            better = distance > best_distance[rows]
+            slot_location[rows[better], slot] = new[better]
+            best_distance[rows[better]] = distance[better]
+            rows = rows[best_distance[rows] < min_distance]
+
+        crowded += slot_active[:, slot] & (best_distance < min_distance)
+        placed.append(slot)
+    return crowded
+
+
+# ------------------------------------------------------------------------
+#
+#    View
+#
+# ------------------------------------------------------------------------
+
+
+# Cameras of the frames for soccer_frustum.py
+def get_view(camera_location, camera_focus, camera_angle):
+    return {
+        "location": camera_location,
+        "rotation": soccer_frustum.get_camera_rotations(camera_location, camera_focus),
+        "angle": camera_angle
+    }
+
+
+def slice_view(view, rows):
+    return {key: value[rows] for key, value in view.items()}
+
+
+def get_view_visible(view, locations, margin=0):
+    return soccer_frustum.get_visible(locations, view["location"], view["rotation"], view["angle"], margin=margin)
+
+
+# Locations (frames, k, 2) of in_view moved in the view of their frame : drawn again with the method of the frame
+# (the placement keeps its shape), then uniformly in the visible ground, left out of view if still not found
+def place_in_view(rng, locations, in_view, method, params, view):
+    rows, cols = np.nonzero(in_view & ~get_view_visible(view, locations))
+
+    for _ in range(soccer_frustum.view_tries):
+        if len(rows) == 0:
+            break
+        new = sample_locations(rng, method[rows], params[rows], 1)
+        visible = get_view_visible(slice_view(view, rows), new)[:, 0]
+        locations[rows[visible], cols[visible]] = new[visible, 0]
+        rows, cols = rows[~visible], cols[~visible]
+
+    if len(rows) > 0:
+        corners = soccer_frustum.get_ground_corners(view["location"][rows], view["rotation"][rows],
+                                                    view["angle"][rows])
+        new, found = soccer_frustum.sample_in_view(rng, corners, 1)
+        found = found[:, 0]
+        locations[rows[found], cols[found]] = new[found, 0]
+    return locations
+
+
+# ------------------------------------------------------------------------
+#
+#    Rotations
+#
+# ------------------------------------------------------------------------
+
+
+# Rotation (radians, z axis) facing the ball, plus a jitter
+def get_facing_rotations(ball, locations, jitter=None):
+    vector = ball - locations
+    norm = np.linalg.norm(vector, axis=-1)
+    cos = np.divide(-vector[..., 1], norm, out=np.ones_like(norm), where=norm > 0)
+    angle = np.degrees(np.arccos(np.clip(cos, -1, 1)))
+    if jitter is not None:
+        angle = angle + jitter
+    return np.radians(np.where(ball[..., 0] > locations[..., 0], angle, -angle))
+
+
+# Like rotate_player : 5% any direction, else facing the ball with a jitter (half of the max jitter one time out
+# of two)
+def sample_rotations(rng, ball, locations, jitter_angle):
+    size = locations.shape[:-1]
+    max_jitter = np.where(bools(rng, 50, size), jitter_angle, jitter_angle // 2)
+    jitter = rng.integers(0, max_jitter + 1) * np.where(rng.integers(0, 2, size) == 1, -1, 1)
+    facing = get_facing_rotations(ball, locations, jitter)
+    return np.where(bools(rng, 5, size), np.radians(randints(rng, 0, 36000, size) / 100), facing)
+
+
+# ------------------------------------------------------------------------
+#
+#    Poses
+#
+# ------------------------------------------------------------------------
+
+
+# choices = [(mask, kind, max number), ...] by priority, default = (kind, max number)
+def choose_poses(rng, choices, default, size):
+    kind, count = default
+    poses = pose_offsets[kind] + rng.integers(0, count, size)
+    for mask, kind, count in reversed(choices):
+        poses = np.where(mask, pose_offsets[kind] + rng.integers(0, count, size), poses)
+    return poses.astype(np.int16)
+
+
+def sample_player_poses(settings, rng, running_prob, size, referee=False):
+    other = float_bools(rng, settings.my_ar_p_other, size) & (not referee)
+    running = bools(rng, running_prob, size) & settings.my_ar_p_running
+    moving = bools(rng, settings.my_ar_p_moving, size)
+    return choose_poses(rng, [(other, "other", 1), (running, "running", 8), (moving, "moving", 8)],
+                        ("walking", 10), size)
+
+
+def sample_goal_poses(settings, rng, size):
+    other = float_bools(rng, settings.my_ar_other, size)
+    running = bools(rng, settings.my_ar_running, size)
+    moving = bools(rng, settings.my_ar_moving, size)
+    walking = bools(rng, settings.my_ar_walking, size)
+    return choose_poses(rng, [(other, "other", 2), (running, "running", 8), (moving, "moving", 8),
+                              (walking, "walking", 10)], ("goaling", 5), size)
+
+
+# ------------------------------------------------------------------------
+#
+#    Frames
+#
+# ------------------------------------------------------------------------
+
+
+def sample_sun(settings, rng, n):
+    rotation = np.stack([randints(rng, 0, 84, n) * signs(rng, n), randints(rng, 0, 78, n) * signs(rng, n),
+                         randints(rng, 0, 360, n)], axis=1).astype(np.float64)
+    rotation = np.where(bools(rng, settings.my_sun_chance, n)[:, None], rotation, default_pos_sun)
+    strength = np.where(bools(rng, 50, n), randints(rng, 4000, 6800, n) / 1000, 4.8)
+    return rotation, strength
+
+
+def sample_camera(rng, ball):
+    n = len(ball)
+    location = np.stack([randints(rng, 2500, 3280, n) / -100, randints(rng, 3959, 6959, n) / -100,
+                         randints(rng, 1600, 2480, n) / 100], axis=1)
+
+    jitter_x = truncated_normal(rng, 0, 2, 0, 5, n) * signs(rng, n)
+    jitter_y = truncated_normal(rng, 0, 8, 0, 20, n) * signs(rng, n)
+    focus = np.stack([np.clip(34.8 - (34.8 - ball[:, 0]) / 2.41 + jitter_x, 1.05, 68.5),
+                      np.clip(ball[:, 1] + jitter_y, -108.2, -1), ball[:, 2]], axis=1)
+
+    angle = np.radians(truncated_normal(rng, 35, 6, 25, 45, n))
+    return location, focus, angle
+
+
+def sample_frame_columns(settings, rng, frames):
+    n = len(frames)
+    method, params = sample_position_methods(settings, rng, n)
+    locations = sample_locations(rng, method, params, 21)
+
+    ball = np.concatenate([locations[:, 0], 0.165 + np.where(bools(rng, 10, n), randints(rng, 0, 5000, n) / 1000,
+                                                             0)[:, None]], axis=1)
+    # Camera first : the players of in_view are placed in its view
+    camera_location, camera_focus, camera_angle = sample_camera(rng, ball)
+    view = get_view(camera_location, camera_focus, camera_angle)
+    sun, sun_strength = sample_sun(settings, rng, n)
+    running_prob = randints(rng, 10, 90, n)
+
+    goals = sample_goal_locations(rng, n)
+    referee = sample_referee_locations(rng, ball)
+    slot_location = np.concatenate([locations[:, 1:], goals, referee[:, None]], axis=1)
+
+    slot_active = np.ones((n, len(slot_names)), dtype=bool)
+    slot_active[:, settings.my_nb_player_team1:10] = False
+    slot_active[:, 10 + settings.my_nb_player_team2:20] = False
+
+    slot_in_view = np.zeros((n, len(slot_names)), dtype=bool)
+    if settings.my_in_view > 0:
+        slot_in_view[:, :20] = bools(rng, settings.my_in_view, (n, 20)) & slot_active[:, :20]
+        place_in_view(rng, slot_location[:, :20], slot_in_view[:, :20], method, params, view)
+
+    crowded = np.zeros(n, dtype=np.int8)
+    if settings.my_min_distance > 0:
+        crowded = separate_locations(rng, slot_location, slot_active, settings.my_min_distance / 100, method,
+                                     params, ball, view, slot_in_view)
+    slot_visible = get_view_visible(view, slot_location) & slot_active
+    slot_near_view = get_view_visible(view, slot_location, soccer_frustum.cull_margin) & slot_active
+
+    ball_xy = ball[:, None, :2]
+    slot_rotation = np.concatenate([
+        sample_rotations(rng, ball_xy, slot_location[:, :20], settings.my_rotation_jitter),
+        sample_rotations(rng, ball_xy, slot_location[:, 20:22], 20),
+        sample_rotations(rng, ball_xy, slot_location[:, 22:], settings.my_rotation_jitter)], axis=1)
+
+    slot_pose = np.concatenate([
+        sample_player_poses(settings, rng, running_prob[:, None], (n, 20)),
+        sample_goal_poses(settings, rng, (n, 2)),
+        sample_player_poses(settings, rng, 30, (n, 1), True)], axis=1)
+
+    return {
+        "frame": np.asarray(frames, dtype=np.int64),
+        "texture_frame": soccer_random.get_texture_frame(np.asarray(frames, dtype=np.int64),
+                                                         settings.my_change_texture_time),
+        "method": method,
+        "method_params": params.astype(np.float32),
+        "ball": ball.astype(np.float32),
+        "sun": sun.astype(np.float32),
+        "sun_strength": sun_strength.astype(np.float32),
+        "slot_active": slot_active,
+        "crowded": crowded,
+        "slot_visible": slot_visible,
+        "slot_near_view": slot_near_view,
+        "visible": slot_visible.sum(axis=1).astype(np.int8),
+        "slot_location": slot_location.astype(np.float32),
+        "slot_rotation": slot_rotation.astype(np.float32),
+        "slot_pose": slot_pose,
+        "slot_flip": bools(rng, 50, (n, len(slot_names))),
+        "slot_scale": truncated_normal(rng, 1.3, 0.033, 1.2, 1.4, (n, len(slot_names))).astype(np.float32),
+        "camera_location": camera_location.astype(np.float32),
+        "camera_focus": camera_focus.astype(np.float32),
+        "camera_angle": camera_angle.astype(np.float32)
+    }
+
+
+# ------------------------------------------------------------------------
+#
+#    Textures
+#
+# ------------------------------------------------------------------------
+
+
+# Colors drawn without replacement (weighted, in a random order), size = (frames, ...) -> (frames, ..., nb, 3)
+def sample_wear_colors(rng, nb, model_type, size):
+    with np.errstate(divide="ignore"):
+        keys = np.log(np.array(color_chances[model_type]) / 100) - np.log(-np.log(rng.random(size + (11,))))
+    chosen = np.argsort(-keys, axis=-1)[..., :nb]
+    chosen = np.take_along_axis(chosen, np.argsort(rng.random(chosen.shape), axis=-1), axis=-1)
+    return sample_shades(rng, chosen)
+
+
+def sample_shades(rng, families):
+    counts = np.array([len(color_shades[c]) for c in colors_list])
+    shades = np.zeros((len(colors_list), counts.max(), 3), dtype=np.int64)
+    for i, c in enumerate(colors_list):
+        shades[i, :counts[i]] = color_shades[c]
+    return shades[families, (rng.random(families.shape) * counts[families]).astype(np.int64)]
+
+
+# White lines on dark colors, black lines on light colors
+def get_line_colors(colors):
+    y = colors @ np.array([0.2126, 0.7152, 0.0722])
+    return np.where((y <= 128)[..., None], [255, 255, 255], [0, 0, 0])
+
+
+# Like choose_model_wear_texture : colors of the regions team_regions, vertical stripes
+def sample_team_colors(settings, rng, n, model_type):
+    colors = sample_wear_colors(rng, 4, model_type, (n,))
+    striped = bools(rng, settings.my_sw_striped, n)
+    vertical = striped & bools(rng, settings.my_sw_vertical, n)
+    pants_same = np.where(striped, bools(rng, settings.my_sw_pants_same_color_stiped, n),
+                          bools(rng, settings.my_sw_pants_same_color_full, n))
+    if model_type != "player":
+        striped = np.zeros(n, dtype=bool)
+        pants_same = bools(rng, 90, n)
+
+    colors[:, 1] = np.where(striped[:, None], colors[:, 1], colors[:, 0])
+    colors[:, 2] = np.where(pants_same[:, None], colors[:, 0], colors[:, 2])
+    socks = colors[np.arange(n), rng.integers(0, 3, n)]
+    colors[:, 3] = np.where(bools(rng, 25, n)[:, None], colors[:, 3], socks)
+
+    lines = get_line_colors(colors[:, :3])
+    return vertical, np.stack([colors[:, 0], colors[:, 0], colors[:, 1], colors[:, 2], colors[:, 3],
+                               lines[:, 0], lines[:, 1], lines[:, 2]], axis=1)
+
+
+def sample_referee_colors(rng, n):
+    black = sample_shades(rng, np.full(n, colors_list.index("black")))[:, None]
+    referee = sample_wear_colors(rng, 1, "referee", (n,))
+    return np.concatenate([np.repeat(black, 4, axis=1), np.repeat(referee, 6, axis=1)], axis=1)
+
+
+# Shorts, socks, hair and skin of every slot (the referee only uses hair and skin)
+def sample_player_colors(settings, rng, n):
+    size = (n, len(slot_names))
+    colors = sample_wear_colors(rng, 2, "player", size)
+    dark = bools(rng, np.where(np.arange(len(slot_names)) == referee_slot, settings.my_skin_referee,
+                               settings.my_skin_player), size)
+    hair = np.where(dark[..., None], pick(rng, hair_dark, size), pick(rng, hair_light, size))
+    skin = np.where(dark[..., None], pick(rng, skin_dark, size), pick(rng, skin_light, size))
+    return np.concatenate([colors, hair[..., None, :], skin[..., None, :]], axis=2)
+
+
+def sample_texture_columns(settings, rng, texture_frames):
+    n = len(texture_frames)
+    team_vertical = np.zeros((n, len(team_names)), dtype=bool)
+    team_colors = np.zeros((n, len(team_names), len(referee_team_regions), 3), dtype=np.uint8)
+
+    for t, model_type in enumerate(["player", "player", "goal", "goal"]):
+        team_vertical[:, t], team_colors[:, t, :len(team_regions)] = sample_team_colors(settings, rng, n, model_type)
+    team_colors[:, 4] = sample_referee_colors(rng, n)
+
+    return {
+        "texture_frame": np.asarray(texture_frames, dtype=np.int64),
+        "team_vertical": team_vertical,
+        "team_colors": team_colors,
+        "player_colors": sample_player_colors(settings, rng, n).astype(np.uint8)
+    }
+
+
+# [[r, g, b, region], ...] for create_texture
+def get_color_changes(colors, regions):
+    return [[int(c[0]), int(c[1]), int(c[2]), r] for c, r in zip(colors, regions)]
+
+
+def get_team_color_changes(scene, t):
+    regions = referee_team_regions if team_names[t] == "Team5" else team_regions
+    return get_color_changes(scene["team_colors"][t], regions)
+
+
+def get_player_color_changes(scene, slot):
+    if slot == referee_slot:
+        return get_color_changes(scene["player_colors"][slot][2:], referee_player_regions)
+    return get_color_changes(scene["player_colors"][slot], player_regions)
+
+
+# ------------------------------------------------------------------------
+#
+#    Scenes
+#
+# ------------------------------------------------------------------------
+
+
+def concatenate_columns(blocks):
+    return {key: np.concatenate([b[key] for b in blocks]) for key in blocks[0]}
+
+
+def slice_columns(columns, keep):
+    return {key: value[keep] for key, value in columns.items()}
+
+
+# Frames [start, start + count[ and the textures they use, in two tables : {"frames": ..., "textures": ...}
+# seed < 0 : not reproducible (one generator for the whole call)
+def sample_scenes(settings, seed, start, count):
+    frames = np.arange(start, start + count)
+    texture_frames = np.unique(soccer_random.get_texture_frame(frames, settings.my_change_texture_time))
+
+    if not soccer_random.is_seeded(seed):
+        rng = np.random.default_rng()
+        return {"frames": sample_frame_columns(settings, rng, frames),
+                "textures": sample_texture_columns(settings, rng, texture_frames)}
+
+    frame_blocks = []
+    for block in range((start - 1) // block_size, (start + count - 2) // block_size + 1):
+        block_frames = np.arange(block * block_size + 1, (block + 1) * block_size + 1)
+        columns = sample_frame_columns(settings, soccer_random.get_block_rng(seed, block), block_frames)
+        frame_blocks.append(slice_columns(columns, np.isin(block_frames, frames)))
+
+    # Texture periods are sampled by blocks too (period p = texture frame p * change_texture_time + 1)
+    periods = (texture_frames - 1) // settings.my_change_texture_time
+    texture_blocks = []
+    for block in np.unique(periods // block_size):
+        block_periods = np.arange(block * block_size, (block + 1) * block_size)
+        columns = sample_texture_columns(settings, soccer_random.get_block_rng(seed, block, "textures"),
+                                         block_periods * settings.my_change_texture_time + 1)
+        texture_blocks.append(slice_columns(columns, np.isin(block_periods, periods)))
+
+    return {"frames": concatenate_columns(frame_blocks), "textures": concatenate_columns(texture_blocks)}
+
+
+# One frame as a dict (frame columns + texture columns of its period)
+def get_scene_row(scenes, frame):
+    frames = scenes["frames"]
+    textures = scenes["textures"]
+    i = np.searchsorted(frames["frame"], frame)
+    if i >= len(frames["frame"]) or frames["frame"][i] != frame:
+        raise KeyError("Sample " + str(frame) + " not in the scenes")
+    j = np.searchsorted(textures["texture_frame"], frames["texture_frame"][i])
+
+    scene = {key: value[i] for key, value in frames.items()}
+    scene.update({key: value[j] for key, value in textures.items() if key != "texture_frame"})
+    return scene
+
+
+def get_settings_key(settings):
+    return tuple(getattr(settings, "my_" + f) for f in sampler_fields)
+
+
+# Scene of one frame, the block of the frame is kept for the next frames
+def get_scene(settings, seed, frame):
+    if not soccer_random.is_seeded(seed):
+        return get_scene_row(sample_scenes(settings, seed, frame, 1), frame)
+
+    block = (frame - 1) // block_size
+    key = (get_settings_key(settings), seed, block)
+    if key not in scene_cache:
+        scene_cache.clear()
+        scene_cache[key] = sample_scenes(settings, seed, block * block_size + 1, block_size)
+    return get_scene_row(scene_cache[key], frame)
+
+
+# ------------------------------------------------------------------------
+#
+#    Files
+#
+# ------------------------------------------------------------------------
+
+
+def save_scenes(path, scenes, seed=-1):
+    columns = {"frames_" + key: value for key, value in scenes["frames"].items()}
+    columns.update({"textures_" + key: value for key, value in scenes["textures"].items()})
+    np.savez_compressed(path, seed=seed, pose_models=np.array(pose_models), **columns)
+
+
+def load_scenes(path):
+    with np.load(path) as data:
+        if list(data["pose_models"]) != pose_models:
+            raise ValueError(path + " : poses not matching this version of soccer_scene.py")
+        return {
+            "frames": {key[len("frames_"):]: data[key] for key in data.files if key.startswith("frames_")},
+            "textures": {key[len("textures_"):]: data[key] for key in data.files if key.startswith("textures_")}
+        }
+
+
+def get_file_scene(path, frame):
+    if path not in file_cache:
+        file_cache.clear()
+        file_cache[path] = load_scenes(path)
+    return get_scene_row(file_cache[path], frame)
+
+
+# ------------------------------------------------------------------------
+#
+#    Main
+#
+# ------------------------------------------------------------------------
+
+
+def get_arguments():
+    ap = argparse.ArgumentParser()
+
+    ap.add_argument("-c", "--config", required=True, help="config file (.yaml or .json), same as soccer_cli.py")
+    ap.add_argument("-n", "--count", required=False, type=int, default=None, help="number of samples")
+    ap.add_argument("-s", "--start", required=False, type=int, default=None, help="number of the first sample")
+    ap.add_argument("--seed", required=False, type=int, default=None, help="seed of the generation")
+    ap.add_argument("-f", "--file", required=True, help="scenes file (.npz)")
+    ap.set_defaults(out=None)
+    args = ap.parse_args()
+
+    try:
+        settings = soccer_config.validate_config(soccer_config.load_config(args.config), args)
+    except (OSError, ValueError) as e:
+        print("Invalid config " + args.config + " :\n" + str(e))
+        exit(84)
+    return settings, args.file
+
+
+def print_summary(scenes):
+    frames = scenes["frames"]
+    active = frames["slot_active"]
+    flat_poses = frames["slot_pose"][active]
+
+    print("Position methods : " + ", ".join(m + " " + str(round(np.mean(frames["method"] == i) * 100, 1)) + "%"
+                                           for i, m in enumerate(position_methods)))
+    print("Poses            : " + ", ".join(kind + " " + str(round(np.mean(
+        (flat_poses >= pose_offsets[kind]) & (flat_poses < pose_offsets[kind] + count)) * 100, 1)) + "%"
+        for kind, count in pose_counts.items()))
+    print("Ball             : x " + str(round(float(frames["ball"][:, 0].mean()), 2)) + " m, y " +
+          str(round(float(frames["ball"][:, 1].mean()), 2)) + " m (mean)")
+    print("Camera FOV       : " + str(round(float(np.degrees(frames["camera_angle"]).mean()), 2)) + " deg (mean)")
+    print("Flipped poses    : " + str(round(float(frames["slot_flip"][active].mean()) * 100, 1)) + "%")
+    print("Visible slots    : " + str(round(float(frames["visible"].mean()), 2)) + " / " +
+          str(round(float(active.sum(axis=1).mean()), 2)) + " per frame (mean)")
+    print("Crowded frames   : " + str(round(float(np.mean(frames["crowded"] > 0)) * 100, 2)) +
+          "% (players closer than min_distance)")
+
+
+def main():
+    settings, out = get_arguments()
+    soctool = soccer_config.make_settings(settings)
+
+    now = time.time()
+    scenes = sample_scenes(soctool, settings["seed"], settings["first_name_generation"], settings["generations"])
+    print("Sampled " + str(settings["generations"]) + " scenes in : " + str(round(time.time() - now, 2)) + " s")
+    print_summary(scenes)
+
+    save_scenes(out, scenes, settings["seed"])
+    print("Saved in " + out)
+
+
+# Main body
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+# /
+# ** Luis ROSARIO, 2023
+# ** soccer_textures.py
+# ** File description:
+# ** Texture recolor engine (templates decoded once, one palette gather per texture)
+# ** No bpy here : everything works with numpy arrays
+# ** https://github.com/Luisrosario2604
+# */
+
+
+# ------------------------------------------------------------------------
+#
+#    Imports
+#
+# ------------------------------------------------------------------------
+
+
+import os
+import numpy as np
+from PIL import Image
+
+
+# ------------------------------------------------------------------------
+#
+#    Global
+#
+# ------------------------------------------------------------------------
+
+
+# Path -> decoded template (pixels, region of every pixel, pixels out of the regions)
+texture_cache = {}
+
+
+# ------------------------------------------------------------------------
+#
+#    Templates
+#
+# ------------------------------------------------------------------------
+
+
+# A region pixel is (0, 0, region), region being the number used in the color changes
+# RGBA templates are also kept as packed uint32 pixels (alpha only) so a recolor is one gather + one or
+def make_template(data):
+    data = np.ascontiguousarray(data)
+    is_region = (data[:, :, 0] == 0) & (data[:, :, 1] == 0)
+    others = np.flatnonzero(~is_region)
+    template = {
+        "data": data,
+        "regions": data[:, :, 2].copy(),
+        "others": others,
+        "others_rgb": data[:, :, :3].reshape(-1, 3)[others]
+    }
+    if data.shape[2] == 4:
+        pixels = data.view(np.uint32)[:, :, 0]
+        template["alpha"] = pixels & np.array([0, 0, 0, 255], dtype=np.uint8).view(np.uint32)[0]
+        template["others_pixels"] = pixels.ravel()[others]
+    return template
+
+
+def get_template(path):
+    if path not in texture_cache:
+        texture_cache[path] = make_template(np.array(Image.open(path)))
+    return texture_cache[path]
+
+
+def set_template(path, data):
+    texture_cache[path] = make_template(data)
+
+
+def forget_template(path):
+    texture_cache.pop(path, None)
+
+
+def forget_templates(dir_path):
+    for path in list(texture_cache.keys()):
+        if os.path.dirname(path) == os.path.dirname(os.path.join(dir_path, "")):
+            del texture_cache[path]
+
+
+# ------------------------------------------------------------------------
+#
+#    Recolor
+#
+# ------------------------------------------------------------------------
+
+
+# Color of every region after applying the changes in order (a change can match a previous result)
+def get_palette(color_changes):
+    palette = np.zeros((256, 3), dtype=np.uint8)
+    palette[:, 2] = np.arange(256)
+
+    for colors in color_changes:
+        mask = (palette[:, 0] == 0) & (palette[:, 1] == 0) & (palette[:, 2] == colors[3])
+        palette[mask] = [colors[0], colors[1], colors[2]]
+    return palette
+
+
+def recolor(template, color_changes):
+    palette = get_palette(color_changes)
+
+    if "alpha" in template:
+        palette = np.concatenate([palette, np.zeros((256, 1), dtype=np.uint8)], axis=1).view(np.uint32)[:, 0]
+        pixels = palette[template["regions"]]
+        pixels |= template["alpha"]
+        if len(template["others"]) > 0:
+            pixels.ravel()[template["others"]] = template["others_pixels"]
+        return pixels.view(np.uint8).reshape(template["data"].shape)
+
+    data = template["data"].copy()
+    rgb = palette[template["regions"]]
+    if len(template["others"]) > 0:
+        rgb.reshape(-1, 3)[template["others"]] = template["others_rgb"]
+    data[:, :, :3] = rgb
+    return data
+
+
+# keep=True when the new texture is used as a template later (team textures)
+# save=False only keeps the pixels in memory (Blender images are filled from the returned array)
+def create_texture(im_to_copy, im_to_paste, color_changes, keep=False, save=True):
+    data = recolor(get_template(im_to_copy), color_changes)
+
+    if save:
+        Image.fromarray(data).save(im_to_paste)
+    if keep:
+        set_template(im_to_paste, data)
+    else:
+        forget_template(im_to_paste)
+    return data
+
+
+# Reference version : one full image mask per color change
+def create_texture_masks(im_to_copy, im_to_paste, color_changes):
+    im = Image.open(im_to_copy)
+    data = np.array(im)
+
+    for colors in color_changes:
+        r1, g1, b1 = 0, 0, colors[3]  # Original value
+        r2, g2, b2 = colors[0], colors[1], colors[2]  # Value that we want to replace it with
+
+        red, green, blue = data[:, :, 0], data[:, :, 1], data[:, :, 2]
+        mask = (red == r1) & (green == g1) & (blue == b1)
+        data[:, :, :3][mask] = [r2, g2, b2]
+
+    im_to_copy = Image.fromarray(data)
+    im_to_copy.save(im_to_paste)
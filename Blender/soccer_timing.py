@@ -0,0 +1,210 @@
+# /
+# ** Luis ROSARIO, 2023
+# ** soccer_timing.py
+# ** File description:
+# ** Timing spans of the generation (clear, textures, poses, renders...) : durations of every span, one JSONL trace
+# ** line per frame, a p50 / p95 table and the histograms of the spans at the end of a run
+# ** No bpy here : the clock can be replaced (StandInClock) to check it outside Blender
+# ** https://github.com/Luisrosario2604
+# */
+
+
+# ------------------------------------------------------------------------
+#
+#    Imports
+#
+# ------------------------------------------------------------------------
+
+
+import contextlib
+import functools
+import json
+import time
+from array import array
+import numpy as np
+
+
+# ------------------------------------------------------------------------
+#
+#    Global
+#
+# ------------------------------------------------------------------------
+
+
+clock = {"now": time.perf_counter}
+
+# span name -> every duration (s) of the run
+durations = {}
+# span name -> [total (s), calls] of the current frame
+frame_spans = {}
+trace = {"file": None}
+
+# Histogram buckets (s) : 1 us to 1000 s, 3 per decade
+histogram_bins = np.logspace(-6, 3, 28)
+
+summary_columns = ["calls", "total s", "mean ms", "p50 ms", "p95 ms", "max ms"]
+
+
+# ------------------------------------------------------------------------
+#
+#    Clock
+#
+# ------------------------------------------------------------------------
+
+
+# Clock moved by hand, every span then takes exactly the time given to advance
+class StandInClock:
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+# None : back to time.perf_counter
+def set_clock(new_clock=None):
+    clock["now"] = new_clock or time.perf_counter
+
+
+# ------------------------------------------------------------------------
+#
+#    Spans
+#
+# ------------------------------------------------------------------------
+
+
+def record(name, seconds):
+    durations.setdefault(name, array("d")).append(seconds)
+    frame_span = frame_spans.setdefault(name, [0.0, 0])
+    frame_span[0] += seconds
+    frame_span[1] += 1
+
+
+# Nested spans are inclusive : new_generation also counts the textures and the poses it made
+@contextlib.contextmanager
+def span(name):
+    start = clock["now"]()
+    try:
+        yield
+    finally:
+        record(name, clock["now"]() - start)
+
+
+def timed(name):
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ------------------------------------------------------------------------
+#
+#    Run
+#
+# ------------------------------------------------------------------------
+
+
+# trace_path : JSONL file (appended), None for no trace
+def start_run(trace_path=None):
+    end_run()
+    durations.clear()
+    frame_spans.clear()
+    if trace_path is not None:
+        trace["file"] = open(trace_path, 'a')
+
+
+# Spans of the frame (and its metadata) as one record, written in the trace
+def end_frame(frame, **metadata):
+    frame_record = {"frame": frame}
+    frame_record.update(metadata)
+    frame_record["spans"] = {name: {"total": round(total, 6), "calls": calls}
+                             for name, (total, calls) in frame_spans.items()}
+    frame_spans.clear()
+
+    if trace["file"] is not None:
+        trace["file"].write(json.dumps(frame_record) + "\n")
+        trace["file"].flush()
+    return frame_record
+
+
+# Last trace line of a run : the histogram of every span (counts per bucket of histogram_bins)
+def end_run():
+    if trace["file"] is not None:
+        trace["file"].write(json.dumps(get_run_record()) + "\n")
+        trace["file"].close()
+        trace["file"] = None
+
+
+# ------------------------------------------------------------------------
+#
+#    Summary
+#
+# ------------------------------------------------------------------------
+
+
+def get_durations(name):
+    return np.asarray(durations.get(name, array("d")))
+
+
+# Counts per bucket of histogram_bins (the first and last buckets also count the shorter and longer spans)
+def get_histogram(name):
+    values = np.clip(get_durations(name), histogram_bins[0], histogram_bins[-1])
+    return np.histogram(values, histogram_bins)[0]
+
+
+def get_run_record():
+    return {"histogram_bins": [float(f"{b:.3g}") for b in histogram_bins],
+            "histograms": {name: get_histogram(name).tolist() for name in durations}}
+
+
+def format_bucket(seconds):
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.3g} us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.3g} ms"
+    return f"{seconds:.3g} s"
+
+
+def get_span_summary(name):
+    values = get_durations(name)
+    return [len(values), values.sum(), values.mean() * 1000, np.percentile(values, 50) * 1000,
+            np.percentile(values, 95) * 1000, values.max() * 1000]
+
+
+# One line per span, the longest first
+def get_span_names():
+    return sorted(durations, key=lambda name: -get_durations(name).sum())
+
+
+def format_summary():
+    names = get_span_names()
+    width = max([len("span")] + [len(name) for name in names])
+    lines = ["span".ljust(width) + "".join(column.rjust(10) for column in summary_columns)]
+    for name in names:
+        calls, total, mean, p50, p95, maximum = get_span_summary(name)
+        lines.append(name.ljust(width) + str(calls).rjust(10) + "".join(f"{v:10.2f}" for v in
+                                                                         [total, mean, p50, p95, maximum]))
+    return "\n".join(lines)
+
+
+# Non empty buckets of every span : [low, high[ calls
+def format_histograms():
+    lines = []
+    for name in get_span_names():
+        counts = get_histogram(name)
+        buckets = ["[" + format_bucket(histogram_bins[i]) + ", " + format_bucket(histogram_bins[i + 1]) + "[ " +
+                   str(count) for i, count in enumerate(counts) if count > 0]
+        lines.append(name + " : " + ", ".join(buckets))
+    return "\n".join(lines)
+
+
+def print_summary():
+    if len(durations) > 0:
+        print(format_summary())
+        print(format_histograms())
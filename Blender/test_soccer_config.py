@@ -0,0 +1,79 @@
+# /
+# ** Luis ROSARIO, 2023
+# ** test_soccer_config.py
+# ** File description:
+# ** Tests of soccer_config.py (python -m pytest test_soccer_config.py), no bpy needed
+# ** https://github.com/Luisrosario2604
+# */
+
+
+# ------------------------------------------------------------------------
+#
+#    Imports
+#
+# ------------------------------------------------------------------------
+
+
+import os
+from types import SimpleNamespace
+
+import pytest
+
+import soccer_config
+
+
+# ------------------------------------------------------------------------
+#
+#    Global
+#
+# ------------------------------------------------------------------------
+
+
+# Soccer_saves of the repository (Textures inside)
+path_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Soccer_saves")
+
+
+# ------------------------------------------------------------------------
+#
+#    Tests
+#
+# ------------------------------------------------------------------------
+
+
+def test_valid_config_takes_the_defaults():
+    settings = soccer_config.validate_config({"path_dir": path_dir, "sun_chance": 50, "ar_p_other": 1})
+
+    assert settings["sun_chance"] == 50
+    assert settings["ar_p_other"] == 1.0 and isinstance(settings["ar_p_other"], float)
+    assert settings["path_dir"] == path_dir + os.sep
+    assert settings["generations"] == soccer_config.config_fields["generations"][1]
+    assert set(settings) == set(soccer_config.config_fields)
+    assert soccer_config.make_settings(settings).my_sun_chance == 50
+
+
+def test_command_line_replaces_the_config():
+    args = SimpleNamespace(count=7, start=3, out=None, seed=42)
+    settings = soccer_config.validate_config({"path_dir": path_dir, "generations": 2, "seed": 1}, args)
+    assert (settings["generations"], settings["first_name_generation"], settings["seed"]) == (7, 3, 42)
+
+
+@pytest.mark.parametrize("config, error", [
+    ({"sun_chance": 30, "sun_chanse": 30}, "Unknown setting : sun_chanse"),
+    ({"sun_chance": 101}, "sun_chance must be between 0 and 100"),
+    ({"min_distance": -1}, "min_distance must be between 0 and 1000"),
+    ({"generations": "10"}, "generations must be a int"),
+    ({"generations": True}, "generations must be a int"),
+    ({"cull": 1}, "cull must be a bool"),
+    ({"label_profile": "5_classes"}, "label_profile must be one of"),
+])
+def test_invalid_config(config, error):
+    with pytest.raises(ValueError, match=error):
+        soccer_config.validate_config(dict(config, path_dir=path_dir))
+
+
+def test_every_error_reported_at_once():
+    with pytest.raises(ValueError) as e:
+        soccer_config.validate_config({"sun_chance": -1, "typo": 1})
+    message = str(e.value)
+    assert "Missing setting : path_dir" in message
+    assert "sun_chance must be between" in message and "Unknown setting : typo" in message
@@ -0,0 +1,96 @@
+# /
+# ** Luis ROSARIO, 2023
+# ** test_soccer_frustum.py
+# ** File description:
+# ** Tests of soccer_frustum.py (python -m pytest test_soccer_frustum.py), no bpy needed
+# ** https://github.com/Luisrosario2604
+# */
+
+
+# ------------------------------------------------------------------------
+#
+#    Imports
+#
+# ------------------------------------------------------------------------
+
+
+import numpy as np
+
+import soccer_frustum
+import soccer_projection
+
+
+# ------------------------------------------------------------------------
+#
+#    Global
+#
+# ------------------------------------------------------------------------
+
+
+# Cameras looking down enough to see the ground in every image corner (no far_distance cut)
+locations = np.array([[35.0, -20.0, 40.0], [10.0, -90.0, 25.0], [60.0, -50.0, 60.0]])
+focuses = np.array([[35.0, -55.0, 0.0], [20.0, -70.0, 0.0], [50.0, -40.0, 0.0]])
+angles = np.array([0.6, 0.8, 0.5])
+
+res = soccer_frustum.render_size
+image_corners = np.array([[0, 0], [res[0], 0], [res[0], res[1]], [0, res[1]]], dtype=float)
+
+
+# ------------------------------------------------------------------------
+#
+#    Helpers
+#
+# ------------------------------------------------------------------------
+
+
+def get_cameras():
+    return locations, soccer_frustum.get_camera_rotations(locations, focuses)
+
+
+def get_corners_3d(corners):
+    return np.concatenate([corners, np.zeros(corners.shape[:-1] + (1,))], axis=-1)
+
+
+# ------------------------------------------------------------------------
+#
+#    Tests
+#
+# ------------------------------------------------------------------------
+
+
+def test_ground_corners_project_to_image_corners():
+    location, rotation = get_cameras()
+    corners = soccer_frustum.get_ground_corners(location, rotation, angles)
+    assert np.linalg.norm(corners - location[:, None, :2], axis=-1).max() < soccer_frustum.far_distance
+
+    pixels, in_front = soccer_frustum.project_points(get_corners_3d(corners), location, rotation, angles)
+    assert in_front.all()
+    np.testing.assert_allclose(pixels, np.broadcast_to(image_corners, pixels.shape), atol=1e-6)
+
+
+def test_projection_matches_soccer_projection():
+    location, rotation = get_cameras()
+    points = np.random.default_rng(0).uniform([0, -110, 0], [70, 0, 2], size=(len(location), 50, 3))
+    pixels, in_front = soccer_frustum.project_points(points, location, rotation, angles)
+
+    for n in range(len(location)):
+        camera_to_world = np.eye(4)
+        camera_to_world[:3, :3] = rotation[n]
+        camera_to_world[:3, 3] = location[n]
+        expected = soccer_projection.project_points(points[n], np.linalg.inv(camera_to_world), angles[n], res[0],
+                                                    res[1])
+        np.testing.assert_allclose(pixels[n][in_front[n]], expected, atol=1e-6)
+
+
+def test_sample_in_view_inside_polygon_and_field():
+    location, rotation = get_cameras()
+    corners = soccer_frustum.get_ground_corners(location, rotation, angles)
+    draws, found = soccer_frustum.sample_in_view(np.random.default_rng(1), corners, 200)
+    assert found.any(axis=1).all()
+
+    assert soccer_frustum.is_in_polygon(draws, corners)[found].all()
+    field = soccer_frustum.field
+    inside_field = (draws[..., 0] >= field[0]) & (draws[..., 0] <= field[1]) & \
+                   (draws[..., 1] >= field[2]) & (draws[..., 1] <= field[3])
+    assert inside_field[found].all()
+    assert soccer_frustum.is_in_image(get_corners_3d(draws), location, rotation, angles)[found].all()
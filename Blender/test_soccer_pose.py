@@ -0,0 +1,125 @@
+# /
+# ** Luis ROSARIO, 2023
+# ** test_soccer_pose.py
+# ** File description:
+# ** Tests of soccer_pose.py (python -m pytest test_soccer_pose.py), no bpy needed
+# ** https://github.com/Luisrosario2604
+# */
+
+
+# ------------------------------------------------------------------------
+#
+#    Imports
+#
+# ------------------------------------------------------------------------
+
+
+import numpy as np
+import pytest
+
+import soccer_pose
+
+
+# ------------------------------------------------------------------------
+#
+#    Global
+#
+# ------------------------------------------------------------------------
+
+
+names = ["Hips", "Arm.L", "Arm.R", "Leg.L.001", "Leg.R.001", "Spine"]
+
+
+# ------------------------------------------------------------------------
+#
+#    Helpers
+#
+# ------------------------------------------------------------------------
+
+
+def get_random_pose(seed=0):
+    rng = np.random.default_rng(seed)
+    quaternions = rng.normal(size=(len(names), 4))
+    quaternions /= np.linalg.norm(quaternions, axis=1, keepdims=True)
+    return soccer_pose.make_pose(names, ["QUATERNION", "XYZ", "XYZ", "QUATERNION", "QUATERNION", "AXIS_ANGLE"],
+                                 location=rng.normal(size=(len(names), 3)), rotation_quaternion=quaternions,
+                                 rotation_euler=rng.uniform(-np.pi, np.pi, size=(len(names), 3)),
+                                 rotation_axis_angle=rng.normal(size=(len(names), 4)),
+                                 scale=rng.uniform(0.5, 2, size=(len(names), 3)))
+
+
+def quaternion_matrix(q):
+    w, x, y, z = q
+    return np.array([[1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+                     [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+                     [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)]])
+
+
+# Blender XYZ euler : X first, then Y, then Z
+def euler_matrix(e):
+    cx, cy, cz = np.cos(e)
+    sx, sy, sz = np.sin(e)
+    rx = np.array([[1, 0, 0], [0, cx, -sx], [0, sx, cx]])
+    ry = np.array([[cy, 0, sy], [0, 1, 0], [-sy, 0, cy]])
+    rz = np.array([[cz, -sz, 0], [sz, cz, 0], [0, 0, 1]])
+    return rz @ ry @ rx
+
+
+# ------------------------------------------------------------------------
+#
+#    Tests
+#
+# ------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("name, flipped", [
+    ("Arm.L", "Arm.R"), ("Arm.R", "Arm.L"), ("hand_l", "hand_r"), ("L_Foot", "R_Foot"), ("r-foot", "l-foot"),
+    ("LeftArm", "RightArm"), ("RIGHT_EYE", "LEFT_EYE"), ("Leg.L.001", "Leg.R.001"), ("Spine", "Spine"),
+    ("Spine.001", "Spine.001"), ("Hips", "Hips"), ("Lip", "Lip")
+])
+def test_flip_side_name(name, flipped):
+    assert soccer_pose.flip_side_name(name) == flipped
+    assert soccer_pose.flip_side_name(flipped) == name
+
+
+def test_mirror_indices():
+    assert soccer_pose.get_mirror_indices(names).tolist() == [0, 2, 1, 4, 3, 5]
+
+
+def test_mirror_twice_is_identity():
+    pose = get_random_pose()
+    twice = soccer_pose.mirror_pose(soccer_pose.mirror_pose(pose))
+
+    assert twice["names"] == pose["names"]
+    assert twice["rotation_mode"] == pose["rotation_mode"]
+    for field in soccer_pose.pose_fields:
+        np.testing.assert_array_equal(twice[field], pose[field])
+
+
+def test_mirror_is_the_x_reflection():
+    pose = get_random_pose()
+    mirrored = soccer_pose.mirror_pose(pose)
+    reflection = np.diag([-1.0, 1.0, 1.0])
+
+    # Arm.R takes the transform of Arm.L seen in a mirror
+    np.testing.assert_allclose(mirrored["location"][2], pose["location"][1] * [-1, 1, 1], rtol=1e-6)
+    np.testing.assert_allclose(quaternion_matrix(mirrored["rotation_quaternion"][2]),
+                               reflection @ quaternion_matrix(pose["rotation_quaternion"][1]) @ reflection,
+                               atol=1e-6)
+    np.testing.assert_allclose(euler_matrix(mirrored["rotation_euler"][2]),
+                               reflection @ euler_matrix(pose["rotation_euler"][1]) @ reflection, atol=1e-6)
+    np.testing.assert_array_equal(mirrored["scale"][2], pose["scale"][1])
+    assert mirrored["rotation_mode"][2] == pose["rotation_mode"][1]
+
+
+def test_match_pose_keeps_missing_bones():
+    pose = get_random_pose(0)
+    current = get_random_pose(1)
+    partial = {"names": names[:2], "rotation_mode": pose["rotation_mode"][:2]}
+    for field in soccer_pose.pose_fields:
+        partial[field] = pose[field][:2]
+
+    matched = soccer_pose.match_pose(partial, names, current)
+    np.testing.assert_array_equal(matched["location"][:2], pose["location"][:2])
+    np.testing.assert_array_equal(matched["location"][2:], current["location"][2:])
+    np.testing.assert_array_equal(current["location"], get_random_pose(1)["location"])
@@ -0,0 +1,102 @@
+# /
+# ** Luis ROSARIO, 2023
+# ** test_soccer_projection.py
+# ** File description:
+# ** Tests of soccer_projection.py (python -m pytest test_soccer_projection.py), no bpy needed
+# ** The class tables and the label lines must stay the same as Other_Scripts/annotation.py
+# ** https://github.com/Luisrosario2604
+# */
+
+
+# ------------------------------------------------------------------------
+#
+#    Imports
+#
+# ------------------------------------------------------------------------
+
+
+import importlib.util
+import os
+
+import numpy as np
+import pytest
+
+import soccer_projection
+
+
+# ------------------------------------------------------------------------
+#
+#    Global
+#
+# ------------------------------------------------------------------------
+
+
+annotation_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Other_Scripts", "annotation.py")
+
+res_x, res_y = 1920, 1080
+
+
+# ------------------------------------------------------------------------
+#
+#    Helpers
+#
+# ------------------------------------------------------------------------
+
+
+@pytest.fixture(scope="module")
+def annotation():
+    spec = importlib.util.spec_from_file_location("annotation", annotation_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# ------------------------------------------------------------------------
+#
+#    Tests
+#
+# ------------------------------------------------------------------------
+
+
+def test_same_class_profiles_as_annotation(annotation):
+    assert soccer_projection.class_profiles == annotation.class_profiles
+
+
+@pytest.mark.parametrize("profile", list(soccer_projection.class_profiles))
+def test_same_label_lines_as_annotation(annotation, profile):
+    class_nb = soccer_projection.class_profiles[profile]
+    detections = [["Player2_3", [(10, 20), (50, 120)]], ["Ball", [(900, 500), (910, 510)]],
+                  ["Goal2", [(0, 0), (res_x - 1, res_y - 1)]], ["Referee", [(300, 400), (330, 480)]]]
+    in_class_order = sorted(detections, key=lambda d: class_nb[d[0]])
+
+    assert soccer_projection.format_labels(detections, res_x, res_y, class_nb) == \
+        annotation.format_annotation(in_class_order, res_x, res_y, class_nb)
+
+
+def test_box_inside_image():
+    pixels = np.array([[100.7, 200.2], [150.1, 260.9], [120.0, 230.0]])
+    assert soccer_projection.get_box(pixels, res_x, res_y) == [(100, 200), (150, 260)]
+
+
+def test_box_partially_off_screen():
+    pixels = np.array([[-40.5, 1000.0], [60.2, 1200.0], [10.0, 1050.0]])
+    box = soccer_projection.get_box(pixels, res_x, res_y)
+    assert box == [(0, 1000), (60, res_y - 1)]
+
+    x, y, w, h = (float(v) for v in soccer_projection.format_labels([["Ball", box]], res_x, res_y).split()[1:])
+    assert 0 <= x - w / 2 and x + w / 2 <= 1 and 0 <= y - h / 2 and y + h / 2 <= 1
+    assert (x, y, w, h) == pytest.approx((30 / res_x, (1000 + res_y - 1) / 2 / res_y, 60 / res_x,
+                                          (res_y - 1 - 1000) / res_y), abs=1e-6)
+
+
+def test_box_off_screen():
+    assert soccer_projection.get_box(np.zeros((0, 2)), res_x, res_y) is None
+    assert soccer_projection.get_box(np.array([[-10.0, 5.0], [-1.0, 50.0]]), res_x, res_y) is None
+    assert soccer_projection.get_box(np.array([[res_x + 1.0, 5.0], [res_x + 9.0, 50.0]]), res_x, res_y) is None
+
+
+def test_points_behind_the_camera_dropped():
+    # Camera at the origin looking at -Z : only the point in front is projected, on the image center
+    points = np.array([[0.0, 0.0, -10.0], [0.0, 0.0, 10.0]])
+    pixels = soccer_projection.project_points(points, np.eye(4), 0.8, res_x, res_y)
+    np.testing.assert_allclose(pixels, [[res_x / 2, res_y / 2]])
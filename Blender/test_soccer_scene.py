@@ -0,0 +1,97 @@
+# /
+# ** Luis ROSARIO, 2023
+# ** test_soccer_scene.py
+# ** File description:
+# ** Tests of the location samplers of soccer_scene.py (python -m pytest test_soccer_scene.py), no bpy needed
+# ** Same distributions as the previous samplers (benchmark_scene.py) : two samples Kolmogorov-Smirnov, fixed seeds
+# ** https://github.com/Luisrosario2604
+# */
+
+
+# ------------------------------------------------------------------------
+#
+#    Imports
+#
+# ------------------------------------------------------------------------
+
+
+import numpy as np
+import pytest
+
+import benchmark_scene
+import soccer_scene
+
+
+# ------------------------------------------------------------------------
+#
+#    Global
+#
+# ------------------------------------------------------------------------
+
+
+samples = 4000
+seed = 0
+
+# Kolmogorov-Smirnov coefficient of the significance level (1.95 : 0.1 %)
+ks_coefficient = 1.95
+
+
+# ------------------------------------------------------------------------
+#
+#    Helpers
+#
+# ------------------------------------------------------------------------
+
+
+# Largest distance between the two empirical cdfs
+def ks_statistic(a, b):
+    a = np.sort(a)
+    b = np.sort(b)
+    values = np.concatenate([a, b])
+    cdf_a = np.searchsorted(a, values, side="right") / len(a)
+    cdf_b = np.searchsorted(b, values, side="right") / len(b)
+    return np.max(np.abs(cdf_a - cdf_b))
+
+
+def get_ks_limit(n, m):
+    return ks_coefficient * np.sqrt((n + m) / (n * m))
+
+
+# ------------------------------------------------------------------------
+#
+#    Tests
+#
+# ------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("name, method, params", benchmark_scene.cases, ids=[c[0] for c in benchmark_scene.cases])
+def test_same_distribution_as_previous_sampler(name, method, params):
+    previous, _ = benchmark_scene.run_previous(method, params, samples, seed)
+    batch, _ = benchmark_scene.run_batch(method, params, samples, seed)
+
+    for axis in range(2):
+        assert ks_statistic(previous[:, axis], batch[:, axis]) <= get_ks_limit(samples, samples), \
+            name + " axis " + "xy"[axis]
+
+
+def test_truncated_normal_in_range():
+    rng = np.random.default_rng(seed)
+    means = np.array([[-50.0], [0.5], [34.8], [200.0]])
+    values = soccer_scene.truncated_normal(rng, means, np.array([[1.0], [60.0], [15.0], [5.0]]), 1.05, 68.5,
+                                           (4, samples))
+    assert values.min() >= 1.05 and values.max() <= 68.5
+    # Means far out of the range : values next to the nearest border (exponential tail of scale sigma / z)
+    assert values[0].max() - 1.05 < 0.1 and 68.5 - values[3].min() < 2
+
+
+def test_sample_locations_by_method():
+    rng = np.random.default_rng(seed)
+    method = np.array([0, 1, 2, 1])
+    params = np.array([[0, 0, 0, 0], [34.8, 15, 54.59, 15], [1414, 5414, 4409, 6409], [14, 40, 110, 60]],
+                      dtype=np.float64)
+    locations = soccer_scene.sample_locations(rng, method, params, 50)
+
+    assert locations.shape == (4, 50, 2)
+    assert ((locations[..., 0] >= 1.05) & (locations[..., 0] <= 68.56)).all()
+    assert ((locations[..., 1] >= -108.18) & (locations[..., 1] <= -1)).all()
+    assert ((locations[2, :, 0] >= 14.14) & (locations[2, :, 0] <= 54.14)).all()
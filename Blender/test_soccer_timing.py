@@ -0,0 +1,96 @@
+# /
+# ** Luis ROSARIO, 2023
+# ** test_soccer_timing.py
+# ** File description:
+# ** Tests of soccer_timing.py with the stand-in clock (python -m pytest test_soccer_timing.py), no bpy needed
+# ** https://github.com/Luisrosario2604
+# */
+
+
+# ------------------------------------------------------------------------
+#
+#    Imports
+#
+# ------------------------------------------------------------------------
+
+
+import json
+
+import numpy as np
+import pytest
+
+import soccer_timing
+
+
+# ------------------------------------------------------------------------
+#
+#    Helpers
+#
+# ------------------------------------------------------------------------
+
+
+@pytest.fixture
+def clock():
+    stand_in = soccer_timing.StandInClock()
+    soccer_timing.set_clock(stand_in)
+    yield stand_in
+    soccer_timing.end_run()
+    soccer_timing.set_clock()
+
+
+def get_bucket(seconds):
+    return np.searchsorted(soccer_timing.histogram_bins, seconds, side="right") - 1
+
+
+# ------------------------------------------------------------------------
+#
+#    Tests
+#
+# ------------------------------------------------------------------------
+
+
+def test_spans_and_frames(clock, tmp_path):
+    trace_path = tmp_path / "trace.jsonl"
+
+    @soccer_timing.timed("texture")
+    def make_texture():
+        clock.advance(0.002)
+
+    soccer_timing.start_run(str(trace_path))
+    for frame in range(3):
+        with soccer_timing.span("generation"):
+            clock.advance(0.01)
+            make_texture()
+            make_texture()
+        with soccer_timing.span("render"):
+            clock.advance(1.5)
+        frame_record = soccer_timing.end_frame(frame, culled=frame)
+
+        # Nested spans are inclusive
+        assert frame_record["spans"]["generation"] == {"total": 0.014, "calls": 1}
+        assert frame_record["spans"]["texture"] == {"total": 0.004, "calls": 2}
+        assert frame_record["culled"] == frame
+    soccer_timing.end_run()
+
+    assert soccer_timing.get_span_summary("texture")[:2] == [6, pytest.approx(0.012)]
+    assert soccer_timing.get_span_summary("render")[:2] == [3, pytest.approx(4.5)]
+    assert soccer_timing.get_span_names() == ["render", "generation", "texture"]
+
+    lines = [json.loads(line) for line in trace_path.read_text().splitlines()]
+    assert [line["frame"] for line in lines[:3]] == [0, 1, 2]
+    assert lines[3]["histograms"]["texture"] == soccer_timing.get_histogram("texture").tolist()
+
+
+def test_histogram_buckets(clock):
+    soccer_timing.start_run()
+    for seconds in [0.002, 0.002, 0.5, 0, 5000]:
+        with soccer_timing.span("step"):
+            clock.advance(seconds)
+
+    counts = soccer_timing.get_histogram("step")
+    assert counts.sum() == 5
+    assert counts[get_bucket(0.002)] == 2
+    assert counts[get_bucket(0.5)] == 1
+    # Out of the bins : first and last buckets
+    assert counts[0] == 1 and counts[-1] == 1
+    assert "step : " in soccer_timing.format_histograms()
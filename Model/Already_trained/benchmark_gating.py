@@ -0,0 +1,136 @@
+#!/usr/bin/python3
+# Importing python3 from local, just use "python3 <binary>" if is not the same location
+
+# /
+# ** Luis ROSARIO, 2023
+# ** benchmark_gating.py
+# ** File description:
+# ** Speedup against accuracy of frame skipping and motion gating (predict.py --skip / --motion)
+# ** The images become a clip (static stretch then camera pan on every image), inferring every frame is the reference
+# ** https://github.com/Luisrosario2604
+# */
+
+
+# Imports
+import argparse
+import time
+
+import soccer_gating
+import soccer_inference
+
+# Global
+# (name, skip, motion threshold)
+modes = [
+    ("every frame", 1, None),
+    ("skip 2", 2, None),
+    ("skip 4", 4, None),
+    ("skip 8", 8, None),
+    ("motion 0.01", None, 0.01),
+    ("motion 0.03", None, 0.03),
+    ("skip 8 + motion 0.03", 8, 0.03)
+]
+
+# Part of the image seen by the camera
+crop_ratio = 0.75
+
+
+# Function declarations
+def get_arguments():
+    ap = argparse.ArgumentParser()
+
+    ap.add_argument("-f", "--file", required=False, default="data", help="images of the clip (directory or glob)")
+    ap.add_argument("-m", "--model", required=False, default="models/val_real/weights/best.pt",
+                    help="model path (*.pt)")
+    ap.add_argument("-n", "--frames", required=False, type=int, default=60, help="frames per image (half static)")
+    ap.add_argument("-b", "--batch", required=False, type=int, default=8, help="frames per model call")
+    ap.add_argument("-c", "--conf", required=False, type=float, default=0.25, help="minimum confidence")
+    ap.add_argument("--iou", required=False, type=float, default=0.5, help="IoU of a box found again")
+    args = vars(ap.parse_args())
+
+    images = [f for f in soccer_inference.get_source_files(args["file"]) if not soccer_inference.is_video(f)]
+    if len(images) == 0:
+        print("File not existing")
+        exit(84)
+
+    if args["frames"] < 2 or args["batch"] < 1:
+        print("Frames must be at least 2 and batch size positive")
+        exit(84)
+
+    return images, args
+
+
+# Same path for all the frames (one video), a cut between two images
+def get_clip(images, frames_per_image):
+    frame_nb = 0
+    for path, _, image in soccer_inference.read_frames(images):
+        h, w = image.shape[:2]
+        crop_w, crop_h = int(w * crop_ratio), int(h * crop_ratio)
+        static = frames_per_image // 2
+        for i in range(frames_per_image):
+            x = 0 if i < static else round((w - crop_w) * (i - static + 1) / (frames_per_image - static))
+            yield "clip", frame_nb, image[:crop_h, x:x + crop_w]
+            frame_nb += 1
+
+
+def get_iou(a, b):
+    w = min(a[2], b[2]) - max(a[0], b[0])
+    h = min(a[3], b[3]) - max(a[1], b[1])
+    if w <= 0 or h <= 0:
+        return 0.0
+    inter = w * h
+    return inter / ((a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter)
+
+
+# Greedy matching (same class, best IoU first), returns (found, extra, missed)
+def match_boxes(detections, reference, iou):
+    pairs = sorted(((get_iou(d[2:], r[2:]), i, j) for i, d in enumerate(detections) for j, r in enumerate(reference)
+                    if d[0] == r[0]), reverse=True)
+    used_d, used_r = set(), set()
+    for value, i, j in pairs:
+        if value < iou:
+            break
+        if i not in used_d and j not in used_r:
+            used_d.add(i)
+            used_r.add(j)
+    return len(used_r), len(detections) - len(used_d), len(reference) - len(used_r)
+
+
+def run_mode(model, images, args, skip, threshold):
+    now = time.perf_counter()
+    frames = [(detections, tag) for _, _, _, detections, tag, _ in
+              soccer_gating.predict_gated(model, get_clip(images, args["frames"]), args["batch"], args["conf"],
+                                          skip, threshold)]
+    return frames, time.perf_counter() - now
+
+
+def main():
+    images, args = get_arguments()
+    model = soccer_inference.load_model(args["model"])
+
+    # Warm up (first call of the model is slow)
+    run_mode(model, images[:1], dict(args, frames=2), 1, None)
+
+    reference, reference_time = None, None
+    print("mode".ljust(24) + "inferred %".rjust(12) + "time s".rjust(10) + "frames/s".rjust(10) + "speedup".rjust(9) +
+          "recall".rjust(8) + "precision".rjust(11) + "F1".rjust(7))
+    for name, skip, threshold in modes:
+        frames, elapsed = run_mode(model, images, args, skip, threshold)
+        if reference is None:
+            reference, reference_time = frames, elapsed
+
+        found, extra, missed = 0, 0, 0
+        for (detections, _), (reference_detections, _) in zip(frames, reference):
+            f, e, m = match_boxes(detections, reference_detections, args["iou"])
+            found, extra, missed = found + f, extra + e, missed + m
+        recall = found / max(found + missed, 1)
+        precision = found / max(found + extra, 1)
+        f1 = 2 * recall * precision / max(recall + precision, 1e-9)
+        inferred = sum(tag == "inferred" for _, tag in frames) / len(frames)
+
+        print(name.ljust(24) + f"{inferred * 100:12.1f}" + f"{elapsed:10.2f}" + f"{len(frames) / elapsed:10.1f}" +
+              f"{reference_time / elapsed:9.2f}" + f"{recall:8.3f}" + f"{precision:11.3f}" + f"{f1:7.3f}")
+
+
+# Main body
+if __name__ == '__main__':
+    main()
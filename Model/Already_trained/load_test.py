@@ -0,0 +1,160 @@
+#!/usr/bin/python3
+# Importing python3 from local, just use "python3 <binary>" if is not the same location
+
+# /
+# ** Luis ROSARIO, 2023
+# ** load_test.py
+# ** File description:
+# ** Load test of predict_server.py : concurrent clients, latency percentiles, throughput and batch sizes
+# ** https://github.com/Luisrosario2604
+# */
+
+
+# Imports
+import argparse
+import http.client
+import json
+import os
+import socket
+import threading
+import time
+import numpy as np
+
+import soccer_inference
+
+# Global
+percentiles = [50, 90, 95, 99]
+
+
+# Function declarations
+def get_arguments():
+    ap = argparse.ArgumentParser()
+
+    ap.add_argument("-f", "--file", required=True, help="images sent (file, directory or glob pattern)")
+    ap.add_argument("-m", "--model", required=False, default=None, help="model name (server default when empty)")
+    ap.add_argument("--host", required=False, default="127.0.0.1", help="HTTP address of the server")
+    ap.add_argument("-p", "--port", required=False, type=int, default=8765, help="HTTP port of the server")
+    ap.add_argument("-u", "--socket", required=False, default=None, help="Unix socket of the server")
+    ap.add_argument("-c", "--concurrency", required=False, type=int, default=8, help="concurrent clients")
+    ap.add_argument("-n", "--requests", required=False, type=int, default=200, help="total requests")
+    ap.add_argument("--paths", required=False, action="store_true", help="send the paths instead of the bytes")
+    args = vars(ap.parse_args())
+
+    images = [f for f in soccer_inference.get_source_files(args["file"]) if not soccer_inference.is_video(f)]
+    if len(images) == 0:
+        print("File not existing")
+        exit(84)
+
+    if args["concurrency"] < 1 or args["requests"] < 1:
+        print("concurrency and requests must be positive")
+        exit(84)
+
+    return images, args
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path):
+        super().__init__("localhost")
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.path)
+
+
+def get_connection(args):
+    if args["socket"] is not None:
+        return UnixHTTPConnection(args["socket"])
+    return http.client.HTTPConnection(args["host"], args["port"])
+
+
+def get_health(args):
+    connection = get_connection(args)
+    connection.request("GET", "/health")
+    health = json.loads(connection.getresponse().read())
+    connection.close()
+    return health
+
+
+# Request bodies prepared before the test : only the server is measured
+def get_bodies(images, args):
+    if args["paths"]:
+        model = {} if args["model"] is None else {"model": args["model"]}
+        return [(json.dumps(dict(path=os.path.abspath(f), **model)).encode(), "application/json") for f in images]
+    bodies = []
+    for f in images:
+        with open(f, 'rb') as image:
+            bodies.append((image.read(), "application/octet-stream"))
+    return bodies
+
+
+# One keep-alive connection per client
+def run_client(args, bodies, counter, latencies, errors, lock):
+    connection = get_connection(args)
+    path = "/predict" if args["model"] is None else "/predict?model=" + args["model"]
+    while True:
+        with lock:
+            n = counter[0]
+            counter[0] += 1
+        if n >= args["requests"]:
+            break
+
+        body, content_type = bodies[n % len(bodies)]
+        start = time.perf_counter()
+        try:
+            connection.request("POST", path, body=body, headers={"Content-Type": content_type})
+            response = connection.getresponse()
+            response.read()
+            ok = response.status == 200
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            connection = get_connection(args)
+            ok = False
+        with lock:
+            latencies.append(time.perf_counter() - start)
+            errors[0] += 0 if ok else 1
+    connection.close()
+
+
+def get_batches(health):
+    return {name: stats["batches"] for name, stats in health["models"].items()}, \
+           {name: stats["requests"] for name, stats in health["models"].items()}
+
+
+def main():
+    images, args = get_arguments()
+    bodies = get_bodies(images, args)
+    batches_before, requests_before = get_batches(get_health(args))
+
+    counter = [0]
+    errors = [0]
+    latencies = []
+    lock = threading.Lock()
+    clients = [threading.Thread(target=run_client, args=(args, bodies, counter, latencies, errors, lock))
+               for _ in range(args["concurrency"])]
+
+    now = time.perf_counter()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    elapsed = time.perf_counter() - now
+
+    batches_after, requests_after = get_batches(get_health(args))
+    latencies = np.array(latencies) * 1000
+
+    print("Requests   : " + str(len(latencies)) + " (" + str(errors[0]) + " errors) in " + str(round(elapsed, 2)) +
+          " s, " + str(args["concurrency"]) + " clients")
+    print("Throughput : " + str(round(len(latencies) / elapsed, 2)) + " requests/s")
+    print("Latency    : " + ", ".join("p" + str(p) + " " + str(round(np.percentile(latencies, p), 1)) + " ms"
+                                      for p in percentiles) + ", max " + str(round(latencies.max(), 1)) + " ms")
+    for name in batches_after:
+        batches = batches_after[name] - batches_before.get(name, 0)
+        if batches > 0:
+            print("Model " + name + " : " + str(batches) + " batches, " +
+                  str(round((requests_after[name] - requests_before.get(name, 0)) / batches, 2)) + " frames/batch")
+
+
+# Main body
+if __name__ == '__main__':
+    main()
@@ -5,7 +5,7 @@
 # ** Luis ROSARIO, 2023
 # ** predict.py
 # ** File description:
-# ** Predict data with a trained model
+# ** Predict data with a trained model (images, directories, globs or videos), detections written per frame
 # ** https://github.com/Luisrosario2604
 # */
 
@@ -13,21 +13,40 @@
 # Imports
 import argparse
 import os
-from ultralytics import YOLO
+import time
+import cv2
+from tqdm import tqdm
+
+import soccer_gating
+import soccer_inference
+import soccer_pipeline
 
 
 # Function declarations
 def get_arguments():
     ap = argparse.ArgumentParser()
 
-    ap.add_argument("-f", "--file", required=True, help="file path")
+    ap.add_argument("-f", "--file", required=True, help="file, directory or glob pattern (images and videos)")
     ap.add_argument("-m", "--model", required=True, help="model path (*.pt)")
+    ap.add_argument("-b", "--batch", required=False, type=int, default=8, help="frames per model call")
+    ap.add_argument("-c", "--conf", required=False, type=float, default=0.25, help="minimum confidence")
+    ap.add_argument("-o", "--output", required=False, default="detections.jsonl",
+                    help="detections file (one JSON line per frame)")
+    ap.add_argument("-s", "--save", required=False, default=None, help="directory of the annotated frames (slow)")
+    ap.add_argument("-p", "--pipeline", required=False, action="store_true",
+                    help="decode, resize and inference on separate threads")
+    ap.add_argument("--imgsz", required=False, type=int, default=640, help="model input size (pipeline)")
+    ap.add_argument("-q", "--queue", required=False, type=int, default=16, help="frames between two stages (pipeline)")
+    ap.add_argument("-k", "--skip", required=False, type=int, default=None,
+                    help="infer every k-th frame, boxes moved with the camera in between")
+    ap.add_argument("--motion", required=False, type=float, default=None,
+                    help="infer when the frame difference since the last inferred frame is above (0-1, e.g. 0.03)")
     args = vars(ap.parse_args())
 
-    input_file = args["file"]
+    input_files = soccer_inference.get_source_files(args["file"])
     model_path = args["model"]
 
-    if not os.path.isfile(input_file):
+    if len(input_files) == 0:
         print("File not existing")
         exit(84)
 
@@ -39,14 +58,92 @@ def get_arguments():
         print("Model has not the good extension (.pt)")
         exit(84)
 
-    return input_file, model_path
+    if args["batch"] < 1 or args["queue"] < 1 or args["imgsz"] < 32:
+        print("Batch size and queue size must be positive, image size at least 32")
+        exit(84)
 
+    if (args["skip"] is not None and args["skip"] < 1) or (args["motion"] is not None and args["motion"] < 0):
+        print("Skip must be positive and motion threshold not negative")
+        exit(84)
+
+    if args["pipeline"] and (args["skip"] is not None or args["motion"] is not None):
+        print("--skip and --motion do not work with --pipeline")
+        exit(84)
+
+    if args["save"] is not None and not os.path.isdir(args["save"]):
+        print("Save folder not existing")
+        exit(84)
+
+    return input_files, model_path, args
 
-def main():
-    input_file, model_path = get_arguments()
 
-    model = YOLO(model_path)
-    model(input_file, save=True)
+# Propagated frames and resized ones (pipeline) have no result to plot : their boxes are drawn here
+def draw_detections(frame, detections):
+    frame = frame.copy()
+    for name, conf, x1, y1, x2, y2 in detections:
+        cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), (0, 255, 255), 2)
+        cv2.putText(frame, name + " " + str(conf), (int(x1), max(int(y1) - 5, 10)), cv2.FONT_HERSHEY_SIMPLEX, 0.5,
+                    (0, 255, 255), 1)
+    return frame
+
+
+def save_annotated(save_dir, path, frame_nb, frame, detections, result):
+    name = os.path.splitext(os.path.basename(path))[0]
+    if soccer_inference.is_video(path):
+        name += "_" + str(frame_nb)
+    image = result.plot() if result is not None else draw_detections(frame, detections)
+    cv2.imwrite(os.path.join(save_dir, name + ".jpg"), image)
+
+
+# (path, frame number, frame, detections, extra fields of the line, result or None) in the frames order
+# The result is None when it is not in the frame size (propagated or resized frames)
+def get_predictions(model, input_files, args, stats):
+    frames = soccer_inference.read_frames(input_files)
+    if args["skip"] is not None or args["motion"] is not None:
+        return ((path, frame_nb, frame, detections, {"tag": tag}, result)
+                for path, frame_nb, frame, detections, tag, result in
+                soccer_gating.predict_gated(model, frames, args["batch"], args["conf"], args["skip"], args["motion"],
+                                            keep_frames=args["save"] is not None))
+
+    if args["pipeline"]:
+        predictions = soccer_pipeline.predict_pipelined(model, input_files, args["batch"], args["conf"],
+                                                        args["imgsz"], args["queue"], stats)
+    else:
+        batches = soccer_inference.batch_frames(frames, args["batch"])
+        predictions = ((path, frame_nb, frame, result, (1.0, 1.0)) for path, frame_nb, frame, result in
+                       soccer_inference.predict_batches(model, batches, args["conf"]))
+    return ((path, frame_nb, frame, soccer_inference.get_detections(result, scale), {},
+             result if scale == (1.0, 1.0) else None) for path, frame_nb, frame, result, scale in predictions)
+
+
+def main():
+    input_files, model_path, args = get_arguments()
+
+    model = soccer_inference.load_model(model_path)
+    stats = soccer_pipeline.new_stats()
+
+    now = time.time()
+    count = 0
+    inferred = 0
+    with open(args["output"], 'w') as output:
+        progress = tqdm(get_predictions(model, input_files, args, stats),
+                        total=soccer_inference.get_frame_count(input_files))
+        for path, frame_nb, frame, detections, extra, result in progress:
+            output.write(soccer_inference.format_frame(path, frame_nb, detections, **extra))
+            if args["save"] is not None:
+                save_annotated(args["save"], path, frame_nb, frame, detections, result)
+            count += 1
+            inferred += extra.get("tag") != "propagated"
+
+    elapsed = time.time() - now
+    print("Frames : " + str(count) + " in " + str(round(elapsed, 2)) + " s (" +
+          str(round(count / max(elapsed, 1e-9), 2)) + " frames/s)")
+    if inferred < count:
+        print("Inferred : " + str(inferred) + " frames (" + str(round(inferred / count * 100, 1)) + " %), " +
+              str(count - inferred) + " propagated")
+    print("Detections written in " + args["output"])
+    if args["pipeline"]:
+        print(soccer_pipeline.format_stats(stats))
 
 
 # Main body
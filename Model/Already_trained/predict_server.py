@@ -0,0 +1,214 @@
+#!/usr/bin/python3
+# Importing python3 from local, just use "python3 <binary>" if is not the same location
+
+# /
+# ** Luis ROSARIO, 2023
+# ** predict_server.py
+# ** File description:
+# ** Local inference server : the models stay loaded, the concurrent requests are predicted together (micro-batches)
+# ** POST /predict?model=[name] with the image bytes, or JSON {"path": ..., "model": ...} -> JSON detections
+# ** https://github.com/Luisrosario2604
+# */
+
+
+# Imports
+import argparse
+import json
+import os
+import queue
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import cv2
+import numpy as np
+
+import soccer_inference
+
+# Global
+default_models = ["4_classes=models/4_classes/weights/best.pt", "val_real=models/val_real/weights/best.pt"]
+
+
+# Function declarations
+def get_arguments():
+    ap = argparse.ArgumentParser()
+
+    ap.add_argument("-m", "--models", required=False, nargs="+", default=default_models,
+                    help="models to keep loaded (name=path.pt), the first one is the default")
+    ap.add_argument("--host", required=False, default="127.0.0.1", help="HTTP address (localhost only by default)")
+    ap.add_argument("-p", "--port", required=False, type=int, default=8765, help="HTTP port")
+    ap.add_argument("-u", "--socket", required=False, default=None, help="Unix socket path (instead of HTTP port)")
+    ap.add_argument("-w", "--window", required=False, type=float, default=5, help="batching window (ms)")
+    ap.add_argument("-b", "--batch", required=False, type=int, default=16, help="maximum frames per model call")
+    ap.add_argument("-c", "--conf", required=False, type=float, default=0.25, help="minimum confidence")
+    args = vars(ap.parse_args())
+
+    models = {}
+    for model in args["models"]:
+        name, _, model_path = model.partition("=")
+        if model_path == "" or not os.path.isfile(model_path):
+            print("Model not existing : " + model)
+            exit(84)
+        models[name] = model_path
+
+    if args["batch"] < 1 or args["window"] < 0:
+        print("Batch size must be positive and window not negative")
+        exit(84)
+
+    return models, args
+
+
+# Requests of one model gathered during window seconds (or until batch frames), then predicted in one call
+class MicroBatcher:
+    def __init__(self, model, window, batch_size, conf):
+        self.model = model
+        self.window = window
+        self.batch_size = batch_size
+        self.conf = conf
+        self.requests = queue.Queue()
+        self.stats = {"requests": 0, "batches": 0}
+        threading.Thread(target=self.run, daemon=True).start()
+
+    # Blocks until the detections of the frame are ready
+    def predict(self, frame):
+        request = {"frame": frame, "done": threading.Event(), "detections": None, "error": None}
+        self.requests.put(request)
+        request["done"].wait()
+        if request["error"] is not None:
+            raise RuntimeError(request["error"])
+        return request["detections"]
+
+    def get_batch(self):
+        batch = [self.requests.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.perf_counter()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(self.requests.get(timeout=timeout))
+            except queue.Empty:
+                break
+        return batch
+
+    # Only this thread uses the model
+    def run(self):
+        while True:
+            batch = self.get_batch()
+            try:
+                results = self.model.predict([r["frame"] for r in batch], stream=True, conf=self.conf, verbose=False)
+                for request, result in zip(batch, results):
+                    request["detections"] = soccer_inference.get_detections(result)
+            except Exception as e:
+                for request in batch:
+                    request["error"] = str(e)
+
+            self.stats["requests"] += len(batch)
+            self.stats["batches"] += 1
+            for request in batch:
+                request["done"].set()
+
+
+class PredictHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    batchers = {}
+    default_model = None
+
+    def send_json(self, code, data):
+        body = json.dumps(data, separators=(",", ":")).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if urlparse(self.path).path != "/health":
+            self.send_json(404, {"error": "unknown path"})
+            return
+        self.send_json(200, {"models": {name: b.stats for name, b in self.batchers.items()}})
+
+    # Image bytes (model in the query) or JSON {"path": ..., "model": ...}
+    def do_POST(self):
+        url = urlparse(self.path)
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if url.path != "/predict":
+            self.send_json(404, {"error": "unknown path"})
+            return
+
+        model_name = parse_qs(url.query).get("model", [self.default_model])[0]
+        if self.headers.get("Content-Type", "").startswith("application/json"):
+            try:
+                data = json.loads(body)
+            except ValueError:
+                self.send_json(400, {"error": "invalid JSON"})
+                return
+            if not isinstance(data, dict) or not isinstance(data.get("path"), str) or \
+                    not isinstance(data.get("model", ""), (str, type(None))):
+                self.send_json(400, {"error": "JSON must be an object with a path string (and a model name)"})
+                return
+            model_name = data.get("model") or model_name
+            frame = cv2.imread(data["path"])
+        else:
+            frame = cv2.imdecode(np.frombuffer(body, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+        if model_name not in self.batchers:
+            self.send_json(404, {"error": "unknown model " + str(model_name)})
+            return
+        if frame is None:
+            self.send_json(400, {"error": "image not readable"})
+            return
+
+        try:
+            detections = self.batchers[model_name].predict(frame)
+        except RuntimeError as e:
+            self.send_json(500, {"error": str(e)})
+            return
+        self.send_json(200, {"model": model_name, "detections": detections})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    # Unix sockets have no client address, BaseHTTPRequestHandler expects (host, port)
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ("local", 0)
+
+
+def main():
+    models, args = get_arguments()
+
+    for name, model_path in models.items():
+        PredictHandler.batchers[name] = MicroBatcher(soccer_inference.load_model(model_path), args["window"] / 1000,
+                                                     args["batch"], args["conf"])
+    PredictHandler.default_model = list(models)[0]
+
+    if args["socket"] is not None:
+        if os.path.exists(args["socket"]):
+            os.remove(args["socket"])
+        server = UnixHTTPServer(args["socket"], PredictHandler)
+        print("Models " + ", ".join(models) + " loaded, listening on " + args["socket"])
+    else:
+        server = ThreadingHTTPServer((args["host"], args["port"]), PredictHandler)
+        server.daemon_threads = True
+        print("Models " + ", ".join(models) + " loaded, listening on http://" + args["host"] + ":" +
+              str(args["port"]))
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if args["socket"] is not None and os.path.exists(args["socket"]):
+            os.remove(args["socket"])
+
+
+# Main body
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+# /
+# ** Luis ROSARIO, 2023
+# ** soccer_gating.py
+# ** File description:
+# ** Frame skipping and motion gating (predict.py --skip / --motion) : the model only sees some frames, the boxes of
+# ** the last inferred frame are moved with the camera (phase correlation) on the frames in between
+# ** https://github.com/Luisrosario2604
+# */
+
+# Imports
+import cv2
+import numpy as np
+
+import soccer_inference
+
+# Global
+# Width of the gray thumbnails used for the motion score and the camera shift
+thumbnail_width = 128
+
+# Frames waiting for a model call, even when fewer than batch size frames are inferred (static stretches) : the
+# propagated ones only keep their shift, unless their decoded frame is kept (annotated frames, at most
+# max_pending_frames of them)
+max_pending = 4096
+max_pending_frames = 8
+
+
+# Function declarations
+def get_thumbnail(frame):
+    h, w = frame.shape[:2]
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    thumbnail = cv2.resize(gray, (thumbnail_width, max(1, round(h * thumbnail_width / w))),
+                           interpolation=cv2.INTER_AREA)
+    return thumbnail.astype(np.float32) / 255
+
+
+# Mean absolute difference of the thumbnails (0 : same frame, 1 : black to white)
+def get_motion(key_thumbnail, thumbnail):
+    return float(np.mean(np.abs(thumbnail - key_thumbnail)))
+
+
+# Shift (x, y) in pixels of the frame since the keyframe (camera pan)
+def get_shift(key_thumbnail, thumbnail, frame_width):
+    window = cv2.createHanningWindow((thumbnail.shape[1], thumbnail.shape[0]), cv2.CV_32F)
+    # Copies : phaseCorrelate can write the window into its inputs
+    (dx, dy), _ = cv2.phaseCorrelate(key_thumbnail.copy(), thumbnail.copy(), window)
+    ratio = frame_width / thumbnail.shape[1]
+    return dx * ratio, dy * ratio
+
+
+# Infers every skip-th frame and / or when the motion since the last inferred frame is above threshold
+# (every frame when both are None), the first frame of every source (or frame size) is always inferred
+# Yields (path, frame number, frame, inferred, shift since the last inferred frame, motion, (height, width)), the
+# frame is None for the propagated frames unless keep_frames
+def gate_frames(frames, skip=None, threshold=None, keep_frames=False):
+    if skip is None and threshold is None:
+        skip = 1
+
+    key = None
+    for path, frame_nb, frame in frames:
+        thumbnail = get_thumbnail(frame)
+        motion = 0.0
+        if key is None or key["path"] != path or key["thumbnail"].shape != thumbnail.shape:
+            infer = True
+        else:
+            motion = get_motion(key["thumbnail"], thumbnail)
+            infer = (skip is not None and frame_nb - key["frame"] >= skip) or \
+                    (threshold is not None and motion > threshold)
+
+        size = frame.shape[:2]
+        if infer:
+            key = {"path": path, "frame": frame_nb, "thumbnail": thumbnail}
+            yield path, frame_nb, frame, True, (0.0, 0.0), motion, size
+        else:
+            yield path, frame_nb, frame if keep_frames else None, False, \
+                  get_shift(key["thumbnail"], thumbnail, size[1]), motion, size
+
+
+# Batches of batch_size inferred frames, the propagated frames stay with them (in order)
+def batch_gated(items, batch_size, keep_frames=False):
+    limit = max(batch_size, max_pending_frames if keep_frames else max_pending)
+    batch = []
+    inferred = 0
+    for item in items:
+        batch.append(item)
+        inferred += item[3]
+        if inferred == batch_size or len(batch) >= limit:
+            yield batch
+            batch = []
+            inferred = 0
+    if len(batch) > 0:
+        yield batch
+
+
+# Boxes of the last inferred frame moved by shift, cut at the frame borders
+def propagate(detections, shift, width, height):
+    dx, dy = shift
+    propagated = []
+    for name, conf, x1, y1, x2, y2 in detections:
+        x1, x2 = min(max(x1 + dx, 0), width), min(max(x2 + dx, 0), width)
+        y1, y2 = min(max(y1 + dy, 0), height), min(max(y2 + dy, 0), height)
+        if x2 - x1 < 1 or y2 - y1 < 1:
+            continue
+        propagated.append([name, conf] + [round(v, soccer_inference.box_precision) for v in [x1, y1, x2, y2]])
+    return propagated
+
+
+# Yields (path, frame number, frame, detections, "inferred" or "propagated", result or None) in the frames order,
+# the frame of the propagated ones is None unless keep_frames
+def predict_gated(model, frames, batch_size=8, conf=0.25, skip=None, threshold=None, keep_frames=False):
+    detections = []
+    for batch in batch_gated(gate_frames(frames, skip, threshold, keep_frames), batch_size, keep_frames):
+        keyframes = [item[2] for item in batch if item[3]]
+        results = model.predict(keyframes, stream=True, conf=conf, verbose=False) if len(keyframes) > 0 else iter([])
+        for path, frame_nb, frame, infer, shift, _, (height, width) in batch:
+            if infer:
+                result = next(results)
+                detections = soccer_inference.get_detections(result)
+                yield path, frame_nb, frame, detections, "inferred", result
+            else:
+                yield path, frame_nb, frame, propagate(detections, shift, width, height), "propagated", None
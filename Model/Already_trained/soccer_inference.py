@@ -0,0 +1,124 @@
+# /
+# ** Luis ROSARIO, 2023
+# ** soccer_inference.py
+# ** File description:
+# ** Inputs (images, directories, globs, videos), batches and detections of the trained models (predict.py)
+# ** https://github.com/Luisrosario2604
+# */
+
+# Imports
+import glob
+import json
+import os
+import cv2
+
+# Global
+image_extensions = [".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp"]
+video_extensions = [".mp4", ".avi", ".mov", ".mkv", ".mpg", ".mpeg", ".m4v", ".webm"]
+
+# Model path -> YOLO model, loaded once per process
+models = {}
+
+# Decimals of the detections file (pixels, confidence)
+box_precision = 1
+conf_precision = 3
+
+
+# Function declarations
+# ultralytics is only imported here : the clients (load_test.py) do not need it
+def load_model(model_path):
+    if model_path not in models:
+        from ultralytics import YOLO
+        models[model_path] = YOLO(model_path)
+    return models[model_path]
+
+
+def get_extension(path):
+    return os.path.splitext(path)[1].lower()
+
+
+def is_video(path):
+    return get_extension(path) in video_extensions
+
+
+def is_media(path):
+    return get_extension(path) in image_extensions + video_extensions
+
+
+# File, directory (images and videos inside, sorted) or glob pattern
+def get_source_files(source):
+    if os.path.isdir(source):
+        return sorted(os.path.join(source, f) for f in os.listdir(source) if is_media(f))
+    if os.path.isfile(source):
+        return [source]
+    return sorted(f for f in glob.glob(source) if os.path.isfile(f) and is_media(f))
+
+
+def get_frame_count(paths):
+    count = 0
+    for path in paths:
+        if is_video(path):
+            video = cv2.VideoCapture(path)
+            count += int(video.get(cv2.CAP_PROP_FRAME_COUNT))
+            video.release()
+        else:
+            count += 1
+    return count
+
+
+# (path, frame number, BGR frame) one by one : only the frames of the current batch are in memory
+def read_frames(paths):
+    for path in paths:
+        if not is_video(path):
+            frame = cv2.imread(path)
+            if frame is not None:
+                yield path, 0, frame
+            continue
+
+        video = cv2.VideoCapture(path)
+        frame_nb = 0
+        while True:
+            ok, frame = video.read()
+            if not ok:
+                break
+            yield path, frame_nb, frame
+            frame_nb += 1
+        video.release()
+
+
+def batch_frames(frames, batch_size):
+    batch = []
+    for frame in frames:
+        batch.append(frame)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if len(batch) > 0:
+        yield batch
+
+
+# One model call per batch, the results are consumed as a stream (stream=True)
+def predict_batches(model, batches, conf=0.25):
+    for batch in batches:
+        results = model.predict([frame for _, _, frame in batch], stream=True, conf=conf, verbose=False)
+        for (path, frame_nb, frame), result in zip(batch, results):
+            yield path, frame_nb, frame, result
+
+
+# [[class name, confidence, x_min, y_min, x_max, y_max], ...] in pixels, scale (x, y) of the frame given to the model
+def get_detections(result, scale=(1.0, 1.0)):
+    boxes = result.boxes
+    xyxy = boxes.xyxy.cpu().numpy() * [scale[0], scale[1], scale[0], scale[1]]
+    confs = boxes.conf.cpu().numpy()
+    classes = boxes.cls.cpu().numpy().astype(int)
+
+    return [[result.names[c], round(float(conf), conf_precision)] + [round(float(v), box_precision) for v in box]
+            for c, conf, box in zip(classes, confs, xyxy)]
+
+
+# One JSON line per frame
+def format_frame(path, frame_nb, detections, **extra):
+    line = {"source": path, "frame": frame_nb}
+    line.update(extra)
+    line["detections"] = detections
+    return json.dumps(line, separators=(",", ":")) + "\n"
@@ -0,0 +1,175 @@
+# /
+# ** Luis ROSARIO, 2023
+# ** soccer_pipeline.py
+# ** File description:
+# ** Pipelined inference (predict.py --pipeline) : decode, resize and model calls on their own threads, linked by
+# ** bounded queues (a full queue blocks the stage before it), one thread per stage so the frames stay in order
+# ** https://github.com/Luisrosario2604
+# */
+
+# Imports
+import queue
+import threading
+import time
+import cv2
+
+import soccer_inference
+
+# Global
+end_of_stream = None
+stage_names = ["decode", "preprocess", "inference", "output"]
+
+
+# Function declarations
+def new_stats():
+    stats = {name: {"frames": 0, "busy": 0.0, "wait_in": 0.0, "wait_out": 0.0} for name in stage_names}
+    stats["wall"] = 0.0
+    return stats
+
+
+# Blocks while the next queue is full (backpressure), gives up when the pipeline stops
+def put(stage_queue, item, stop, stage_stats):
+    start = time.perf_counter()
+    while not stop.is_set():
+        try:
+            stage_queue.put(item, timeout=0.1)
+            break
+        except queue.Full:
+            continue
+    stage_stats["wait_out"] += time.perf_counter() - start
+
+
+def get(stage_queue, stop, stage_stats):
+    start = time.perf_counter()
+    while True:
+        try:
+            item = stage_queue.get(timeout=0.1)
+            break
+        except queue.Empty:
+            if stop.is_set():
+                item = end_of_stream
+                break
+    stage_stats["wait_in"] += time.perf_counter() - start
+    return item
+
+
+# Same size as the letterbox of the model (long side = imgsz, INTER_LINEAR), the model then only pads the frame
+# Returns the resized frame and the scale (x, y) back to the frame
+def resize_for_model(frame, imgsz):
+    h, w = frame.shape[:2]
+    ratio = min(imgsz / h, imgsz / w)
+    new_w, new_h = int(round(w * ratio)), int(round(h * ratio))
+    if (new_w, new_h) == (w, h):
+        return frame, (1.0, 1.0)
+    return cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR), (w / new_w, h / new_h)
+
+
+def decode_stage(paths, output, stop, stats):
+    frames = soccer_inference.read_frames(paths)
+    while not stop.is_set():
+        start = time.perf_counter()
+        item = next(frames, end_of_stream)
+        stats["busy"] += time.perf_counter() - start
+        if item is end_of_stream:
+            break
+        stats["frames"] += 1
+        put(output, item, stop, stats)
+    put(output, end_of_stream, stop, stats)
+
+
+def preprocess_stage(stage_input, output, imgsz, stop, stats):
+    while True:
+        item = get(stage_input, stop, stats)
+        if item is end_of_stream:
+            break
+        start = time.perf_counter()
+        path, frame_nb, frame = item
+        resized, scale = resize_for_model(frame, imgsz)
+        stats["busy"] += time.perf_counter() - start
+        stats["frames"] += 1
+        put(output, (path, frame_nb, frame, resized, scale), stop, stats)
+    put(output, end_of_stream, stop, stats)
+
+
+# Takes the frames already waiting (up to batch_size) without waiting for a full batch
+def inference_stage(model, stage_input, output, batch_size, conf, stop, stats):
+    done = False
+    while not done:
+        batch = [get(stage_input, stop, stats)]
+        if batch[0] is end_of_stream:
+            break
+        while len(batch) < batch_size:
+            try:
+                item = stage_input.get_nowait()
+            except queue.Empty:
+                break
+            if item is end_of_stream:
+                done = True
+                break
+            batch.append(item)
+
+        start = time.perf_counter()
+        results = list(model.predict([b[3] for b in batch], stream=True, conf=conf, verbose=False))
+        stats["busy"] += time.perf_counter() - start
+        stats["frames"] += len(batch)
+        for (path, frame_nb, frame, _, scale), result in zip(batch, results):
+            put(output, (path, frame_nb, frame, result, scale), stop, stats)
+    put(output, end_of_stream, stop, stats)
+
+
+def run_stage(target, args, errors, stop):
+    try:
+        target(*args)
+    except Exception as e:
+        errors.append(e)
+        stop.set()
+
+
+# Yields (path, frame number, frame, result, scale) in the frames order, the time spent by the caller on every
+# frame is the "output" stage. Boxes of result are in the resized frame : multiply them by scale
+def predict_pipelined(model, paths, batch_size=8, conf=0.25, imgsz=640, queue_size=16, stats=None):
+    stats = new_stats() if stats is None else stats
+    stop = threading.Event()
+    errors = []
+    decoded, resized, predicted = [queue.Queue(maxsize=queue_size) for _ in range(3)]
+    stages = [
+        (decode_stage, (paths, decoded, stop, stats["decode"])),
+        (preprocess_stage, (decoded, resized, imgsz, stop, stats["preprocess"])),
+        (inference_stage, (model, resized, predicted, batch_size, conf, stop, stats["inference"]))
+    ]
+    threads = [threading.Thread(target=run_stage, args=(target, args, errors, stop), daemon=True)
+               for target, args in stages]
+
+    now = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    try:
+        while True:
+            item = get(predicted, stop, stats["output"])
+            if item is end_of_stream:
+                break
+            start = time.perf_counter()
+            yield item
+            stats["output"]["busy"] += time.perf_counter() - start
+            stats["output"]["frames"] += 1
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+        stats["wall"] = time.perf_counter() - now
+
+    if len(errors) > 0:
+        raise errors[0]
+
+
+# Busy : share of the run spent working, the rest is waiting for the previous stage (input) or for the next one
+# (output, backpressure)
+def format_stats(stats):
+    wall = max(stats["wall"], 1e-9)
+    lines = ["stage".ljust(12) + "frames".rjust(8) + "busy s".rjust(10) + "busy %".rjust(8) + "input s".rjust(10) +
+             "output s".rjust(10)]
+    for name in stage_names:
+        s = stats[name]
+        lines.append(name.ljust(12) + str(s["frames"]).rjust(8) + f"{s['busy']:10.2f}" +
+                     f"{s['busy'] / wall * 100:8.1f}" + f"{s['wait_in']:10.2f}" + f"{s['wait_out']:10.2f}")
+    return "\n".join(lines)
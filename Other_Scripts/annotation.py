@@ -13,8 +13,13 @@
 import argparse
 import os
 import glob
+import json
+import time
+import hashlib
 import cv2
 import numpy as np
+from multiprocessing import Pool
+from tqdm import tqdm
 
 # Global variables
 colors = {
@@ -44,6 +49,13 @@ colors = {
         "Player2_10": [190, 10, 0]
     }
 
+colors_names = list(colors.keys())
+colors_lut = None
+
+yolo_precision = 6
+
+manifest_name = "manifest.json"
+
 class_nb = {
         "Ball": 0,
         "Referee": 1,
@@ -71,17 +83,110 @@ class_nb = {
         "Player2_10": 23
     }
 
+class_nb_low = {
+        "Ball": 0,
+        "Referee": 1,
+        "Goal1": 2,
+        "Goal2": 2,
+        "Player1_1": 3,
+        "Player1_2": 3,
+        "Player1_3": 3,
+        "Player1_4": 3,
+        "Player1_5": 3,
+        "Player1_6": 3,
+        "Player1_7": 3,
+        "Player1_8": 3,
+        "Player1_9": 3,
+        "Player1_10": 3,
+        "Player2_1": 3,
+        "Player2_2": 3,
+        "Player2_3": 3,
+        "Player2_4": 3,
+        "Player2_5": 3,
+        "Player2_6": 3,
+        "Player2_7": 3,
+        "Player2_8": 3,
+        "Player2_9": 3,
+        "Player2_10": 3
+    }
+
+class_nb_val_real = {
+        "Ball": 0,
+        "Referee": 1,
+        "Goal1": 2,
+        "Goal2": 3,
+        "Player1_1": 4,
+        "Player1_2": 4,
+        "Player1_3": 4,
+        "Player1_4": 4,
+        "Player1_5": 4,
+        "Player1_6": 4,
+        "Player1_7": 4,
+        "Player1_8": 4,
+        "Player1_9": 4,
+        "Player1_10": 4,
+        "Player2_1": 5,
+        "Player2_2": 5,
+        "Player2_3": 5,
+        "Player2_4": 5,
+        "Player2_5": 5,
+        "Player2_6": 5,
+        "Player2_7": 5,
+        "Player2_8": 5,
+        "Player2_9": 5,
+        "Player2_10": 5
+    }
+
+# Class mapping profiles : one label directory can be written per profile from a single decode
+class_profiles = {
+        "24_classes": class_nb,
+        "4_classes": class_nb_low,
+        "val_real": class_nb_val_real
+    }
+
 
 # Function declarations
-def get_arguments():
+def get_arguments(default_profile="24_classes"):
     ap = argparse.ArgumentParser()
 
     ap.add_argument("-i", "--input", required=True, help="path of the input data file")
     ap.add_argument("-o", "--output", required=True, help="path of the output data file")
+    ap.add_argument("-w", "--workers", required=False, type=int, default=1, help="number of processes used to annotate")
+    ap.add_argument("-p", "--profiles", required=False, nargs="+", choices=list(class_profiles.keys()),
+                    default=[default_profile], help="class mapping profiles to write (one sub directory each if many)")
+    ap.add_argument("--incremental", action="store_true", help="only annotate new or changed images (manifest in output)")
+    ap.add_argument("--watch", required=False, type=float, default=None,
+                    help="keep annotating new images every x seconds (implies --incremental)")
+    ap.add_argument("--components", action="store_true", help="boxes from connected components instead of all pixels")
+    ap.add_argument("--min-area", required=False, type=int, default=1,
+                    help="minimum pixels of a connected component (with --components)")
+    ap.add_argument("--min-fill", required=False, type=float, default=0.0,
+                    help="minimum visible pixels / box area of a box (with --components)")
+    ap.add_argument("--stats", action="store_true", help="write the visible pixels and fill ratio of every box in stats.csv")
     args = vars(ap.parse_args())
 
     input_dir = args["input"]
     output_dir = args["output"]
+    workers = args["workers"]
+    profiles = list(dict.fromkeys(args["profiles"]))
+    watch = args["watch"]
+    incremental = args["incremental"] or watch is not None
+    stats = args["stats"]
+    extraction = None
+    if args["components"]:
+        extraction = {"min_area": args["min_area"], "min_fill": args["min_fill"]}
+
+    if workers < 1:
+        print("Workers must be at least 1")
+        exit(84)
+
+    if watch is not None and watch <= 0:
+        print("Watch interval must be positive")
+        exit(84)
+
+    if args["min_area"] < 1 or not 0 <= args["min_fill"] <= 1:
+        print("Min area must be at least 1 and min fill between 0 and 1")
+        exit(84)
 
     if not os.path.isdir(input_dir):
         print("Folder not existing")
@@ -90,7 +195,27 @@ def get_arguments():
     if not os.path.isdir(output_dir):
         os.mkdir(output_dir)
 
-    return input_dir, output_dir
+    return input_dir, output_dir, workers, profiles, incremental, watch, extraction, stats
+
+
+def slash_dir(dir_path):
+    if dir_path.endswith("/") == False and dir_path.endswith("\\") == False:
+        dir_path += "/"
+    return dir_path
+
+
+# One profile is written directly in output_dir, many profiles in output_dir/<profile>/
+def get_profile_outputs(output_dir, profiles):
+    output_dir = slash_dir(output_dir)
+    if len(profiles) == 1:
+        return [(output_dir, class_profiles[profiles[0]])]
+
+    outputs = []
+    for p in profiles:
+        if not os.path.isdir(output_dir + p):
+            os.mkdir(output_dir + p)
+        outputs.append((output_dir + p + "/", class_profiles[p]))
+    return outputs
 
 
 def get_all_files(input_dir):
@@ -125,6 +250,88 @@ def get_one_square(f, img):
     return detections
 
 
+# Pack every pixel into one 24 bits integer (0xRRGGBB) from a BGR image
+def pack_colors(img):
+    return (img[:, :, 2].astype(np.uint32) << 16) | (img[:, :, 1].astype(np.uint32) << 8) | img[:, :, 0]
+
+
+# Lookup table from a packed color to its index in colors (255 = not an object)
+def get_colors_lut():
+    global colors_lut
+
+    if colors_lut is None:
+        colors_lut = np.full(1 << 24, 255, dtype=np.uint8)
+        for i, rgb in enumerate(colors.values()):
+            colors_lut[(rgb[0] << 16) | (rgb[1] << 8) | rgb[2]] = i
+    return colors_lut
+
+
+# Index of the object of every pixel (255 = not an object)
+def get_label_ids(img):
+    return get_colors_lut()[pack_colors(img)]
+
+
+def get_fill_ratio(box, pixels):
+    return pixels / ((box[1][0] - box[0][0] + 1) * (box[1][1] - box[0][1] + 1))
+
+
+# Same detections as get_one_square but with only one pass over the image
+# Every detection is [name, [(x_min, y_min), (x_max, y_max)], visible pixels, fill ratio]
+def decode_label_image(img, ids=None):
+    h, w = img.shape[0], img.shape[1]
+    if ids is None:
+        ids = get_label_ids(img)
+    ids = ids.ravel()
+
+    pixels = np.flatnonzero(ids != 255)
+    obj_ids = ids[pixels]
+    counts = np.bincount(obj_ids, minlength=len(colors_names))
+    rows = np.zeros((len(colors_names), h), dtype=bool)
+    cols = np.zeros((len(colors_names), w), dtype=bool)
+    rows[obj_ids, pixels // w] = True
+    cols[obj_ids, pixels % w] = True
+
+    y_min = rows.argmax(axis=1)
+    y_max = h - 1 - rows[:, ::-1].argmax(axis=1)
+    x_min = cols.argmax(axis=1)
+    x_max = w - 1 - cols[:, ::-1].argmax(axis=1)
+
+    detections = []
+    for i in np.flatnonzero(rows.any(axis=1)):
+        box = [(int(x_min[i]), int(y_min[i])), (int(x_max[i]), int(y_max[i]))]
+        detections.append([colors_names[i], box, int(counts[i]), get_fill_ratio(box, int(counts[i]))])
+    return detections
+
+
+# Connected components of every object (inside its global box) : components smaller than
+# min_area (stray anti-aliased pixels) are ignored, the box is the union of the remaining ones
+def decode_label_components(img, min_area=1, min_fill=0.0, connectivity=8):
+    ids = get_label_ids(img)
+    detections = []
+
+    for d in decode_label_image(img, ids):
+        (x_min, y_min), (x_max, y_max) = d[1]
+        mask = (ids[y_min:y_max + 1, x_min:x_max + 1] == colors_names.index(d[0])).astype(np.uint8)
+        _, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=connectivity)
+
+        stats = stats[1:]
+        stats = stats[stats[:, cv2.CC_STAT_AREA] >= min_area]
+        if len(stats) == 0:
+            continue
+
+        left = stats[:, cv2.CC_STAT_LEFT]
+        top = stats[:, cv2.CC_STAT_TOP]
+        box = [(x_min + int(left.min()), y_min + int(top.min())),
+               (x_min + int((left + stats[:, cv2.CC_STAT_WIDTH]).max()) - 1,
+                y_min + int((top + stats[:, cv2.CC_STAT_HEIGHT]).max()) - 1)]
+        pixels = int(stats[:, cv2.CC_STAT_AREA].sum())
+        fill = get_fill_ratio(box, pixels)
+
+        if fill >= min_fill:
+            detections.append([d[0], box, pixels, fill])
+    return detections
+
+
 def coords_to_yolo(top_left, bottom_right, w, h):
     return [
         (top_left[0] + bottom_right[0]) / 2 / w,
@@ -134,38 +341,233 @@ def coords_to_yolo(top_left, bottom_right, w, h):
     ]
 
 
-def create_annotation_file(detections, w, h, f_number, output_dir):
-    with open(str(output_dir) + str(f_number) + ".txt", 'w') as f:
-        f.write("")
+def format_annotation(detections, w, h, class_nb=class_nb):
+    lines = []
     for d in detections:
         top_left = d[1][0]
         bottom_right = d[1][1]
         coords = coords_to_yolo(top_left, bottom_right, w, h)
         class_n = str(class_nb[d[0]])
 
-        with open(str(output_dir) + str(f_number) + ".txt", 'a') as f:
-            f.write(f"{class_n} {str(coords[0])} {str(coords[1])} {str(coords[2])} {str(coords[3])}\n")
+        lines.append(f"{class_n} {coords[0]:.{yolo_precision}f} {coords[1]:.{yolo_precision}f} "
+                     f"{coords[2]:.{yolo_precision}f} {coords[3]:.{yolo_precision}f}\n")
+    return "".join(lines)
 
 
-def get_squares(file_list, output_dir):
-    if output_dir.endswith("/") == False and output_dir.endswith("\\") == False:
-        output_dir += "/"
+# Written in a temporary file then renamed, so a label file is never seen half written
+def create_annotation_file(detections, w, h, f_number, output_dir, class_nb=class_nb):
+    file_path = str(output_dir) + str(f_number) + ".txt"
+    tmp_path = file_path + "." + str(os.getpid()) + ".tmp"
+
+    with open(tmp_path, 'w') as f:
+        f.write(format_annotation(detections, w, h, class_nb))
+    os.replace(tmp_path, file_path)
+
+
+def get_file_number(f):
+    return f.split('.')[-2].split('/')[-1].split('\\')[-1]
 
-    for f in file_list:
-        img = cv2.imread(f)
-        w = img.shape[1]
-        h = img.shape[0]
 
-        detections = get_one_square(f, img)
-        f_number = f.split('.')[-2].split('/')[-1].split('\\')[-1]
-        create_annotation_file(detections, w, h, f_number, output_dir)
+def hash_bytes(data):
+    return hashlib.sha1(data).hexdigest()
 
 
-def main():
-    input_dir, output_dir = get_arguments()
+# The image is read once : the same bytes are hashed for the manifest and decoded
+def annotate_file(f, outputs, extraction=None):
+    stat = os.stat(f)
+    with open(f, 'rb') as image_file:
+        data = image_file.read()
+    img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError("Image not readable")
+    w = img.shape[1]
+    h = img.shape[0]
+
+    if extraction is None:
+        detections = decode_label_image(img)
+    else:
+        detections = decode_label_components(img, extraction["min_area"], extraction["min_fill"])
+    f_number = get_file_number(f)
+    for output_dir, class_nb in outputs:
+        create_annotation_file(detections, w, h, f_number, output_dir, class_nb)
+
+    return {
+        "path": f,
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "hash": hash_bytes(data),
+        "boxes": [[d[0], d[1][0][0], d[1][0][1], d[1][1][0], d[1][1][1], d[2], round(d[3], 4)] for d in detections]
+    }
+
 
-    file_list = get_all_files(input_dir)
-    get_squares(file_list, output_dir)
+# Worker entry point : a broken frame is returned as an error instead of stopping the run
+def annotate_job(job):
+    f, outputs, extraction = job
+    try:
+        entry = annotate_file(f, outputs, extraction)
+    except Exception as e:
+        return f, str(e), None
+    return f, None, entry
+
+
+def get_squares(file_list, output_dir, workers=1, profiles=None, manifest=None, pool=None, extraction=None):
+    if profiles is None:
+        profiles = ["24_classes"]
+    if pool is None and workers > 1:
+        with Pool(workers) as pool:
+            return get_squares(file_list, output_dir, workers, profiles, manifest, pool, extraction)
+
+    outputs = get_profile_outputs(output_dir, profiles)
+    jobs = [(f, outputs, extraction) for f in file_list]
+    errors = []
+
+    if pool is not None:
+        results = pool.imap(annotate_job, jobs, max(1, len(jobs) // (workers * 8)))
+    else:
+        results = map(annotate_job, jobs)
+
+    for f, error, entry in tqdm(results, total=len(jobs)):
+        if error is not None:
+            errors.append((f, error))
+        elif manifest is not None:
+            manifest["files"][get_file_number(f)] = entry
+
+    for f, error in errors:
+        print("Error - " + str(f) + " - " + error)
+    return errors
+
+
+def new_manifest(profiles, extraction=None):
+    return {"profiles": profiles, "extraction": extraction, "files": {}}
+
+
+# A manifest written with other profiles or extraction settings cannot be reused
+def load_manifest(output_dir, profiles, extraction=None):
+    manifest_path = slash_dir(output_dir) + manifest_name
+    if os.path.isfile(manifest_path):
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+        if manifest.get("profiles") == profiles and manifest.get("extraction") == extraction:
+            return manifest
+        print("Manifest created with other settings, annotating everything again")
+    return new_manifest(profiles, extraction)
+
+
+def save_manifest(output_dir, manifest):
+    manifest_path = slash_dir(output_dir) + manifest_name
+    tmp_path = manifest_path + "." + str(os.getpid()) + ".tmp"
+
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, manifest_path)
+
+
+# Size and mtime are checked first, the content hash only when they changed
+def get_changed_files(file_list, output_dir, profiles, manifest, settle_time=0):
+    label_dir = get_profile_outputs(output_dir, profiles)[0][0]
+    now = time.time()
+    changed = []
+
+    for f in file_list:
+        stat = os.stat(f)
+        if now - stat.st_mtime < settle_time:
+            continue
+        f_number = get_file_number(f)
+        entry = manifest["files"].get(f_number)
+        if entry is None or not os.path.isfile(label_dir + f_number + ".txt"):
+            changed.append(f)
+        elif entry["size"] != stat.st_size:
+            changed.append(f)
+        elif entry["mtime"] != stat.st_mtime:
+            with open(f, 'rb') as image_file:
+                if hash_bytes(image_file.read()) != entry["hash"]:
+                    changed.append(f)
+                    continue
+            entry["path"] = f
+            entry["mtime"] = stat.st_mtime
+    return changed
+
+
+# Frames deleted from the groundtruth : their labels (every profile) and manifest entries are removed
+def prune_deleted_files(file_list, output_dir, profiles, manifest):
+    present = set(get_file_number(f) for f in file_list)
+    deleted = [n for n in manifest["files"] if n not in present]
+
+    for n in deleted:
+        for label_dir, _ in get_profile_outputs(output_dir, profiles):
+            if os.path.isfile(label_dir + n + ".txt"):
+                os.remove(label_dir + n + ".txt")
+        del manifest["files"][n]
+    return deleted
+
+
+def save_stats(output_dir, manifest):
+    stats_path = slash_dir(output_dir) + "stats.csv"
+    tmp_path = stats_path + "." + str(os.getpid()) + ".tmp"
+    numbers = sorted(manifest["files"].keys(), key=int)
+
+    with open(tmp_path, 'w') as f:
+        f.write("image,object,x_min,y_min,x_max,y_max,pixels,fill\n")
+        for n in numbers:
+            for b in manifest["files"][n]["boxes"]:
+                f.write(n + "," + ",".join(str(v) for v in b) + "\n")
+    os.replace(tmp_path, stats_path)
+
+
+def annotate_incremental(input_dir, output_dir, workers, profiles, pool=None, settle_time=0, extraction=None, stats=False):
+    manifest = load_manifest(output_dir, profiles, extraction)
+    all_files = get_all_files(input_dir)
+    deleted = prune_deleted_files(all_files, output_dir, profiles, manifest)
+    file_list = get_changed_files(all_files, output_dir, profiles, manifest, settle_time)
+
+    errors = []
+    if len(deleted) > 0:
+        print(str(len(deleted)) + " deleted files")
+    if len(file_list) > 0:
+        print(str(len(file_list)) + " new or changed files")
+        errors = get_squares(file_list, output_dir, workers, profiles, manifest, pool, extraction)
+    elif settle_time == 0 and len(deleted) == 0:
+        print("No new or changed files")
+    save_manifest(output_dir, manifest)
+    if stats:
+        save_stats(output_dir, manifest)
+    return file_list, errors
+
+
+# Images still being written by Blender are left for the next pass (settle time / decode error)
+def watch_directory(input_dir, output_dir, workers, profiles, interval, extraction=None, stats=False):
+    print("Watching " + str(input_dir) + " every " + str(interval) + "s (Ctrl+C to stop)")
+    pool = Pool(workers) if workers > 1 else None
+    try:
+        while True:
+            annotate_incremental(input_dir, output_dir, workers, profiles, pool, max(interval, 1), extraction, stats)
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("Watch stopped")
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+
+def main(default_profile="24_classes"):
+    input_dir, output_dir, workers, profiles, incremental, watch, extraction, stats = get_arguments(default_profile)
+
+    if watch is not None:
+        watch_directory(input_dir, output_dir, workers, profiles, watch, extraction, stats)
+        return
+
+    if incremental:
+        file_list, errors = annotate_incremental(input_dir, output_dir, workers, profiles, None, 0, extraction, stats)
+    else:
+        file_list = get_all_files(input_dir)
+        manifest = new_manifest(profiles, extraction) if stats else None
+        errors = get_squares(file_list, output_dir, workers, profiles, manifest, None, extraction)
+        if stats:
+            save_stats(output_dir, manifest)
+
+    if len(errors) > 0:
+        print(str(len(errors)) + " / " + str(len(file_list)) + " files not annotated")
+        exit(84)
 
 
 # Main body
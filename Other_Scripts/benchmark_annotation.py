@@ -0,0 +1,78 @@
+#!/usr/bin/python3
+# Importing python3 from local, just use "python3 <binary>" if is not the same location
+
+# /
+# ** Luis ROSARIO, 2023
+# ** benchmark_annotation.py
+# ** File description:
+# ** Compare the speed and the results of the annotation decoders
+# ** https://github.com/Luisrosario2604
+# */
+
+# Imports
+import argparse
+import os
+import time
+import cv2
+
+import annotation
+
+
+# Function declarations
+def get_arguments():
+    ap = argparse.ArgumentParser()
+
+    ap.add_argument("-i", "--input", required=True, help="path of the groundtruth images")
+    ap.add_argument("-n", "--repeat", required=False, type=int, default=5, help="number of runs per image")
+    args = vars(ap.parse_args())
+
+    input_dir = args["input"]
+    repeat = args["repeat"]
+
+    if not os.path.isdir(input_dir):
+        print("Folder not existing")
+        exit(84)
+
+    return input_dir, repeat
+
+
+def time_decoder(decoder, images, repeat):
+    results = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        results = [decoder(f, img) for f, img in images]
+    return (time.perf_counter() - start) / (repeat * len(images)), results
+
+
+def main():
+    input_dir, repeat = get_arguments()
+
+    file_list = annotation.get_all_files(input_dir)
+    if len(file_list) == 0:
+        print("No groundtruth images found")
+        exit(84)
+    images = [(f, cv2.imread(f)) for f in file_list]
+
+    annotation.get_colors_lut()
+    loop_time, loop_results = time_decoder(annotation.get_one_square, images, repeat)
+    single_time, single_results = time_decoder(lambda f, img: annotation.decode_label_image(img), images, repeat)
+
+    mismatches = 0
+    for (f, img), loop_d, single_d in zip(images, loop_results, single_results):
+        w, h = img.shape[1], img.shape[0]
+        loop_yolo = [(d[0], annotation.coords_to_yolo(d[1][0], d[1][1], w, h)) for d in loop_d]
+        single_yolo = [(d[0], annotation.coords_to_yolo(d[1][0], d[1][1], w, h)) for d in single_d]
+        if loop_yolo != single_yolo:
+            mismatches += 1
+            print("Mismatch : " + str(f))
+
+    print("Images : " + str(len(images)) + " - Runs : " + str(repeat))
+    print("Color loop   : " + str(round(loop_time * 1000, 2)) + " ms/image")
+    print("Single pass  : " + str(round(single_time * 1000, 2)) + " ms/image")
+    print("Speedup      : x" + str(round(loop_time / single_time, 2)))
+    print("Mismatches   : " + str(mismatches))
+
+
+# Main body
+if __name__ == '__main__':
+    main()